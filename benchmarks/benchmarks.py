@@ -0,0 +1,219 @@
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import simpy
+
+from casos import CASES, processed_events
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Factores de carga por defecto (multiplican la tasa de llegadas de cada modelo)
+LOADS = [1, 10, 100]
+SEED = 1
+TIMEOUT = 900  # Tiempo máximo de cada ejecución (segundos)
+TOLERANCE = 0.10  # Caída de eventos/s respecto a la referencia que se considera una regresión
+
+# Variables que activan la traza o el perfilado de los modelos: se quitan para no medir su coste
+INSTRUMENTATION_VARIABLES = ['SIM_TRACE', 'SIM_PROFILE', 'SIM_PROFILE_FOLDED']
+
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+
+def peak_rss_mb():
+    """Máximo de memoria residente del proceso (MB), o None si el sistema no lo ofrece."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB y macOS en bytes
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def worker(case, load, seed):
+    """
+    Ejecuta un caso en este proceso y escribe su medida como una línea JSON
+    en la salida estándar. La salida de los modelos se descarta.
+    """
+    output = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    run = CASES[case](load)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    env = run(seed)
+    wall_time = time.perf_counter() - start
+    events = processed_events(env)
+    output.write(json.dumps({
+        'case': case,
+        'load': load,
+        'seed': seed,
+        'status': 'ok',
+        'wall_time': wall_time,
+        'events': events,
+        'events_per_second': events / wall_time,
+        'sim_time': env.now,
+        'peak_rss_mb': peak_rss_mb(),
+        'baseline_rss_mb': baseline,
+    }) + '\n')
+
+
+def run_case(case, load, seed, timeout=TIMEOUT):
+    """Mide un caso en un proceso nuevo, para que la memoria y las importaciones no se mezclen entre casos."""
+    env = {name: value for name, value in os.environ.items() if name not in INSTRUMENTATION_VARIABLES}
+    env['MPLBACKEND'] = 'Agg'
+    command = [sys.executable, os.path.abspath(__file__), '--worker', case, str(load), str(seed)]
+    record = {'case': case, 'load': load, 'seed': seed}
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout, env=env)
+    except subprocess.TimeoutExpired:
+        return {**record, 'status': 'timeout'}
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        return {**record, 'status': 'error', 'error': lines[-1] if lines else f'exit code {completed.returncode}'}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(results):
+    """
+    Resumen por caso y carga: mediana de las repeticiones y escalado respecto
+    a la carga más baja medida. `exponent` es log(tiempo) / log(eventos)
+    entre esa carga y la actual: 1 si el coste crece linealmente con los
+    eventos, más de 1 si cada evento se encarece al aumentar la carga.
+    """
+    summary = {}
+    for case in dict.fromkeys(result['case'] for result in results):
+        rows = {}
+        for load in sorted({result['load'] for result in results if result['case'] == case}):
+            runs = [result for result in results if result['case'] == case and result['load'] == load]
+            ok = [run for run in runs if run['status'] == 'ok']
+            if not ok:
+                rows[load] = {'status': runs[0]['status']}
+                continue
+            rows[load] = {
+                'status': 'ok',
+                'wall_time': statistics.median(run['wall_time'] for run in ok),
+                'events': ok[0]['events'],
+                'events_per_second': statistics.median(run['events_per_second'] for run in ok),
+                'peak_rss_mb': max((run['peak_rss_mb'] for run in ok if run['peak_rss_mb'] is not None), default=None),
+            }
+        measured = [row for row in rows.values() if row['status'] == 'ok']
+        if measured:
+            base = measured[0]
+            for row in measured:
+                row['time_ratio'] = row['wall_time'] / base['wall_time']
+                row['events_ratio'] = row['events'] / base['events']
+                if row['events_ratio'] > 1:
+                    row['exponent'] = math.log(row['time_ratio']) / math.log(row['events_ratio'])
+        summary[case] = {str(load): row for load, row in rows.items()}
+    return summary
+
+
+def metadata():
+    """Contexto de la medida, para poder comparar resultados de distintos commits y máquinas."""
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], capture_output=True, text=True, cwd=FOLDER, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(status) if status is not None else None,
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'simpy': simpy.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def print_summary(summary):
+    print(f"\n{'caso':<27} {'carga':>6} {'eventos':>11} {'tiempo (s)':>11} {'eventos/s':>11} {'RSS (MB)':>9} {'exponente':>10}")
+    for case, rows in summary.items():
+        for load, row in rows.items():
+            if row['status'] != 'ok':
+                print(f"{case:<27} {'x' + load:>6} {row['status']:>11}")
+                continue
+            rss = f"{row['peak_rss_mb']:.0f}" if row['peak_rss_mb'] is not None else '-'
+            exponent = f"{row['exponent']:.2f}" if 'exponent' in row else '-'
+            print(f"{case:<27} {'x' + load:>6} {row['events']:>11} {row['wall_time']:>11.3f} "
+                  f"{row['events_per_second']:>11,.0f} {rss:>9} {exponent:>10}")
+
+
+def compare(summary, baseline, tolerance=TOLERANCE):
+    """
+    Compara los eventos/s con un fichero de resultados anterior. Devuelve las
+    regresiones: pares (caso, carga) cuyo rendimiento cae más de `tolerance`.
+    """
+    regressions = []
+    print(f"\nComparación con {baseline['metadata'].get('commit') or 'la referencia'}:")
+    for case, rows in summary.items():
+        for load, row in rows.items():
+            reference = baseline['summary'].get(case, {}).get(load)
+            if row['status'] != 'ok' or not reference or reference['status'] != 'ok':
+                continue
+            ratio = row['events_per_second'] / reference['events_per_second']
+            flag = ''
+            if ratio < 1 - tolerance:
+                flag = '  <-- regresión'
+                regressions.append((case, load))
+            print(f"  {case:<27} {'x' + load:>6} {ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks de los modelos de simulación')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES), help='Casos a medir (todos por defecto)')
+    parser.add_argument('--loads', nargs='+', type=int, default=LOADS, help='Factores de carga')
+    parser.add_argument('--repeat', type=int, default=1, help='Repeticiones de cada medida (se guarda la mediana)')
+    parser.add_argument('--seed', type=int, default=SEED, help='Semilla de todas las ejecuciones')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help='Tiempo máximo de cada ejecución (segundos)')
+    parser.add_argument('--output', help='Fichero JSON de resultados (por defecto resultados/<commit>.json)')
+    parser.add_argument('--compare', help='Fichero JSON de resultados anterior con el que comparar')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='Caída relativa de eventos/s que se considera regresión')
+    parser.add_argument('--worker', nargs=3, metavar=('CASE', 'LOAD', 'SEED'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        case, load, seed = args.worker
+        worker(case, int(load), int(seed))
+        return
+
+    results = []
+    for case in args.cases:
+        for load in args.loads:
+            for _ in range(args.repeat):
+                result = run_case(case, load, args.seed, args.timeout)
+                status = f"{result['wall_time']:.3f} s" if result['status'] == 'ok' else result['status']
+                print(f"{case} x{load}: {status}", flush=True)
+                results.append(result)
+    summary = summarize(results)
+    print_summary(summary)
+
+    info = metadata()
+    output = args.output or os.path.join(FOLDER, 'resultados', f"{(info['commit'] or 'local')[:10]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    config = {'cases': args.cases, 'loads': args.loads, 'repeat': args.repeat, 'seed': args.seed, 'timeout': args.timeout}
+    with open(output, 'w') as file:
+        json.dump({'metadata': info, 'config': config, 'summary': summary, 'results': results}, file, indent=2)
+    print(f"\nResultados guardados en {output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(summary, json.load(file), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import atexit
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import simpy
+
+# Raíz del repositorio (los modelos se cargan desde sus carpetas)
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Lado (en nodos) de la cuadrícula sintética de calles para red-02
+GRID_SIZE = 30
+
+
+def load_script(path):
+    """
+    Importa un script del repositorio (p. ej. 'parking/parking-02.py') como
+    módulo, con su carpeta en sys.path y como directorio de trabajo, igual
+    que al ejecutarlo desde ella. Los scripts tienen `main()` protegido, así
+    que importarlos no ejecuta la simulación.
+    """
+    path = os.path.abspath(os.path.join(ROOT, path))
+    folder = os.path.dirname(path)
+    sys.path.insert(0, folder)
+    os.chdir(folder)
+    name = os.path.splitext(os.path.basename(path))[0].replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def processed_events(env):
+    """
+    Eventos procesados por el entorno: SimPy numera cada evento planificado
+    con un contador, así que son los planificados menos los que quedan en
+    la cola. No añade ningún coste a la simulación medida.
+    """
+    return next(env._eid) - len(env._queue)
+
+
+def grid_geojson(path, size=GRID_SIZE, spacing=1.0):
+    """Escribe una cuadrícula de size x size calles (una LineString por fila y por columna)."""
+    coords = np.arange(size) * spacing
+    features = []
+    for value in coords:
+        row = [[float(x), float(value)] for x in coords]
+        column = [[float(value), float(y)] for y in coords]
+        for line in (row, column):
+            features.append({'type': 'Feature', 'properties': {}, 'geometry': {'type': 'LineString', 'coordinates': line}})
+    with open(path, 'w') as file:
+        json.dump({'type': 'FeatureCollection', 'features': features}, file)
+
+
+# Cada caso recibe el factor de carga, prepara el modelo (importaciones,
+# ficheros de entrada) y devuelve la función run(seed) que se cronometra,
+# que ejecuta la simulación sin gráficos y devuelve el entorno.
+
+def sioux_falls(load):
+    """Red de Sioux Falls (visualizacion-escenarios) sin OpenCV; la carga divide el tiempo entre llegadas de cada enlace."""
+    sys.path.insert(0, os.path.join(ROOT, 'visualizacion-escenarios'))
+    from simulation.simulation import Simulation
+    from simulation.network_data import NetworkData
+
+    def run(seed):
+        np.random.seed(seed)
+        env = simpy.Environment()
+        sim = Simulation(env, None)
+        network_data = NetworkData(0.0025)
+        network_data.flambda = network_data.flambda / load
+        sim.loadNetwork(network_data)
+        env.run()
+        return env
+    return run
+
+
+def linea_guagua(load):
+    """linea-guagua-03; la carga multiplica la tasa de llegada de pasajeros."""
+    module = load_script('linea-guagua/linea-guagua-03.py')
+    return lambda seed: module.run_simulation(demand=load, seed=seed)[0]
+
+
+def recarga_vehiculos(load):
+    """recarga-vehiculos-08; la carga divide el tiempo medio entre llegadas de vehículos."""
+    module = load_script('recarga-vehiculos/recarga-vehiculos-08.py')
+    return lambda seed: module.run_simulation(inter_arrival_time=module.INTER_ARRIVAL_TIME / load, seed=seed)
+
+
+def parking(load):
+    """parking-02; la carga divide el intervalo entre llegadas de vehículos."""
+    module = load_script('parking/parking-02.py')
+    return lambda seed: module.run_simulation(arrival_interval=module.ARRIVAL_INTERVAL / load, seed=seed)[0]
+
+
+def interseccion_semaforos(load):
+    """interseccion-semaforos-04; la carga divide el tiempo medio entre llegadas de vehículos."""
+    module = load_script('interseccion-semaforos/interseccion-semaforos-04.py')
+    return lambda seed: module.run_simulation(inter_arrival_time=module.INTER_ARRIVAL_TIME / load, seed=seed)[0]
+
+
+def bicicletas(load):
+    """bicicletas-01; la carga divide el tiempo medio entre solicitudes de bicicleta."""
+    module = load_script('bicicletas/bicicletas-01.py')
+    return lambda seed: module.simulate(demand_rate=module.DEMAND_RATE / load, seed=seed)[0]
+
+
+def red(load):
+    """red-02 sobre una cuadrícula sintética; la carga multiplica el número de vehículos."""
+    module = load_script('red/red-02.py')
+    # Carpeta temporal propia: el grafo se construye (y se guarda en caché) dentro de la ejecución medida
+    folder = tempfile.mkdtemp(prefix='benchmark-red-')
+    atexit.register(shutil.rmtree, folder, True)
+    geojson_file = os.path.join(folder, 'grid.geojson')
+    grid_geojson(geojson_file)
+    return lambda seed: module.run_simulation(geojson_file, num_vehicles=module.NUM_VEHICLES * load, seed=seed)[0]
+
+
+CASES = {
+    'sioux-falls': sioux_falls,
+    'linea-guagua-03': linea_guagua,
+    'recarga-vehiculos-08': recarga_vehiculos,
+    'parking-02': parking,
+    'interseccion-semaforos-04': interseccion_semaforos,
+    'bicicletas-01': bicicletas,
+    'red-02': red,
+}
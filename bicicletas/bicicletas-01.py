@@ -1,7 +1,11 @@
+import os
+import sys
 import simpy
 import random
 import pandas as pd
 import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.analisis_salida import steady_state
 
 # Definir constantes
 NUM_STATIONS = 8  # Define el número de estaciones de bicicletas disponibles en el sistema. Considera ajustar este valor para simular diferentes densidades de estaciones en la ciudad.
@@ -53,12 +57,18 @@ class UrbanMobility:
             self.env.process(self.request_bike(user_id, station_id))
             user_id += 1
 
-# Definir una función para ejecutar la simulación y visualizar los resultados
-def run_simulation(num_stations=NUM_STATIONS, num_bikes=NUM_BIKES, demand_rate=DEMAND_RATE, sim_time=SIM_TIME):
+# Ejecutar la simulación sin mostrar resultados (se usa también desde los benchmarks)
+def simulate(num_stations=NUM_STATIONS, num_bikes=NUM_BIKES, demand_rate=DEMAND_RATE, sim_time=SIM_TIME, seed=None):
+    random.seed(seed)
     env = simpy.Environment()
     urban_mobility = UrbanMobility(env, num_stations, num_bikes, demand_rate)
     env.process(urban_mobility.generate_users())
     env.run(until=sim_time)
+    return env, urban_mobility
+
+# Definir una función para ejecutar la simulación y visualizar los resultados
+def run_simulation(num_stations=NUM_STATIONS, num_bikes=NUM_BIKES, demand_rate=DEMAND_RATE, sim_time=SIM_TIME):
+    env, urban_mobility = simulate(num_stations, num_bikes, demand_rate, sim_time)
 
     # Crear un DataFrame a partir de los resultados
     df = pd.DataFrame(urban_mobility.data)
@@ -66,6 +76,9 @@ def run_simulation(num_stations=NUM_STATIONS, num_bikes=NUM_BIKES, demand_rate=D
     # Mostrar métricas de interés
     print("\nEstadísticas de la simulación:\n")
     print(df.describe())
+    # Tiempo de espera sin el arranque con todas las bicicletas en su estación (MSER-5), por orden de solicitud
+    wait_times = df.sort_values('arrival_time')['wait_time']
+    print(f"\nTiempo de espera en régimen estacionario: {steady_state(wait_times)}")
 
     # Visualizar el tiempo de espera y duración de los trayectos
     plt.figure(figsize=(14, 5))
@@ -97,4 +110,5 @@ def run_simulation(num_stations=NUM_STATIONS, num_bikes=NUM_BIKES, demand_rate=D
     plt.show()
 
 # Ejecutar la simulación
-run_simulation()
+if __name__ == '__main__':
+    run_simulation()
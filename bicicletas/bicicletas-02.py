@@ -0,0 +1,79 @@
+import simpy
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from inventario import BikeSystem, RebalancingTruck, COMPLETED, NO_BIKE, REDIRECTED, gravity_od, random_layout
+
+# Definir constantes
+NUM_STATIONS = 500  # Número de estaciones de la red.
+NUM_DOCKS = 20  # Anclajes de cada estación: es el máximo de bicicletas que caben en ella.
+NUM_BIKES = 10  # Bicicletas de cada estación al comenzar la simulación.
+CITY_SIZE = 10  # Lado (km) del cuadrado en el que se reparten las estaciones.
+TRIP_RATE = 20  # Viajes solicitados por minuto en toda la red.
+TRIP_SCALE = 1.5  # Distancia característica (km) de los viajes en el modelo gravitatorio.
+BIKE_SPEED = 0.25  # Velocidad media de las bicicletas (km/min).
+NUM_TRUCKS = 3  # Camiones de reequilibrado.
+TRUCK_CAPACITY = 20  # Bicicletas que caben en un camión.
+SIM_TIME = 1440  # Tiempo total de simulación (min).
+RANDOM_SEED = 42
+
+
+# Ejecutar una simulación y devolver el sistema y los viajes registrados
+def run_simulation(num_stations=NUM_STATIONS, num_docks=NUM_DOCKS, num_bikes=NUM_BIKES, trip_rate=TRIP_RATE,
+                   num_trucks=NUM_TRUCKS, sim_time=SIM_TIME, seed=RANDOM_SEED):
+    rng = np.random.default_rng(seed)
+    env = simpy.Environment()
+    coords = random_layout(num_stations, CITY_SIZE, rng)
+    od = gravity_od(coords, trip_rate, TRIP_SCALE, rng)
+    system = BikeSystem(env, coords, num_docks, num_bikes, od, rng, speed=BIKE_SPEED)
+    trucks = [RebalancingTruck(env, system, capacity=TRUCK_CAPACITY, start=int(rng.integers(num_stations)))
+              for _ in range(num_trucks)]
+    env.process(system.generate_trips())
+    env.run(until=sim_time)
+    return system, trucks, pd.DataFrame(system.trips.arrays())
+
+
+def print_results(system, trucks, trips):
+    status = trips['status'].value_counts()
+    requested = len(trips)
+    print("\nResultados de la simulación:\n")
+    print(f"Viajes solicitados: {requested}")
+    print(f"Viajes completados en su destino: {status.get(COMPLETED, 0)}")
+    print(f"Viajes perdidos por estación vacía: {status.get(NO_BIKE, 0)} ({status.get(NO_BIKE, 0) / requested:.1%})")
+    print(f"Devoluciones desviadas por estación llena: {status.get(REDIRECTED, 0)} ({status.get(REDIRECTED, 0) / requested:.1%})")
+    print(f"Tiempo medio con la estación vacía: {system.empty_fraction().mean():.1%}")
+    print(f"Tiempo medio con la estación llena: {system.full_fraction().mean():.1%}")
+    print(f"Bicicletas movidas por los camiones: {sum(truck.moved for truck in trucks)}")
+
+
+def plot_results(system):
+    empty = system.empty_fraction()
+    full = system.full_fraction()
+    order = np.argsort(empty - full)
+    stations = np.arange(len(order))
+
+    plt.figure(figsize=(14, 5))
+
+    plt.subplot(1, 2, 1)
+    plt.bar(stations, 100 * empty[order], width=1, alpha=0.7, label='Vacía')
+    plt.bar(stations, -100 * full[order], width=1, alpha=0.7, label='Llena')
+    plt.xlabel('Estación (ordenadas)')
+    plt.ylabel('% del tiempo')
+    plt.title('Tiempo con la estación vacía o llena')
+    plt.legend()
+
+    plt.subplot(1, 2, 2)
+    plt.scatter(system.coords[:, 0], system.coords[:, 1], c=100 * (empty - full), cmap='coolwarm', s=15)
+    plt.colorbar(label='% vacía - % llena')
+    plt.xlabel('x (km)')
+    plt.ylabel('y (km)')
+    plt.title('Estaciones con problemas de inventario')
+
+    plt.tight_layout()
+    plt.show()
+
+
+if __name__ == '__main__':
+    system, trucks, trips = run_simulation()
+    print_results(system, trucks, trips)
+    plot_results(system)
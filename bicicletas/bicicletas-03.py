@@ -0,0 +1,40 @@
+import os
+import matplotlib.pyplot as plt
+from escenarios import run_scenarios, scenario_grid, scenario_kpis
+
+# Definir constantes
+STATIONS_GRID = [100, 200]  # Número de estaciones de cada escenario.
+BIKES_GRID = [4, 6, 8, 10, 12]  # Bicicletas por estación al comenzar la simulación.
+DEMAND_GRID = [5, 10]  # Viajes solicitados por minuto en toda la red.
+NUM_DOCKS = 20  # Anclajes de cada estación.
+NUM_TRUCKS = 2  # Camiones de reequilibrado.
+SIM_TIME = 1440  # Tiempo total de simulación de cada réplica (min).
+REPLICATIONS = 3  # Réplicas de cada escenario.
+RANDOM_SEED = 42
+DATASET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'viajes')  # Carpeta del dataset Parquet con los viajes de todas las réplicas.
+WORKERS = None  # Procesos del pool (None: uno por núcleo).
+
+
+def plot_kpis(kpis):
+    plt.figure(figsize=(14, 5))
+    for position, (column, title) in enumerate([('lost_rate', 'Viajes perdidos por estación vacía'),
+                                                ('redirected_rate', 'Devoluciones desviadas por estación llena')], 1):
+        plt.subplot(1, 2, position)
+        for (stations, demand), group in kpis.groupby(['num_stations', 'demand_rate']):
+            plt.plot(group['num_bikes'], 100 * group[column], marker='o', label=f'{stations} estaciones, {demand} viajes/min')
+        plt.xlabel('Bicicletas por estación')
+        plt.ylabel('% de los viajes')
+        plt.title(title)
+        plt.legend()
+    plt.tight_layout()
+    plt.show()
+
+
+if __name__ == '__main__':
+    grid = scenario_grid(STATIONS_GRID, BIKES_GRID, DEMAND_GRID, num_docks=NUM_DOCKS, num_trucks=NUM_TRUCKS,
+                         sim_time=SIM_TIME)
+    stations = run_scenarios(grid, DATASET_DIR, replications=REPLICATIONS, seed=RANDOM_SEED, workers=WORKERS)
+    kpis = scenario_kpis(grid, DATASET_DIR, stations)
+    print("\nIndicadores por escenario (media de las réplicas):\n")
+    print(kpis.drop(columns=['num_docks', 'num_trucks', 'sim_time']).round(3).to_string())
+    plot_kpis(kpis)
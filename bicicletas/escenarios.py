@@ -0,0 +1,127 @@
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import simpy
+
+from inventario import BikeSystem, RebalancingTruck, NO_BIKE, REDIRECTED, COMPLETED, gravity_od, random_layout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.replicaciones import seed_streams
+
+
+def scenario_grid(num_stations, num_bikes, demand_rates, **fixed):
+    """
+    Tabla con una fila por combinación de (estaciones, bicicletas por
+    estación, viajes por minuto). Los parámetros de `fixed` (anclajes,
+    camiones, duración...) se repiten en todas las filas.
+    """
+    rows = [dict(num_stations=s, num_bikes=b, demand_rate=d, **fixed)
+            for s, b, d in itertools.product(num_stations, num_bikes, demand_rates)]
+    grid = pd.DataFrame(rows)
+    grid.index.name = 'scenario_id'
+    return grid
+
+
+def simulate(num_stations, num_bikes, demand_rate, seed, num_docks=20, city_size=10, trip_scale=1.5, bike_speed=0.25,
+             num_trucks=3, truck_capacity=20, sim_time=1440):
+    rng = np.random.default_rng(seed)
+    env = simpy.Environment()
+    coords = random_layout(num_stations, city_size, rng)
+    od = gravity_od(coords, demand_rate, trip_scale, rng)
+    system = BikeSystem(env, coords, num_docks, num_bikes, od, rng, speed=bike_speed)
+    for _ in range(num_trucks):
+        RebalancingTruck(env, system, capacity=truck_capacity, start=int(rng.integers(num_stations)))
+    env.process(system.generate_trips())
+    env.run(until=sim_time)
+    return system
+
+
+def run_task(task):
+    """
+    Ejecuta una réplica de un escenario (en un proceso del pool), escribe sus
+    viajes en `dataset_dir/scenario_id=<id>/replication-<r>.parquet` y
+    devuelve los indicadores por estación, que no están en los viajes.
+    """
+    scenario_id, replication, seed, params, dataset_dir = task
+    system = simulate(seed=seed, **params)
+    table = pa.table(system.trips.arrays())
+    table = table.append_column('replication', pa.array(np.full(table.num_rows, replication, dtype=np.int16)))
+    partition = os.path.join(dataset_dir, f'scenario_id={scenario_id}')
+    os.makedirs(partition, exist_ok=True)
+    pq.write_table(table, os.path.join(partition, f'replication-{replication}.parquet'))
+    return {
+        'scenario_id': scenario_id,
+        'replication': replication,
+        'empty_time': system.empty_fraction().mean(),
+        'full_time': system.full_fraction().mean(),
+    }
+
+
+def clear_dataset(dataset_dir):
+    """
+    Borra los viajes que dejó en `dataset_dir` una ejecución anterior: solo
+    los ficheros replication-<r>.parquet de las particiones scenario_id=<id>.
+    Si la carpeta contiene cualquier otra cosa no es un dataset de
+    escenarios y no se toca nada.
+    """
+    if not os.path.exists(dataset_dir):
+        return
+    partitions = os.listdir(dataset_dir)
+    foreign = [name for name in partitions
+               if not (name.startswith('scenario_id=') and os.path.isdir(os.path.join(dataset_dir, name)))]
+    foreign += [os.path.join(name, file) for name in partitions if name not in foreign
+                for file in os.listdir(os.path.join(dataset_dir, name))
+                if not (file.startswith('replication-') and file.endswith('.parquet'))]
+    if foreign:
+        raise ValueError(f"{dataset_dir} no es un dataset de escenarios (contiene {', '.join(sorted(foreign))})")
+    for name in partitions:
+        partition = os.path.join(dataset_dir, name)
+        for file in os.listdir(partition):
+            os.remove(os.path.join(partition, file))
+        os.rmdir(partition)
+
+
+def run_scenarios(grid, dataset_dir, replications=1, seed=None, workers=None):
+    """
+    Ejecuta todas las réplicas de todos los escenarios de `grid` en un pool
+    de procesos. Los viajes quedan en un dataset Parquet particionado por
+    escenario; se devuelve una tabla con los indicadores por estación de
+    cada réplica. Cada réplica recibe una semilla propia derivada de `seed`.
+    Los viajes de una ejecución anterior en `dataset_dir` se borran.
+    """
+    clear_dataset(dataset_dir)
+    seeds = seed_streams(seed, len(grid) * replications)
+    tasks = [(scenario_id, replication, seeds[i * replications + replication], params, dataset_dir)
+             for i, (scenario_id, params) in enumerate(grid.to_dict('index').items())
+             for replication in range(replications)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        stations = list(pool.map(run_task, tasks))
+    return pd.DataFrame(stations)
+
+
+def scenario_kpis(grid, dataset_dir, stations):
+    """
+    Indicadores agregados de cada escenario (media de sus réplicas),
+    calculados con group-bys vectorizados sobre el dataset de viajes.
+    """
+    trips = pd.read_parquet(dataset_dir, columns=['scenario_id', 'replication', 'request_time', 'end_time', 'status'])
+    trips['scenario_id'] = trips['scenario_id'].astype(int)
+    completed = trips['status'] == COMPLETED
+    trips['lost'] = trips['status'] == NO_BIKE
+    trips['redirected'] = trips['status'] == REDIRECTED
+    trips['trip_time'] = (trips['end_time'] - trips['request_time']).where(completed)
+    per_replication = trips.groupby(['scenario_id', 'replication']).agg(
+        requested=('status', 'size'),
+        lost_rate=('lost', 'mean'),
+        redirected_rate=('redirected', 'mean'),
+        mean_trip_time=('trip_time', 'mean'),
+    ).reset_index()
+    per_replication = per_replication.merge(stations, on=['scenario_id', 'replication'])
+    kpis = per_replication.drop(columns='replication').groupby('scenario_id').mean()
+    return grid.join(kpis)
@@ -0,0 +1,271 @@
+import os
+import sys
+
+import numpy as np
+import simpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.estadisticas import TimeWeightedAccumulator
+
+# Estado final de cada viaje en el registro
+COMPLETED = 0  # Bicicleta devuelta en la estación de destino
+NO_BIKE = 1  # El usuario encontró la estación vacía y se marchó sin bicicleta
+REDIRECTED = 2  # Destino lleno: devuelta en otra estación cercana
+IN_PROGRESS = 3  # Viaje sin terminar al acabar la simulación
+
+
+class Station:
+    """
+    Estación con un número fijo de anclajes. Las bicicletas son un
+    `simpy.Container` cuya capacidad es el número de anclajes, de modo que
+    una estación puede quedarse vacía (no se puede alquilar) o llena (no se
+    puede devolver). El tiempo que pasa vacía y llena se acumula ponderado
+    en el tiempo.
+    """
+    def __init__(self, env, station_id, docks, bikes):
+        self.env = env
+        self.station_id = station_id
+        self.docks = docks
+        self.bikes = simpy.Container(env, capacity=docks, init=bikes)
+        self.empty = TimeWeightedAccumulator(env, initial=int(bikes == 0))
+        self.full = TimeWeightedAccumulator(env, initial=int(bikes == docks))
+
+    def _changed(self):
+        level = self.bikes.level
+        self.empty.update(int(level == 0))
+        self.full.update(int(level == self.docks))
+
+    def take(self, amount=1):
+        """Retira bicicletas (deben estar disponibles); devuelve el evento del contenedor."""
+        event = self.bikes.get(amount)
+        self._changed()
+        return event
+
+    def give(self, amount=1):
+        """Deja bicicletas (debe haber anclajes libres); devuelve el evento del contenedor."""
+        event = self.bikes.put(amount)
+        self._changed()
+        return event
+
+    def store(self, amount=1):
+        """Espera hasta que haya anclajes libres suficientes y deja las bicicletas."""
+        yield self.bikes.put(amount)
+        self._changed()
+
+
+class TripLog:
+    """Registro de viajes en vectores preasignados que crecen por duplicación."""
+    FIELDS = ('request_time', 'origin', 'destination', 'end_station', 'end_time', 'status')
+
+    def __init__(self, capacity=4096):
+        self.size = 0
+        self.request_time = np.empty(capacity)
+        self.origin = np.empty(capacity, dtype=np.int32)
+        self.destination = np.empty(capacity, dtype=np.int32)
+        self.end_station = np.full(capacity, -1, dtype=np.int32)
+        self.end_time = np.full(capacity, np.nan)
+        self.status = np.full(capacity, IN_PROGRESS, dtype=np.int8)
+
+    def _grow(self):
+        size = len(self.request_time)
+        self.request_time = np.resize(self.request_time, 2 * size)
+        self.origin = np.resize(self.origin, 2 * size)
+        self.destination = np.resize(self.destination, 2 * size)
+        self.end_station = np.concatenate([self.end_station, np.full(size, -1, dtype=np.int32)])
+        self.end_time = np.concatenate([self.end_time, np.full(size, np.nan)])
+        self.status = np.concatenate([self.status, np.full(size, IN_PROGRESS, dtype=np.int8)])
+
+    def start(self, time, origin, destination):
+        if self.size == len(self.request_time):
+            self._grow()
+        trip = self.size
+        self.request_time[trip] = time
+        self.origin[trip] = origin
+        self.destination[trip] = destination
+        self.size += 1
+        return trip
+
+    def finish(self, trip, time, station, status):
+        self.end_time[trip] = time
+        self.end_station[trip] = station
+        self.status[trip] = status
+
+    def arrays(self):
+        """Diccionario {campo: vector} con los viajes registrados, listo para pd.DataFrame."""
+        return {field: getattr(self, field)[:self.size] for field in self.FIELDS}
+
+
+def random_layout(num_stations, size, rng):
+    """Coordenadas (km) de las estaciones, repartidas al azar en un cuadrado de lado `size`."""
+    return rng.uniform(0, size, (num_stations, 2))
+
+
+def gravity_od(coords, total_rate, scale, rng, attraction=None):
+    """
+    Matriz origen-destino de viajes por minuto según un modelo gravitatorio:
+    la demanda entre dos estaciones decrece exponencialmente con la
+    distancia (`scale`, km) y es proporcional al atractivo del destino.
+    """
+    distances = np.hypot(*(coords[:, None, :] - coords[None, :, :]).transpose(2, 0, 1))
+    if attraction is None:
+        attraction = rng.lognormal(0, 0.5, len(coords))
+    weights = attraction[None, :] * np.exp(-distances / scale)
+    np.fill_diagonal(weights, 0)
+    return total_rate * weights / weights.sum()
+
+
+class BikeSystem:
+    """
+    Sistema de bicicletas con inventario por estación.
+
+    Toda la demanda se genera con un único proceso de llegadas: los viajes
+    llegan a tasa total sum(od) y cada uno elige su par origen-destino con
+    probabilidad proporcional a la matriz OD. Los intervalos y los pares se
+    sortean por bloques con NumPy, por lo que el coste no depende del número
+    de estaciones. Si el origen está vacío el viaje se pierde; si el destino
+    está lleno el usuario prueba las `neighbours` estaciones más cercanas y,
+    si todas están llenas, vuelve a su destino y espera allí un anclaje libre.
+    """
+    def __init__(self, env, coords, docks, bikes, od, rng, speed=0.25, neighbours=5, block=4096):
+        self.env = env
+        self.coords = coords
+        self.od = od
+        self.rng = rng
+        self.speed = speed  # km/min
+        self.block = block
+        num_stations = len(coords)
+        docks = np.broadcast_to(docks, num_stations)
+        bikes = np.broadcast_to(bikes, num_stations)
+        self.stations = [Station(env, i, int(docks[i]), int(bikes[i])) for i in range(num_stations)]
+        self.distances = np.hypot(*(coords[:, None, :] - coords[None, :, :]).transpose(2, 0, 1))
+        # Estaciones alternativas para devolver la bicicleta, de la más cercana a la más lejana
+        self.nearest = np.argsort(self.distances, axis=1)[:, 1:neighbours + 1]
+        self.total_rate = od.sum()
+        self.cumulative = np.cumsum(od.ravel()) / self.total_rate
+        self.trips = TripLog()
+
+    def levels(self):
+        return np.array([station.bikes.level for station in self.stations])
+
+    def ride_time(self, origin, destination):
+        # Trayecto a velocidad media con una variabilidad del 20%
+        return self.distances[origin, destination] / self.speed * self.rng.gamma(25, 1 / 25) + 1
+
+    def generate_trips(self):
+        num_stations = len(self.stations)
+        while True:
+            gaps = self.rng.exponential(1 / self.total_rate, self.block)
+            pairs = np.searchsorted(self.cumulative, self.rng.random(self.block), side='right')
+            pairs = np.minimum(pairs, len(self.cumulative) - 1)
+            for gap, pair in zip(gaps.tolist(), pairs.tolist()):
+                yield self.env.timeout(gap)
+                origin, destination = divmod(pair, num_stations)
+                self.start_trip(origin, destination)
+
+    def start_trip(self, origin, destination):
+        trip = self.trips.start(self.env.now, origin, destination)
+        station = self.stations[origin]
+        if station.bikes.level == 0:
+            self.trips.finish(trip, self.env.now, origin, NO_BIKE)
+            return
+        station.take()
+        self.env.process(self.ride(trip, origin, destination))
+
+    def ride(self, trip, origin, destination):
+        yield self.env.timeout(self.ride_time(origin, destination))
+        station = self.stations[destination]
+        if station.bikes.level < station.docks:
+            station.give()
+            self.trips.finish(trip, self.env.now, destination, COMPLETED)
+            return
+        position = destination
+        for alternative in self.nearest[destination].tolist():
+            yield self.env.timeout(self.distances[position, alternative] / self.speed)
+            station = self.stations[alternative]
+            if station.bikes.level < station.docks:
+                station.give()
+                self.trips.finish(trip, self.env.now, alternative, REDIRECTED)
+                return
+            position = alternative
+        # Todas llenas: vuelve a su destino y espera allí un anclaje libre
+        yield self.env.timeout(self.distances[position, destination] / self.speed)
+        yield from self.stations[destination].store()
+        self.trips.finish(trip, self.env.now, destination, COMPLETED)
+
+    def empty_fraction(self):
+        return np.array([station.empty.mean() for station in self.stations])
+
+    def full_fraction(self):
+        return np.array([station.full.mean() for station in self.stations])
+
+
+class RebalancingTruck:
+    """
+    Camión de reequilibrado. En cada ronda recoge bicicletas de la estación
+    más por encima de su objetivo y las lleva a la más por debajo. El
+    objetivo es una fracción `target` de los anclajes de cada estación, y
+    solo se actúa si la desviación supera `threshold` bicicletas.
+    """
+    def __init__(self, env, system, capacity=20, speed=0.5, handling_time=0.5, target=0.5, threshold=3, idle_time=15,
+                 start=0):
+        self.env = env
+        self.system = system
+        self.capacity = capacity
+        self.speed = speed  # km/min
+        self.handling_time = handling_time  # min por bicicleta cargada o descargada
+        self.targets = np.array([station.docks for station in system.stations]) * target
+        self.threshold = threshold
+        self.idle_time = idle_time
+        self.position = start
+        self.moved = 0
+        self.rounds = 0
+        env.process(self.run())
+
+    def drive(self, station_id):
+        yield self.env.timeout(self.system.distances[self.position, station_id] / self.speed)
+        self.position = station_id
+
+    def run(self):
+        stations = self.system.stations
+        while True:
+            surplus = self.system.levels() - self.targets
+            source, sink = int(np.argmax(surplus)), int(np.argmin(surplus))
+            if surplus[source] < self.threshold or -surplus[sink] < self.threshold:
+                yield self.env.timeout(self.idle_time)
+                continue
+            self.rounds += 1
+            yield from self.drive(source)
+            # El inventario ha podido cambiar durante el trayecto
+            load = min(self.capacity, int(stations[source].bikes.level - self.targets[source]))
+            if load <= 0:
+                continue
+            stations[source].take(load)
+            yield self.env.timeout(load * self.handling_time)
+            yield from self.drive(sink)
+            free = stations[sink].docks - stations[sink].bikes.level
+            unload = min(load, free)
+            if unload > 0:
+                stations[sink].give(unload)
+                yield self.env.timeout(unload * self.handling_time)
+                self.moved += unload
+            # Lo que no cabe se reparte entre las estaciones más vacías que tengan anclajes libres
+            rest = load - unload
+            while rest > 0:
+                levels = self.system.levels()
+                free = np.array([s.docks for s in stations]) - levels
+                candidates = np.flatnonzero(free > 0)
+                if len(candidates) == 0:
+                    # Ninguna estación tiene sitio: espera en la más vacía a que se liberen anclajes
+                    other = int(np.argmin(levels))
+                    yield from self.drive(other)
+                    yield from stations[other].store(rest)
+                    yield self.env.timeout(rest * self.handling_time)
+                    break
+                other = int(candidates[np.argmin(levels[candidates])])
+                yield from self.drive(other)
+                # El inventario ha podido cambiar durante el trayecto
+                unload = min(rest, stations[other].docks - stations[other].bikes.level)
+                if unload > 0:
+                    stations[other].give(unload)
+                    yield self.env.timeout(unload * self.handling_time)
+                    rest -= unload
@@ -1,11 +1,27 @@
 import simpy
 import random
 import statistics
+from herramientas.calendario import Calendar
 
 # Parámetros de la simulación
 TIEMPO_SIMULACION = 120  # Duración de la simulación (minutos)
-TIEMPO_CRUZAR_SEMAFORO = 10  # Tiempo promedio para cruzar un semáforo (segundos)
-PROBABILIDAD_EMBOTELLAMIENTO = 0.2  # Probabilidad de embotellamiento en puntos críticos
+HORA_INICIO = 7  # Hora del día a la que comienza la simulación (el reloj de la simulación va en segundos)
+RANDOM_SEED = 42
+
+# Corredor: tramos de la ciclovía (metros) con un semáforo al final de cada uno, salvo el último
+TRAMOS = [300, 450, 250, 400]
+VELOCIDAD_MEDIA = 4.5  # Velocidad media de los ciclistas (m/s)
+VELOCIDAD_DESVIACION = 0.6  # Desviación típica de la velocidad (m/s)
+
+# Semáforos
+CICLO = 90  # Duración del ciclo de todos los semáforos (segundos)
+VERDE = 40  # Duración del verde (segundos)
+FLUJO_SATURACION = 0.5  # Ciclistas por segundo que cruzan la línea de parada al abrirse el verde
+VELOCIDAD_ONDA_VERDE = 4.5  # Velocidad (m/s) para la que se calculan los desfases de la onda verde
+COORDINADO = True  # Semáforos con desfases de onda verde (False: todos ponen el verde a la vez)
+
+# Estrechamientos de la ciclovía: tramo en cuyo final está -> capacidad (ciclistas por minuto)
+CUELLOS_BOTELLA = {1: 14, 3: 12}
 
 # Definimos las franjas horarias
 HORARIO_PICO = [(7, 9), (17, 19)]  # Horas de tráfico intenso
@@ -15,85 +31,192 @@ FLUJO_NORMAL = 2  # Ciclistas por minuto en horario normal
 # Lista para registrar tiempos de viaje
 tiempos_viaje = []
 
-def llegada_ciclistas(env, semaforos, embotellamientos, hora_pico):
+
+class Semaforo:
+    """
+    Semáforo con ciclo fijo y un desfase respecto al origen de tiempos.
+
+    Todos los ciclistas que esperan el verde esperan el mismo evento
+    compartido (`verde`), que se dispara una sola vez al comenzar cada verde
+    y libera al pelotón completo. A continuación cruzan la línea de parada
+    al ritmo del flujo de saturación; quien no llega a cruzar antes del
+    final del verde espera al siguiente.
+    """
+    def __init__(self, env, desfase, ciclo=CICLO, verde=VERDE, flujo_saturacion=FLUJO_SATURACION):
+        self.env = env
+        self.desfase = desfase % ciclo
+        self.ciclo = ciclo
+        self.duracion_verde = verde
+        self.intervalo = 1 / flujo_saturacion
+        self.en_verde = False
+        self.fin_verde = 0
+        self.ultima_salida = -self.intervalo
+        self.verde = env.event()  # Evento del próximo inicio de verde
+        self.verdes = 0
+        self.detenciones = 0
+        env.process(self.funcionar())
+
+    def funcionar(self):
+        yield self.env.timeout(self.desfase)
+        while True:
+            self.en_verde = True
+            self.fin_verde = self.env.now + self.duracion_verde
+            evento, self.verde = self.verde, self.env.event()
+            evento.succeed()
+            self.verdes += 1
+            yield self.env.timeout(self.duracion_verde)
+            self.en_verde = False
+            yield self.env.timeout(self.ciclo - self.duracion_verde)
+
+    def cruzar(self):
+        """
+        Proceso de un ciclista que llega a la línea de parada. Devuelve el
+        retardo que le queda hasta cruzarla, que se suma al siguiente tramo
+        en lugar de generar un evento propio.
+        """
+        detenido = False
+        while True:
+            if not self.en_verde:
+                detenido = True
+                yield self.verde
+            salida = max(self.env.now, self.ultima_salida + self.intervalo)
+            if salida < self.fin_verde:
+                break
+            # El pelotón no cabe en este verde: espera al siguiente
+            detenido = True
+            yield self.verde
+        self.ultima_salida = salida
+        if detenido:
+            self.detenciones += 1
+        return salida - self.env.now
+
+
+class CuelloBotella:
+    """
+    Estrechamiento con una capacidad máxima de paso (ciclistas por minuto).
+    Se modela como un flujo: cada ciclista sale un intervalo 1/capacidad
+    después del anterior, sin recurso ni cola explícita.
+    """
+    def __init__(self, env, capacidad):
+        self.env = env
+        self.intervalo = 60 / capacidad
+        self.ultima_salida = -self.intervalo
+        self.retardo_total = 0
+
+    def pasar(self):
+        salida = max(self.env.now, self.ultima_salida + self.intervalo)
+        self.ultima_salida = salida
+        self.retardo_total += salida - self.env.now
+        return salida - self.env.now
+
+
+def llegada_ciclistas(env, corredor, calendario):
     """
     Genera ciclistas de acuerdo a la franja horaria.
     """
     while True:
-        if any(h[0] <= env.now // 60 < h[1] for h in HORARIO_PICO):
-            # Más ciclistas en horas pico
-            tiempo_entre_ciclistas = random.expovariate(FLUJO_PICO / 60)
-        else:
-            # Flujo normal fuera de horas pico
-            tiempo_entre_ciclistas = random.expovariate(FLUJO_NORMAL / 60)
-        
+        # Más ciclistas en horas pico; los flujos son por minuto y el reloj va en segundos
+        flujo = calendario.by_period(FLUJO_PICO, FLUJO_NORMAL)
+        tiempo_entre_ciclistas = random.expovariate(flujo / calendario.minutes(1))
+
         yield env.timeout(tiempo_entre_ciclistas)
-        env.process(ciclista(env, semaforos, embotellamientos))
+        env.process(ciclista(env, corredor))
+
 
-def ciclista(env, semaforos, embotellamientos):
+def ciclista(env, corredor, verbose=False):
     """
-    Simula el trayecto de un ciclista por la ciclovía.
+    Simula el trayecto de un ciclista por la ciclovía: un evento por tramo,
+    más la espera del verde cuando llega con el semáforo en rojo.
     """
+    semaforos, cuellos = corredor
     hora_inicio = env.now
-    print(f"Ciclista comienza su trayecto a los {hora_inicio:.2f} segundos")
-
-    # Ciclista se enfrenta a varios semáforos en su trayecto
-    for semaforo in semaforos:
-        with semaforo.request() as req:
-            yield req
-            tiempo_espera_semaforo = random.expovariate(1.0 / TIEMPO_CRUZAR_SEMAFORO)
-            print(f"Ciclista espera {tiempo_espera_semaforo:.2f} segundos en el semáforo")
-            yield env.timeout(tiempo_espera_semaforo)
-    
-    # Posibilidad de embotellamiento en puntos críticos
-    for punto_critico in embotellamientos:
-        if random.uniform(0, 1) < PROBABILIDAD_EMBOTELLAMIENTO:
-            tiempo_espera_embotellamiento = random.expovariate(30)  # Retardo aleatorio
-            print(f"Embudo en punto crítico, ciclista espera {tiempo_espera_embotellamiento:.2f} segundos")
-            yield env.timeout(tiempo_espera_embotellamiento)
+    velocidad = max(1.0, random.gauss(VELOCIDAD_MEDIA, VELOCIDAD_DESVIACION))
+    if verbose:
+        print(f"Ciclista comienza su trayecto a los {hora_inicio:.2f} segundos")
+
+    retardo = 0
+    for tramo, longitud in enumerate(TRAMOS):
+        yield env.timeout(retardo + longitud / velocidad)
+        retardo = 0
+        if tramo in cuellos:
+            retardo += cuellos[tramo].pasar()
+        if tramo < len(semaforos):
+            if retardo:
+                yield env.timeout(retardo)
+                retardo = 0
+            retardo = yield from semaforos[tramo].cruzar()
+    if retardo:
+        yield env.timeout(retardo)
 
     hora_fin = env.now
     tiempo_total = hora_fin - hora_inicio
     tiempos_viaje.append(tiempo_total)
-    print(f"Ciclista termina su trayecto en {tiempo_total:.2f} segundos")
+    if verbose:
+        print(f"Ciclista termina su trayecto en {tiempo_total:.2f} segundos")
+
 
-def crear_semaforos(env, num_semaforos):
+def crear_semaforos(env, coordinado=COORDINADO):
     """
-    Crea los semáforos por los que pasan los ciclistas.
+    Crea un semáforo al final de cada tramo salvo el último. Con coordinación
+    el desfase de cada semáforo es el tiempo de recorrido hasta él a la
+    velocidad de la onda verde, de modo que un pelotón que sale con el verde
+    encuentra verdes los siguientes.
     """
-    return [simpy.Resource(env, capacity=1) for _ in range(num_semaforos)]
+    semaforos = []
+    distancia = 0
+    for longitud in TRAMOS[:-1]:
+        distancia += longitud
+        desfase = distancia / VELOCIDAD_ONDA_VERDE if coordinado else 0
+        semaforos.append(Semaforo(env, desfase))
+    return semaforos
+
 
-def crear_puntos_criticos(env, num_puntos):
+def crear_puntos_criticos(env):
     """
-    Crea los puntos críticos donde pueden ocurrir embotellamientos.
+    Crea los estrechamientos de la ciclovía a partir de su capacidad.
     """
-    return [simpy.Resource(env, capacity=1) for _ in range(num_puntos)]
+    return {tramo: CuelloBotella(env, capacidad) for tramo, capacidad in CUELLOS_BOTELLA.items()}
 
-def ejecutar_simulacion():
+
+def ejecutar_simulacion(coordinado=COORDINADO, semilla=RANDOM_SEED):
     """
     Configura y ejecuta la simulación.
     """
-    # Crear el entorno de SimPy
+    random.seed(semilla)
+    tiempos_viaje.clear()
+
+    # Crear el entorno de SimPy y su calendario (segundos desde HORA_INICIO)
     env = simpy.Environment()
+    calendario = Calendar(env, unit='s', start_hour=HORA_INICIO, peaks=HORARIO_PICO)
 
     # Crear semáforos y puntos críticos
-    semaforos = crear_semaforos(env, num_semaforos=3)  # Tres semáforos en la ruta
-    embotellamientos = crear_puntos_criticos(env, num_puntos=2)  # Dos puntos críticos
+    semaforos = crear_semaforos(env, coordinado)
+    cuellos = crear_puntos_criticos(env)
 
     # Iniciar la generación de ciclistas
-    env.process(llegada_ciclistas(env, semaforos, embotellamientos, HORARIO_PICO))
+    env.process(llegada_ciclistas(env, (semaforos, cuellos), calendario))
 
     # Ejecutar la simulación durante TIEMPO_SIMULACION minutos
-    env.run(until=TIEMPO_SIMULACION * 60)  # Convertir minutos a segundos
+    env.run(until=calendario.minutes(TIEMPO_SIMULACION))
 
     # Resultados de la simulación
+    print(f"\nSemáforos {'coordinados (onda verde)' if coordinado else 'sin coordinar'}, "
+          f"de {calendario.clock(0)} a {calendario.clock()}")
     if tiempos_viaje:
-        print(f"\nPromedio de tiempo de viaje: {statistics.mean(tiempos_viaje):.2f} segundos")
+        recorrido_libre = sum(TRAMOS) / VELOCIDAD_MEDIA
+        print(f"Ciclistas que completan el trayecto: {len(tiempos_viaje)}")
+        print(f"Promedio de tiempo de viaje: {statistics.mean(tiempos_viaje):.2f} segundos "
+              f"(recorrido sin esperas: {recorrido_libre:.2f} segundos)")
         print(f"Tiempo máximo de viaje: {max(tiempos_viaje):.2f} segundos")
         print(f"Tiempo mínimo de viaje: {min(tiempos_viaje):.2f} segundos")
+        print(f"Detenciones por ciclista: {sum(s.detenciones for s in semaforos) / len(tiempos_viaje):.2f}")
+        for tramo, cuello in cuellos.items():
+            print(f"Retardo total en el estrechamiento del tramo {tramo}: {cuello.retardo_total:.2f} segundos")
     else:
         print("No hubo ciclistas en la simulación")
 
+
 # Ejecutar la simulación
 if __name__ == '__main__':
-    ejecutar_simulacion()
\ No newline at end of file
+    ejecutar_simulacion(coordinado=True)
+    ejecutar_simulacion(coordinado=False)
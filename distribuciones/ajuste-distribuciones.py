@@ -0,0 +1,57 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.ajuste import best_fits, code, fit_dataframe, frozen, samplers
+
+# Parámetros:
+DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample1.csv')  # Fichero de datos
+GRUPO = 'Vehicle type'  # Columna por la que se agrupan los ajustes (None para ajustar solo el conjunto completo)
+MEJORES = 3             # Ajustes que se muestran de cada grupo y columna
+CRITERIO = 'aic'        # Criterio para elegir la mejor distribución ('aic', 'bic', 'ks' o 'ad')
+SEMILLA = 42            # Semilla de los generadores de valores
+
+def main():
+    datos = pd.read_csv(DATOS)
+    # Ajuste de todas las familias candidatas a cada columna y tipo de vehículo, en paralelo
+    ajustes = fit_dataframe(datos, by=GRUPO)
+
+    # Ranking de los mejores ajustes de cada grupo y columna
+    for (grupo, columna), filas in ajustes.groupby(['group', 'column']):
+        print(f'\n{columna} (grupo {grupo}):')
+        print(filas.sort_values(CRITERIO).head(MEJORES)[['distribution', 'aic', 'bic', 'ks', 'ks_pvalue', 'ad']]
+              .to_string(index=False, float_format='{:.4f}'.format))
+
+    # Distribuciones listas para copiar en un modelo
+    print('\nMejores distribuciones:')
+    for ajuste in best_fits(ajustes, CRITERIO).to_dict('records'):
+        print(f"  {ajuste['group']:>4} | {ajuste['column']}: {code(ajuste)}")
+
+    # Generadores de valores para usar en la simulación
+    generadores = samplers(ajustes, np.random.default_rng(SEMILLA), CRITERIO)
+    generador = generadores[('all', 'Time on segment 1')]
+    valores = [generador() for _ in range(10000)]
+    print(f"\nMedia de 10000 valores generados para 'Time on segment 1': {np.mean(valores):.4f} "
+          f"(datos: {datos['Time on segment 1'].mean():.4f})")
+
+    # Histograma de cada columna con los mejores ajustes del conjunto completo
+    columnas = list(ajustes['column'].unique())
+    fig, axs = plt.subplots(1, len(columnas), figsize=(5 * len(columnas), 4))
+    for ax, columna in zip(np.atleast_1d(axs), columnas):
+        valores = datos[columna].dropna()
+        ax.hist(valores, bins=30, density=True, edgecolor='black', alpha=0.5)
+        x = np.linspace(valores.min(), valores.max(), 200)
+        filas = ajustes[(ajustes['group'] == 'all') & (ajustes['column'] == columna)].sort_values(CRITERIO)
+        for ajuste in filas.head(MEJORES).to_dict('records'):
+            ax.plot(x, frozen(ajuste).pdf(x), label=ajuste['distribution'])
+        ax.set_title(columna)
+        ax.set_xlabel('Valor')
+        ax.set_ylabel('Densidad')
+        ax.legend()
+    plt.tight_layout()
+    plt.show()
+
+if __name__ == '__main__':
+    main()
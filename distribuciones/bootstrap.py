@@ -1,9 +1,19 @@
+import os
+import sys
+import time
 import numpy as np
 import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.remuestreo import bootstrap, mean, quantile
+
+# Parámetros:
+REMUESTRAS = 10000          # Número de remuestras bootstrap para los intervalos
+CONFIANZA = 0.95            # Nivel de confianza de los intervalos
+OBSERVACIONES_SALIDA = 10 ** 5  # Observaciones de la serie de salida de ejemplo
 
 # Generar datos aleatorios
-np.random.seed(42)  # Para reproducibilidad
-data = np.random.uniform(0, 10, 30)  # 30 puntos aleatorios entre 0 y 10
+rng = np.random.default_rng(42)  # Para reproducibilidad
+data = rng.uniform(0, 10, 30)  # 30 puntos aleatorios entre 0 y 10
 
 # Imprimir el número de datos en la serie original
 print(f'Número de datos en la serie original: {len(data)}')
@@ -11,13 +21,31 @@ print(f'Número de datos en la serie original: {len(data)}')
 # Número de muestras bootstrap
 num_samples = 5
 
-# Crear las muestras bootstrap
-bootstrap_samples = [np.random.choice(data, size=len(data), replace=True) for _ in range(num_samples)]
+# Crear las muestras bootstrap (una fila por muestra, todas a la vez)
+bootstrap_samples = data[rng.integers(0, len(data), size=(num_samples, len(data)))]
 
 # Imprimir el número de datos en cada serie de bootstrap
 for i, sample in enumerate(bootstrap_samples):
     print(f'Número de datos en la muestra Bootstrap {i+1}: {len(sample)}')
 
+# Intervalos de confianza de la media y de los cuartiles con los tres métodos
+for nombres, estadistico in [(['Media'], mean), (['Cuartil 25%', 'Cuartil 75%'], quantile([0.25, 0.75]))]:
+    resultado = bootstrap(data, estadistico, REMUESTRAS, rng)
+    intervalos = {metodo: resultado.interval(CONFIANZA, metodo) for metodo in ['percentile', 'basic', 'bca']}
+    for j, nombre in enumerate(nombres):
+        print(f'\n{nombre}: {np.atleast_1d(resultado.estimate)[j]:.4f} '
+              f'(error estándar {np.atleast_1d(resultado.standard_error())[j]:.4f})')
+        for metodo, (inferior, superior) in intervalos.items():
+            print(f'  {metodo:>10}: [{np.atleast_1d(inferior)[j]:.4f}, {np.atleast_1d(superior)[j]:.4f}]')
+
+# Intervalo de un KPI de una simulación larga: espera media de una serie de 10^5 observaciones
+esperas = rng.exponential(2.0, OBSERVACIONES_SALIDA)
+inicio = time.perf_counter()
+resultado = bootstrap(esperas, mean, REMUESTRAS, rng)
+inferior, superior = resultado.interval(CONFIANZA, 'bca')
+print(f'\nEspera media de {OBSERVACIONES_SALIDA} observaciones: {resultado.estimate:.4f} '
+      f'[{inferior:.4f}, {superior:.4f}] (BCa, {REMUESTRAS} remuestras en {time.perf_counter() - inicio:.1f} s)')
+
 # Visualización de los datos originales y las muestras bootstrap
 plt.figure(figsize=(10, 6))
 
@@ -34,4 +62,15 @@ plt.ylabel('Muestras Bootstrap')
 plt.title('Datos Originales y Muestras de Bootstrap')
 plt.legend()
 plt.grid(True)
-plt.show()
\ No newline at end of file
+
+# Distribución bootstrap de la espera media con el intervalo BCa
+plt.figure(figsize=(10, 6))
+plt.hist(resultado.replicates, bins=50, edgecolor='black', alpha=0.7)
+plt.axvline(resultado.estimate, color='black', label='Estimación')
+plt.axvline(inferior, color='red', linestyle='--', label=f'Intervalo BCa {CONFIANZA * 100:.0f}%')
+plt.axvline(superior, color='red', linestyle='--')
+plt.xlabel('Espera media')
+plt.ylabel('Frecuencia')
+plt.title('Distribución Bootstrap de la Espera Media')
+plt.legend()
+plt.show()
@@ -1,6 +1,12 @@
+import os
+import sys
+from array import array
 import simpy
 import random
 import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.colas import ggc
+from herramientas.recursos import UnitResource
 
 # Parámetros:
 TIEMPO_DE_SIMULACION = 1 * 60   # Tiempo de simulación en minutos
@@ -9,88 +15,121 @@ TIEMPO_MAX_SERVICIO = 5         # Tiempo máximo de servicio
 TIEMPO_LLEGADA_CLIENTES = 3     # Intervalo de tiempo en que llegan clientes
 NUMERO_SURTIDORES = 3           # Número de surtidores en la gasolinera
 NUMERO_EMPLEADOS = 2            # Número de empleados atendiendo en la gasolinera
+SEMILLA = 42                    # Semilla para reproducibilidad
 
-# Estadísticas recopiladas:
-tiempo_uso_empleados = {}
-tiempo_uso_surtidores = {}
-tiempo_espera_vehiculos = {}
-tiempo_servicio_vehiculos = {}
-
-def surtidor(env, nombre, empleados):
-    """Proceso que simula el servicio de un vehículo en la gasolinera."""
-    llegada = env.now
-    print(f'{llegada:.2f}: {nombre} llegó a la gasolinera.')
-    
-    # Solicita un surtidor
-    with surtidores.request() as surtidor:
-        yield surtidor  # Espera a que haya un surtidor libre
-        surtidor_id = surtidor.resource.count - 1
-        nombre_surtidor = f'Surtidor {surtidor_id}'
-        print(f'{llegada:.2f}: {nombre} está en el {nombre_surtidor}')
-
-        # Solicita un empleado para llenar combustible
-        with empleados.request() as empleado:
-            yield empleado  # Espera a que haya un empleado libre
-            empleado_id = empleado.resource.count - 1
-            nombre_empleado = f'Empleado {empleado_id}'
-            tiempo_servicio = random.uniform(TIEMPO_MIN_SERVICIO, TIEMPO_MAX_SERVICIO)
-            yield env.timeout(tiempo_servicio)
-
-            # Registrar el uso del empleado y el surtidor
-            if (nombre_empleado in tiempo_uso_empleados):
-                tiempo_uso_empleados[nombre_empleado] += tiempo_servicio
-            else:
-                tiempo_uso_empleados[nombre_empleado] = tiempo_servicio
-            if (nombre_surtidor in tiempo_uso_surtidores):
-                tiempo_uso_surtidores[nombre_surtidor] += tiempo_servicio
-            else:
-                tiempo_uso_surtidores[nombre_surtidor] = tiempo_servicio           
-            tiempo_espera_vehiculos[nombre] = env.now - llegada
-            tiempo_servicio_vehiculos[nombre] = tiempo_servicio
-            print(f'{llegada:.2f}: {nombre} ha terminado de llenar combustible en {nombre_surtidor} mediante {nombre_empleado}.')
-
-def llegada_vehiculos(env, surtidores, empleados):
-    """Proceso que simula la llegada de vehículos a la gasolinera."""
-    contador = 0
-    while True:
-        yield env.timeout(random.expovariate(1.0 / TIEMPO_LLEGADA_CLIENTES))  # Llegadas cada ciertos minutos en promedio
-        env.process(surtidor(env, f'Vehículo {contador}', empleados))
-        contador += 1
-
-# Inicialización del entorno de simulación
-env = simpy.Environment()
-# Recursos de la gasolinera
-surtidores = simpy.Resource(env, NUMERO_SURTIDORES)
-empleados = simpy.Resource(env, NUMERO_EMPLEADOS)
-# Inicialización de la simulación
-env.process(llegada_vehiculos(env, surtidores, empleados))
-# Ejecución de la simulación
-env.run(until=TIEMPO_DE_SIMULACION)
-
-# Graficar los resultados
-plt.figure(figsize=(10, 5))
-
-# Gráfico del uso de los empleados
-plt.subplot(1, 3, 1)
-plt.bar(tiempo_uso_empleados.keys(), tiempo_uso_empleados.values())
-plt.ylabel('Tiempo de uso (minutos)')
-plt.title('Uso de los empleados')
-plt.xticks(rotation=90)
-
-# Gráfico del uso de los surtidores
-plt.subplot(1, 3, 2)
-plt.bar(tiempo_uso_surtidores.keys(), tiempo_uso_surtidores.values())
-plt.ylabel('Tiempo de uso (minutos)')
-plt.title('Uso de los surtidores')
-plt.xticks(rotation=90)
-
-# Gráfico del tiempo de servicio de cada vehículo
-plt.subplot(1, 3, 3)
-plt.bar(tiempo_espera_vehiculos.keys(), tiempo_espera_vehiculos.values())
-plt.bar(tiempo_servicio_vehiculos.keys(), tiempo_servicio_vehiculos.values())
-plt.ylabel('Tiempo de servicio (minutos)')
-plt.title('Tiempo de servicio de cada vehículo')
-plt.legend(["Espera", "Servicio"])
-plt.xticks(rotation=90)
-
-plt.show()
\ No newline at end of file
+class Gasolinera:
+    """
+    Gasolinera con dos recursos: el vehículo ocupa un surtidor y, ya en él,
+    espera a un empleado que le llena el depósito. Cada surtidor y cada
+    empleado tiene su identificador y su tiempo de uso acumulado; los datos
+    de cada vehículo atendido se guardan en arrays (uno por columna).
+    """
+    def __init__(self, env, numero_surtidores, numero_empleados):
+        self.env = env
+        self.surtidores = UnitResource(env, numero_surtidores)
+        self.empleados = UnitResource(env, numero_empleados)
+        # Registro de los vehículos atendidos
+        self.llegada = array('d')
+        self.espera = array('d')
+        self.servicio = array('d')
+        self.surtidor = array('i')
+        self.empleado = array('i')
+
+    def vehiculo(self, nombre):
+        """Proceso que simula el servicio de un vehículo en la gasolinera."""
+        llegada = self.env.now
+        print(f'{llegada:.2f}: {nombre} llegó a la gasolinera.')
+
+        # Solicita un surtidor
+        with self.surtidores.request() as surtidor:
+            yield surtidor  # Espera a que haya un surtidor libre
+            print(f'{self.env.now:.2f}: {nombre} está en el Surtidor {surtidor.unit}')
+
+            # Solicita un empleado para llenar combustible
+            with self.empleados.request() as empleado:
+                yield empleado  # Espera a que haya un empleado libre
+                espera = self.env.now - llegada
+                tiempo_servicio = random.uniform(TIEMPO_MIN_SERVICIO, TIEMPO_MAX_SERVICIO)
+                yield self.env.timeout(tiempo_servicio)
+
+                # Registrar el vehículo (el uso del empleado y del surtidor lo acumulan los recursos)
+                self.llegada.append(llegada)
+                self.espera.append(espera)
+                self.servicio.append(tiempo_servicio)
+                self.surtidor.append(surtidor.unit)
+                self.empleado.append(empleado.unit)
+                print(f'{self.env.now:.2f}: {nombre} ha terminado de llenar combustible en el Surtidor {surtidor.unit} '
+                      f'mediante el Empleado {empleado.unit}.')
+
+    def llegada_vehiculos(self):
+        """Proceso que simula la llegada de vehículos a la gasolinera."""
+        contador = 0
+        while True:
+            yield self.env.timeout(random.expovariate(1.0 / TIEMPO_LLEGADA_CLIENTES))  # Llegadas cada ciertos minutos en promedio
+            self.env.process(self.vehiculo(f'Vehículo {contador}'))
+            contador += 1
+
+def simular(numero_surtidores=NUMERO_SURTIDORES, numero_empleados=NUMERO_EMPLEADOS, semilla=SEMILLA):
+    random.seed(semilla)
+    # Inicialización del entorno de simulación y de los recursos de la gasolinera
+    env = simpy.Environment()
+    gasolinera = Gasolinera(env, numero_surtidores, numero_empleados)
+    env.process(gasolinera.llegada_vehiculos())
+    # Ejecución de la simulación
+    env.run(until=TIEMPO_DE_SIMULACION)
+    return gasolinera
+
+def main():
+    gasolinera = simular()
+    surtidores, empleados = gasolinera.surtidores, gasolinera.empleados
+
+    # Utilización de cada unidad (incluido el servicio en curso al terminar)
+    print(f'\nVehículos atendidos: {len(gasolinera.espera)}')
+    for i, utilizacion in enumerate(empleados.utilization()):
+        print(f'Empleado {i}: {empleados.services[i]} servicios, utilización {utilizacion * 100:.1f}%')
+    for i, utilizacion in enumerate(surtidores.utilization()):
+        print(f'Surtidor {i}: {surtidores.services[i]} servicios, utilización {utilizacion * 100:.1f}%')
+    if gasolinera.espera:
+        print(f'Espera media hasta el servicio: {sum(gasolinera.espera) / len(gasolinera.espera):.2f} minutos')
+
+    # Referencia analítica: los empleados son los servidores de una cola M/G/c con servicio uniforme
+    # (aproximación de Allen–Cunneen), mientras haya al menos tantos surtidores como empleados
+    tiempo_medio_servicio = (TIEMPO_MIN_SERVICIO + TIEMPO_MAX_SERVICIO) / 2
+    variacion_servicio = (TIEMPO_MAX_SERVICIO - TIEMPO_MIN_SERVICIO) ** 2 / (3 * (TIEMPO_MIN_SERVICIO + TIEMPO_MAX_SERVICIO) ** 2)
+    metricas = ggc(1 / TIEMPO_LLEGADA_CLIENTES, 1 / tiempo_medio_servicio, min(NUMERO_EMPLEADOS, NUMERO_SURTIDORES),
+                   service_scv=variacion_servicio)
+    print(f"Referencia analítica: utilización de los empleados {metricas['utilization'] * 100:.1f}%, "
+          f"espera media {metricas['mean_wait']:.2f} minutos")
+
+    # Graficar los resultados
+    plt.figure(figsize=(10, 5))
+
+    # Gráfico del uso de los empleados
+    plt.subplot(1, 3, 1)
+    plt.bar([f'Empleado {i}' for i in range(empleados.capacity)], empleados.busy_time)
+    plt.ylabel('Tiempo de uso (minutos)')
+    plt.title('Uso de los empleados')
+    plt.xticks(rotation=90)
+
+    # Gráfico del uso de los surtidores
+    plt.subplot(1, 3, 2)
+    plt.bar([f'Surtidor {i}' for i in range(surtidores.capacity)], surtidores.busy_time)
+    plt.ylabel('Tiempo de uso (minutos)')
+    plt.title('Uso de los surtidores')
+    plt.xticks(rotation=90)
+
+    # Gráfico del tiempo de espera y de servicio de cada vehículo (en orden de llegada)
+    plt.subplot(1, 3, 3)
+    orden = sorted(range(len(gasolinera.llegada)), key=gasolinera.llegada.__getitem__)
+    posiciones = range(len(orden))
+    plt.bar(posiciones, [gasolinera.espera[i] for i in orden])
+    plt.bar(posiciones, [gasolinera.servicio[i] for i in orden], bottom=[gasolinera.espera[i] for i in orden])
+    plt.xlabel('Vehículo (orden de llegada)')
+    plt.ylabel('Tiempo (minutos)')
+    plt.title('Tiempo de espera y de servicio de cada vehículo')
+    plt.legend(["Espera", "Servicio"])
+
+    plt.show()
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 import simpy
 import random
+from herramientas.colas import mmc
 
 # Parámetros:
 RANDOM_SEED = 42        # Para reproducibilidad
@@ -36,6 +37,10 @@ def main():
     env.process(vehicle_generator(env, gas_station))
     # Ejecutar simulación
     env.run()
+    # Referencia analítica: la gasolinera es una cola M/M/c (llegadas y repostajes exponenciales)
+    metricas = mmc(1.0 / INTER_ARRIVAL_TIME, 1.0 / TIME_TO_REFUEL, NUM_PUMPS)
+    print(f"M/M/{NUM_PUMPS} en régimen estacionario: utilización {metricas['utilization'] * 100:.1f}%, "
+          f"probabilidad de esperar {metricas['wait_probability'] * 100:.1f}%, espera media {metricas['mean_wait']:.2f} minutos")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,167 @@
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Familias candidatas: nombre en scipy.stats y parámetros fijados en el ajuste.
+# 'positive' fija loc = 0 (tiempos, distancias...), 'unit' ajusta el soporte
+# [loc, loc + scale] al rango de los datos, None deja libres todos los parámetros.
+CANDIDATES = {
+    'expon': 'positive',
+    'gamma': 'positive',
+    'lognorm': 'positive',
+    'weibull_min': 'positive',
+    'fisk': 'positive',         # Log-logística
+    'invgauss': 'positive',
+    'rayleigh': 'positive',
+    'beta': 'unit',
+    'triang': None,
+    'uniform': None,
+    'norm': None,
+    'logistic': None,
+    'gumbel_r': None,
+    'weibull_max': None,
+}
+
+# Margen relativo con el que se amplía el rango de los datos para el soporte de 'unit'
+UNIT_MARGIN = 1e-3
+
+
+def _fixed_parameters(data, support):
+    if support == 'positive':
+        return {'floc': 0}
+    if support == 'unit':
+        low, high = data.min(), data.max()
+        if low >= 0 and high <= 1:
+            return {'floc': 0, 'fscale': 1}
+        margin = (high - low) * UNIT_MARGIN
+        return {'floc': low - margin, 'fscale': high - low + 2 * margin}
+    return {}
+
+
+def anderson_darling(data, cdf):
+    """Estadístico A² de Anderson–Darling de `data` frente a la función de distribución `cdf`."""
+    data = np.sort(data)
+    n = len(data)
+    F = np.clip(cdf(data), 1e-12, 1 - 1e-12)
+    i = np.arange(1, n + 1)
+    return -n - np.sum((2 * i - 1) * (np.log(F) + np.log(1 - F[::-1]))) / n
+
+
+def fit_distribution(data, name, support=None):
+    """
+    Ajusta por máxima verosimilitud la familia `name` de scipy.stats a
+    `data` y devuelve sus parámetros y medidas de bondad de ajuste: AIC y
+    BIC (con los parámetros libres), KS con su p-valor y A² de Anderson–
+    Darling. Los p-valores de KS son optimistas, porque los parámetros se
+    estiman con los mismos datos; sirven para ordenar, no para contrastar.
+    Devuelve None si los datos quedan fuera del soporte de la familia.
+    """
+    data = np.asarray(data, dtype=float)
+    if support == 'positive' and data.min() <= 0:
+        return None
+    distribution = getattr(stats, name)
+    fixed = _fixed_parameters(data, support)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            params = distribution.fit(data, **fixed)
+        except (ValueError, RuntimeError, stats.FitError):
+            return None
+        frozen = distribution(*params)
+        loglik = np.sum(frozen.logpdf(data))
+    if not np.isfinite(loglik):
+        return None
+    n, k = len(data), len(params) - len(fixed)
+    ks = stats.kstest(data, frozen.cdf)
+    return {
+        'distribution': name,
+        'params': tuple(float(param) for param in params),
+        'loglik': loglik,
+        'aic': 2 * k - 2 * loglik,
+        'bic': k * np.log(n) - 2 * loglik,
+        'ks': ks.statistic,
+        'ks_pvalue': ks.pvalue,
+        'ad': anderson_darling(data, frozen.cdf),
+    }
+
+
+def _fit_task(task):
+    key, data, name, support = task
+    result = fit_distribution(data, name, support)
+    return None if result is None else {**key, **result}
+
+
+def fit_dataframe(df, columns=None, by=None, candidates=CANDIDATES, workers=None):
+    """
+    Ajusta todas las familias de `candidates` a cada columna numérica de `df`
+    (o a las de `columns`), por separado para cada grupo de la columna `by`
+    (p. ej. el tipo de vehículo) y también para el conjunto completo
+    (grupo 'all'). Cada combinación (grupo, columna, familia) es una tarea
+    de un pool de procesos. Devuelve una tabla con una fila por ajuste,
+    ordenada por AIC dentro de cada grupo y columna, con su posición en
+    'rank'.
+    """
+    columns = columns or [column for column in df.select_dtypes('number').columns if column != by]
+    groups = [('all', df)]
+    if by is not None:
+        groups += [(str(group), rows) for group, rows in df.groupby(by)]
+    tasks = [({'group': group, 'column': column}, rows[column].dropna().to_numpy(), name, support)
+             for group, rows in groups for column in columns for name, support in candidates.items()]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = list(map(_fit_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_fit_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    fits = pd.DataFrame([result for result in results if result is not None])
+    fits = fits.sort_values(['group', 'column', 'aic'])
+    fits['rank'] = fits.groupby(['group', 'column']).cumcount() + 1
+    return fits.reset_index(drop=True)
+
+
+def best_fits(fits, criterion='aic'):
+    """Mejor ajuste de cada grupo y columna según `criterion` ('aic', 'bic', 'ks' o 'ad')."""
+    index = fits.groupby(['group', 'column'])[criterion].idxmin()
+    return fits.loc[index].reset_index(drop=True)
+
+
+def frozen(fit):
+    """Distribución de scipy.stats congelada con los parámetros de un ajuste (fila de fit_dataframe)."""
+    return getattr(stats, fit['distribution'])(*fit['params'])
+
+
+def code(fit):
+    """Expresión de Python que construye la distribución ajustada, para copiarla en un modelo."""
+    params = ', '.join(f'{param:.6g}' for param in fit['params'])
+    return f"stats.{fit['distribution']}({params})"
+
+
+class Sampler:
+    """
+    Generador de valores de una distribución ajustada para usar dentro de
+    una simulación: `sampler()` devuelve un valor. Los valores se generan
+    por bloques vectorizados de `block` con el Generator `rng`, así que cada
+    llamada cuesta lo mismo que leer un elemento de un array.
+    """
+    def __init__(self, distribution, rng=None, block=1024):
+        self.distribution = distribution
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.block = block
+        self.values = []
+
+    def __call__(self):
+        if not self.values:
+            self.values = self.distribution.rvs(size=self.block, random_state=self.rng).tolist()
+            self.values.reverse()
+        return self.values.pop()
+
+
+def samplers(fits, rng=None, criterion='aic'):
+    """Sampler del mejor ajuste de cada (grupo, columna), en un diccionario indexado por ese par."""
+    rng = rng if rng is not None else np.random.default_rng()
+    return {(fit['group'], fit['column']): Sampler(frozen(fit), rng)
+            for fit in best_fits(fits, criterion).to_dict('records')}
@@ -0,0 +1,65 @@
+import random
+import zlib
+
+import numpy as np
+
+
+class Stream(random.Random):
+    """
+    Generador de una única fuente de aleatoriedad (llegadas, tiempos de
+    servicio, tipos de vehículo...). Es un `random.Random` con los mismos
+    métodos (expovariate, uniform, choice...), pero todos ellos se obtienen
+    por transformación inversa de `random()`, incluidos los enteros de
+    choice/randint, así que cada valor consume un único número uniforme.
+    Con `antithetic=True` devuelve 1 - U en lugar de cada uniforme U de la
+    secuencia original, y por tanto el valor opuesto de cada variable.
+    """
+    def __init__(self, seed=None, antithetic=False):
+        self.antithetic = antithetic
+        super().__init__(seed)
+
+    def __reduce__(self):
+        # Copias y pickle conservan el sentido del stream además del estado del generador
+        return self.__class__, (None, self.antithetic), self.getstate()
+
+    def random(self):
+        u = super().random()
+        if self.antithetic:
+            # 1 - U está en (0, 1]: el 1 exacto (U = 0) se cambia por 0 para seguir en [0, 1)
+            return 1.0 - u if u else 0.0
+        return u
+
+    def _randbelow(self, n):
+        return int(self.random() * n)
+
+
+class RandomStreams:
+    """
+    Conjunto de streams con nombre derivados de una semilla raíz.
+
+    Cada fuente estocástica de un modelo pide su propio stream
+    (`streams['arrivals']`, `streams['service']`...), cuya semilla depende
+    solo de la semilla raíz y del nombre. Así dos configuraciones simuladas
+    con la misma semilla ven los mismos números aleatorios en cada fuente
+    (números aleatorios comunes) aunque sus eventos se intercalen de otro
+    modo, y la diferencia entre ambas se estima con mucha menos varianza.
+
+    Con `antithetic=True` cada stream devuelve 1 - U en lugar de U: la
+    réplica antitética de una réplica con la misma semilla.
+    """
+    def __init__(self, seed, antithetic=False):
+        self.seed = seed
+        self.antithetic = antithetic
+        self.streams = {}
+
+    def __getitem__(self, name):
+        if name not in self.streams:
+            # La clave del nombre es estable entre ejecuciones (a diferencia de hash())
+            sequence = np.random.SeedSequence(self.seed, spawn_key=(zlib.crc32(name.encode()),))
+            seed = int.from_bytes(sequence.generate_state(4).tobytes(), 'little')
+            self.streams[name] = Stream(seed, self.antithetic)
+        return self.streams[name]
+
+    def antithetic_pair(self):
+        """Streams antitéticos de estos: misma semilla raíz y sentido contrario."""
+        return RandomStreams(self.seed, antithetic=not self.antithetic)
@@ -0,0 +1,171 @@
+import numpy as np
+from scipy import stats
+
+# Tamaño de lote de MSER-5
+MSER_BATCH = 5
+
+
+def mser(values, batch_size=MSER_BATCH, max_fraction=0.5):
+    """
+    Punto de truncamiento MSER-m (MSER-5 por defecto) de una serie de salida.
+
+    Agrupa la serie en lotes de `batch_size` observaciones y elige el número
+    de lotes iniciales d que minimiza el error estándar de la media de los
+    restantes, Σ(Z_i - media)² / (k - d)². Las sumas de todos los sufijos se
+    calculan a la vez con sumas acumuladas, así que el coste es O(n). Solo
+    se buscan truncamientos en la primera `max_fraction` de la serie: un
+    mínimo más allá indica que la serie no alcanza el régimen estacionario.
+
+    Devuelve el número de observaciones a descartar.
+    """
+    values = np.asarray(values, dtype=float)
+    k = len(values) // batch_size
+    if k < 2:
+        return 0
+    batches = values[:k * batch_size].reshape(k, batch_size).mean(axis=1)
+    # Sumas de Z y de Z² desde cada lote d hasta el final
+    suffix = np.cumsum(batches[::-1])[::-1]
+    suffix_squares = np.cumsum(batches[::-1] ** 2)[::-1]
+    remaining = np.arange(k, 0, -1)
+    statistic = (suffix_squares - suffix ** 2 / remaining) / remaining ** 2
+    last = max(1, int(k * max_fraction))
+    return int(np.argmin(statistic[:last])) * batch_size
+
+
+def truncate(values, batch_size=MSER_BATCH):
+    """Serie sin el periodo de calentamiento detectado por MSER y número de observaciones descartadas."""
+    values = np.asarray(values, dtype=float)
+    deleted = mser(values, batch_size)
+    return values[deleted:], deleted
+
+
+def batch_means(values, batches=20, confidence=0.95):
+    """
+    Media e intervalo de confianza de una única réplica larga por lotes no
+    solapados: la serie se divide en `batches` lotes consecutivos (las
+    observaciones sobrantes se descartan del principio) y las medias de los
+    lotes se tratan como observaciones independientes.
+
+    Devuelve (media, semianchura, tamaño de lote).
+    """
+    values = np.asarray(values, dtype=float)
+    size = len(values) // batches
+    if size < 1 or batches < 2:
+        return values.mean() if len(values) else np.nan, np.inf, size
+    means = values[len(values) - batches * size:].reshape(batches, size).mean(axis=1)
+    half_width = stats.t.ppf((1 + confidence) / 2, batches - 1) * means.std(ddof=1) / np.sqrt(batches)
+    return means.mean(), half_width, size
+
+
+def overlapping_batch_means(values, batch_size=None, confidence=0.95):
+    """
+    Media e intervalo de confianza por lotes solapados (Meketon y Schmeiser):
+    se usan las medias de todos los lotes de `batch_size` observaciones
+    consecutivas, lo que da un estimador de la varianza con un 50 % más de
+    grados de libertad que los lotes no solapados del mismo tamaño. Por
+    defecto el tamaño de lote es n / 20.
+
+    Devuelve (media, semianchura, tamaño de lote).
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    m = batch_size or n // 20
+    if m < 1 or n - m < 1:
+        return values.mean() if n else np.nan, np.inf, m
+    mean = values.mean()
+    cumulative = np.concatenate([[0.0], np.cumsum(values)])
+    means = (cumulative[m:] - cumulative[:-m]) / m
+    variance_of_mean = m * np.sum((means - mean) ** 2) / ((n - m + 1) * (n - m))
+    dof = 1.5 * (n / m - 1)
+    half_width = stats.t.ppf((1 + confidence) / 2, dof) * np.sqrt(variance_of_mean)
+    return mean, half_width, m
+
+
+def time_average_bins(times, levels, bin_width, end=None):
+    """
+    Convierte una serie escalonada (nivel `levels[i]` desde `times[i]` hasta
+    el cambio siguiente, como la longitud de una cola) en la media ponderada
+    en el tiempo de cada intervalo de `bin_width`, que ya son observaciones
+    equiespaciadas a las que aplicar MSER y los lotes.
+    """
+    times = np.asarray(times, dtype=float)
+    levels = np.asarray(levels, dtype=float)
+    end = times[-1] if end is None else end
+    edges = np.arange(0, end + bin_width, bin_width)
+    edges = edges[edges <= end]
+    if edges[-1] < end:
+        edges = np.append(edges, end)
+    # Integral del nivel desde el origen hasta cada instante de cambio
+    area = np.concatenate([[0.0], np.cumsum(levels[:-1] * np.diff(times))])
+
+    def integral(t):
+        i = np.clip(np.searchsorted(times, t, side='right') - 1, 0, None)
+        return area[i] + levels[i] * (t - times[i]) * (t >= times[0])
+
+    return np.diff(integral(edges)) / np.diff(edges)
+
+
+class SteadyStateResult:
+    """Estimación en régimen estacionario de un KPI a partir de una réplica."""
+    def __init__(self, mean, half_width, deleted, observations, batch_size, confidence, method):
+        self.mean = mean
+        self.half_width = half_width
+        self.deleted = deleted
+        self.observations = observations
+        self.batch_size = batch_size
+        self.confidence = confidence
+        self.method = method
+
+    def __str__(self):
+        return (f"{self.mean:.4f} ± {self.half_width:.4f} ({self.confidence * 100:.0f}%, {self.method}, "
+                f"calentamiento: {self.deleted} de {self.observations} observaciones)")
+
+
+def steady_state(values, confidence=0.95, method='obm', batch_size=None):
+    """
+    Trunca el calentamiento con MSER-5 y estima la media del resto con su
+    intervalo de confianza por lotes solapados (method='obm') o no
+    solapados (method='bm').
+    """
+    kept, deleted = truncate(values)
+    if method == 'bm':
+        mean, half_width, size = batch_means(kept, confidence=confidence)
+    else:
+        mean, half_width, size = overlapping_batch_means(kept, batch_size, confidence)
+    return SteadyStateResult(mean, half_width, deleted, len(kept) + deleted, size, confidence, method)
+
+
+class SteadyStateSeries:
+    """
+    Serie de salida que se va acumulando durante la simulación (tiempos de
+    espera, duraciones...) sin guardar cada observación: solo conserva las
+    medias de lotes de `batch_size` observaciones, que es lo que necesitan
+    MSER-5 y los lotes (los lotes solapados se forman a partir de ellas).
+    """
+    def __init__(self, batch_size=MSER_BATCH):
+        self.batch_size = batch_size
+        self.batches = []
+        self.partial = 0.0
+        self.count = 0
+
+    def add(self, value):
+        self.partial += value
+        self.count += 1
+        if self.count % self.batch_size == 0:
+            self.batches.append(self.partial / self.batch_size)
+            self.partial = 0.0
+
+    def __len__(self):
+        return self.count
+
+    def result(self, confidence=0.95, method='obm'):
+        """Media en régimen estacionario (las observaciones del último lote incompleto no se usan)."""
+        batches = np.asarray(self.batches)
+        deleted = mser(batches, batch_size=1)
+        kept = batches[deleted:]
+        if method == 'bm':
+            mean, half_width, size = batch_means(kept, confidence=confidence)
+        else:
+            mean, half_width, size = overlapping_batch_means(kept, confidence=confidence)
+        return SteadyStateResult(mean, half_width, deleted * self.batch_size, self.count,
+                                 size * self.batch_size, confidence, method)
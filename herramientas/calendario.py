@@ -0,0 +1,74 @@
+import math
+
+import numpy as np
+
+# Segundos que dura cada unidad de tiempo admitida para el reloj de simulación
+UNITS = {'s': 1, 'min': 60, 'h': 3600}
+
+
+class Calendar:
+    """
+    Reloj de calendario sobre `env.now`.
+
+    Cada modelo declara en qué unidad avanza su reloj (`unit`: 's', 'min' o
+    'h') y a qué hora del día empieza (`start_hour`), de modo que las
+    conversiones entre unidades y la hora del día se hacen siempre en un
+    único sitio. Las franjas de hora punta (`peaks`, pares (inicio, fin) en
+    horas, fin excluido) se precalculan en una tabla con un valor por
+    intervalo de `bucket_minutes`, y `is_peak()` es una consulta O(1).
+    """
+    def __init__(self, env, unit='s', start_hour=0, peaks=(), bucket_minutes=1):
+        self.env = env
+        self.unit = unit
+        self.seconds_per_unit = UNITS[unit]
+        self.units_per_hour = 3600 / self.seconds_per_unit
+        self.units_per_day = 24 * self.units_per_hour
+        self.start = start_hour * self.units_per_hour
+        self.bucket = bucket_minutes * 60 / self.seconds_per_unit
+        self.peaks = list(peaks)
+        # Hora del día al comienzo de cada intervalo y pertenencia a alguna franja punta
+        buckets = math.ceil(self.units_per_day / self.bucket)
+        hours = np.arange(buckets) * self.bucket / self.units_per_hour
+        table = np.zeros(buckets, dtype=bool)
+        for first, last in self.peaks:
+            table |= (first <= hours) & (hours < last)
+        self.peak_table = table.tolist()
+
+    def seconds(self, value):
+        """Convierte `value` segundos a la unidad del reloj."""
+        return value / self.seconds_per_unit
+
+    def minutes(self, value):
+        """Convierte `value` minutos a la unidad del reloj."""
+        return value * 60 / self.seconds_per_unit
+
+    def hours(self, value):
+        """Convierte `value` horas a la unidad del reloj."""
+        return value * self.units_per_hour
+
+    def time_of_day(self, now=None):
+        """Instante del día (en la unidad del reloj) correspondiente a `now` (por defecto, `env.now`)."""
+        now = self.env.now if now is None else now
+        return (self.start + now) % self.units_per_day
+
+    def hour(self, now=None):
+        """Hora del día (0-23)."""
+        return int(self.time_of_day(now) // self.units_per_hour)
+
+    def day(self, now=None):
+        """Día de simulación (0 el primero) teniendo en cuenta la hora de inicio."""
+        now = self.env.now if now is None else now
+        return int((self.start + now) // self.units_per_day)
+
+    def clock(self, now=None):
+        """Hora del día en formato HH:MM."""
+        minutes = int(self.time_of_day(now) * self.seconds_per_unit // 60)
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+    def is_peak(self, now=None):
+        """True si el instante cae en una franja de hora punta."""
+        return self.peak_table[int(self.time_of_day(now) // self.bucket)]
+
+    def by_period(self, peak_value, off_peak_value, now=None):
+        """Devuelve el valor de hora punta o el de hora valle según el instante."""
+        return peak_value if self.is_peak(now) else off_peak_value
@@ -0,0 +1,196 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Estados añadidos por encima del último con probabilidad apreciable al truncar la cadena de Erlang A
+ERLANG_A_TAIL = 20
+
+
+def _output(**metrics):
+    """Métricas como floats si la entrada era escalar, o como arrays si era un barrido."""
+    return {name: value.item() if np.ndim(value) == 0 else value for name, value in metrics.items()}
+
+
+def erlang_b(servers, offered_load):
+    """
+    Probabilidad de bloqueo de Erlang B para `servers` servidores y carga
+    ofrecida a = λ / μ, con la recursión B(k) = a·B(k-1) / (k + a·B(k-1)),
+    que es estable numéricamente para cientos de servidores. Admite arrays
+    (se evalúan todas las configuraciones a la vez).
+    """
+    servers, offered_load = np.broadcast_arrays(np.asarray(servers, dtype=int), np.asarray(offered_load, dtype=float))
+    blocking = np.ones(servers.shape)
+    for k in range(1, int(servers.max(initial=0)) + 1):
+        active = k <= servers
+        blocking = np.where(active, offered_load * blocking / (k + offered_load * blocking), blocking)
+    return blocking
+
+
+def erlang_c(servers, offered_load):
+    """Probabilidad de esperar en una cola M/M/c (Erlang C); 1 si el sistema es inestable (a ≥ c)."""
+    servers = np.asarray(servers, dtype=float)
+    offered_load = np.asarray(offered_load, dtype=float)
+    blocking = erlang_b(servers, offered_load)
+    stable = offered_load < servers
+    with np.errstate(divide='ignore', invalid='ignore'):
+        waiting = servers * blocking / (servers - offered_load * (1 - blocking))
+    return np.where(stable, waiting, 1.0)
+
+
+def mmc(arrival_rate, service_rate, servers):
+    """
+    Métricas estacionarias de una cola M/M/c: utilización de los servidores,
+    probabilidad de esperar, espera media en cola, longitud media de la cola
+    y tiempo medio en el sistema. Las esperas son infinitas si λ ≥ c·μ.
+    """
+    return ggc(arrival_rate, service_rate, servers)
+
+
+def ggc(arrival_rate, service_rate, servers, arrival_scv=1.0, service_scv=1.0):
+    """
+    Aproximación de Allen–Cunneen para una cola G/G/c: la espera en cola de
+    la M/M/c con la misma utilización multiplicada por (ca² + cs²) / 2,
+    donde ca² y cs² son los cuadrados de los coeficientes de variación de
+    los tiempos entre llegadas y de servicio (1 para la exponencial, 0 para
+    un tiempo constante, (b - a)² / (3 (a + b)²) para una uniforme en [a, b]).
+    Con ca² = cs² = 1 es exacta (M/M/c).
+    """
+    arrival_rate = np.asarray(arrival_rate, dtype=float)
+    service_rate = np.asarray(service_rate, dtype=float)
+    servers = np.asarray(servers, dtype=float)
+    offered_load = arrival_rate / service_rate
+    utilization = offered_load / servers
+    wait_probability = erlang_c(servers, offered_load)
+    stable = utilization < 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_wait = wait_probability / (servers * service_rate - arrival_rate) * (arrival_scv + service_scv) / 2
+    mean_wait = np.where(stable, mean_wait, np.inf)
+    return _output(
+        utilization=np.minimum(utilization, 1.0),
+        wait_probability=wait_probability,
+        mean_wait=mean_wait,
+        mean_queue=arrival_rate * mean_wait,
+        mean_time_in_system=mean_wait + 1 / service_rate,
+        abandonment=np.zeros(np.broadcast(arrival_rate, service_rate, servers).shape),
+    )
+
+
+def wait_exceeds(arrival_rate, service_rate, servers, time, arrival_scv=1.0, service_scv=1.0):
+    """
+    Probabilidad de que la espera en cola supere `time`: C·exp(-(c·μ - λ)·t)
+    en la M/M/c, con la tasa de decaimiento escalada por 2 / (ca² + cs²) en
+    la G/G/c, coherente con la espera media de Allen–Cunneen. Con una
+    paciencia fija (un tiempo máximo de espera) es una cota superior de la
+    fracción de clientes que abandonan, porque los abandonos acortan la cola.
+    """
+    arrival_rate = np.asarray(arrival_rate, dtype=float)
+    service_rate = np.asarray(service_rate, dtype=float)
+    servers = np.asarray(servers, dtype=float)
+    wait_probability = erlang_c(servers, arrival_rate / service_rate)
+    decay = np.maximum(servers * service_rate - arrival_rate, 0) * 2 / (arrival_scv + service_scv)
+    probability = np.where(arrival_rate < servers * service_rate, wait_probability * np.exp(-decay * time), 1.0)
+    return probability.item() if probability.ndim == 0 else probability
+
+
+def erlang_a(arrival_rate, service_rate, servers, patience_rate):
+    """
+    Cola M/M/c+M (Erlang A): los clientes abandonan la cola tras una
+    paciencia exponencial de media 1 / `patience_rate`. Es un proceso de
+    nacimiento y muerte con tasa de salida min(n, c)·μ + max(n - c, 0)·θ en
+    el estado n; se resuelve truncando la cadena donde la probabilidad ya
+    es despreciable, para todas las configuraciones a la vez. Con una
+    paciencia fija (un tiempo máximo de espera) es mejor `wait_exceeds`.
+
+    Devuelve la utilización, la probabilidad de esperar, la espera media en
+    cola, la longitud media de la cola, el tiempo medio en el sistema y la
+    fracción de clientes que abandonan; las medias son sobre todos los
+    clientes, también los que abandonan.
+    """
+    arrival_rate, service_rate, servers, patience_rate = (np.asarray(value, dtype=float) for value in np.broadcast_arrays(
+        arrival_rate, service_rate, servers, patience_rate))
+    shape = arrival_rate.shape
+    arrival_rate, service_rate, servers, patience_rate = (value.reshape(-1, 1) for value in (
+        arrival_rate, service_rate, servers, patience_rate))
+    # La cola deja de crecer en media cuando c·μ + k·θ supera λ; se añaden unas desviaciones típicas de margen
+    growth = np.maximum(arrival_rate - servers * service_rate, 0) / patience_rate
+    extra = growth + 10 * np.sqrt(arrival_rate / patience_rate)
+    states = int(np.max(servers + extra)) + ERLANG_A_TAIL
+    n = np.arange(1, states + 1)
+    departure = np.minimum(n, servers) * service_rate + np.maximum(n - servers, 0) * patience_rate
+    # log p(n) - log p(0), normalizado con el máximo para no desbordar
+    log_weights = np.concatenate([np.zeros((len(arrival_rate), 1)), np.cumsum(np.log(arrival_rate / departure), axis=1)], axis=1)
+    weights = np.exp(log_weights - log_weights.max(axis=1, keepdims=True))
+    probabilities = weights / weights.sum(axis=1, keepdims=True)
+    n = np.arange(states + 1)
+    queue = np.maximum(n - servers, 0)
+    busy = np.minimum(n, servers)
+    mean_queue = (probabilities * queue).sum(axis=1)
+    mean_busy = (probabilities * busy).sum(axis=1)
+    # PASTA: los clientes que llegan ven la distribución estacionaria
+    wait_probability = (probabilities * (n >= servers)).sum(axis=1)
+    arrival_rate, service_rate, servers, patience_rate = (value[:, 0] for value in (
+        arrival_rate, service_rate, servers, patience_rate))
+    abandonment = patience_rate * mean_queue / arrival_rate
+    mean_wait = mean_queue / arrival_rate
+    return _output(**{name: value.reshape(shape) for name, value in dict(
+        utilization=mean_busy / servers,
+        wait_probability=wait_probability,
+        mean_wait=mean_wait,
+        mean_queue=mean_queue,
+        mean_time_in_system=mean_wait + (1 - abandonment) / service_rate,
+        abandonment=abandonment,
+    ).items()})
+
+
+def configuration_grid(**values):
+    """
+    Tabla con una fila por cada combinación de los valores de cada parámetro
+    (p. ej. configuration_grid(servers=range(1, 11), arrival_rate=[0.5, 1])).
+    """
+    rows = [dict(zip(values, combination)) for combination in itertools.product(*values.values())]
+    grid = pd.DataFrame(rows)
+    grid.index.name = 'configuration_id'
+    return grid
+
+
+def screen(grid, evaluate, keep, objective=None, top=None):
+    """
+    Evalúa analíticamente todas las configuraciones de `grid` y se queda con
+    las prometedoras. `evaluate(grid)` recibe la tabla completa y devuelve
+    un diccionario de métricas (arrays con una fila por configuración);
+    `keep(results)` devuelve la máscara de filas que superan el cribado. Si
+    se indica `objective` (columna a minimizar) y `top`, se conservan solo
+    las `top` mejores. Devuelve (tabla evaluada completa, prometedoras).
+    """
+    results = grid.join(pd.DataFrame(evaluate(grid), index=grid.index))
+    promising = results[keep(results)]
+    if objective is not None:
+        promising = promising.sort_values(objective)
+    if top is not None:
+        promising = promising.head(top)
+    return results, promising
+
+
+def sweep(grid, evaluate, keep, simulate, objective=None, top=None, workers=None):
+    """
+    Barrido en dos fases: cribado analítico de todas las configuraciones y
+    simulación solo de las prometedoras. `simulate(**parámetros)` debe ser
+    una función de nivel de módulo (para poder enviarla a otro proceso) que
+    devuelve un diccionario de KPIs; sus columnas se añaden con el prefijo
+    'sim_' junto a las analíticas. Devuelve (tabla evaluada, simuladas).
+    """
+    results, promising = screen(grid, evaluate, keep, objective, top)
+    parameters = promising[grid.columns].to_dict('records')
+    if workers == 1:
+        simulated = [simulate(**row) for row in parameters]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            simulated = list(pool.map(_simulate, itertools.repeat(simulate), parameters))
+    simulated = pd.DataFrame(simulated, index=promising.index).add_prefix('sim_')
+    return results, promising.join(simulated)
+
+
+def _simulate(simulate, parameters):
+    return simulate(**parameters)
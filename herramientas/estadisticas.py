@@ -0,0 +1,36 @@
+class TimeWeightedAccumulator:
+    """
+    Acumula la integral en el tiempo de una magnitud que cambia a saltos
+    (ocupación de un carril, longitud de una cola, plazas libres...).
+
+    En lugar de guardar cada cambio en una lista, mantiene el área bajo la
+    curva, de modo que la media ponderada en el tiempo se obtiene en O(1).
+    """
+    def __init__(self, env, initial=0):
+        self.env = env
+        self.start_time = env.now
+        self.last_time = env.now
+        self.level = initial
+        self.area = 0.0
+        self.maximum = initial
+
+    def update(self, level):
+        # Cerramos el tramo anterior antes de cambiar de nivel
+        now = self.env.now
+        self.area += self.level * (now - self.last_time)
+        self.last_time = now
+        self.level = level
+        if level > self.maximum:
+            self.maximum = level
+
+    def add(self, delta):
+        self.update(self.level + delta)
+
+    def integral(self):
+        return self.area + self.level * (self.env.now - self.last_time)
+
+    def mean(self):
+        elapsed = self.env.now - self.start_time
+        if elapsed <= 0:
+            return self.level
+        return self.integral() / elapsed
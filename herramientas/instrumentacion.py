@@ -0,0 +1,171 @@
+import atexit
+import os
+import time
+from collections import Counter, defaultdict
+
+import simpy
+from simpy.events import Process
+
+# Nombre con el que se anotan los eventos planificados fuera de cualquier proceso
+OUTSIDE = '<entorno>'
+
+
+def process_name(process):
+    """Nombre de la función generadora de un proceso (p. ej. 'ParkingLot.park')."""
+    generator = process._generator
+    return getattr(generator, '__qualname__', process.name)
+
+
+class InstrumentedEnvironment(simpy.Environment):
+    """
+    `simpy.Environment` que mide su propia ejecución:
+
+    - eventos procesados por tipo (Timeout, Request, Process...) y por la
+      función del proceso que los planificó;
+    - tamaño de la cola de eventos (máximo y muestras (t, tamaño) cada
+      `heap_every` eventos);
+    - tiempo de reloj consumido al reanudar cada tipo de proceso, medido
+      en uno de cada `sample_every` eventos y extrapolado al total.
+
+    Los informes se obtienen como tablas (`report`), como diccionario
+    (`stats`) o en formato de pilas plegadas (`folded`), que leen
+    directamente flamegraph.pl, speedscope o inferno.
+    """
+    def __init__(self, initial_time=0, sample_every=1, heap_every=100):
+        super().__init__(initial_time)
+        self.sample_every = sample_every
+        self.heap_every = heap_every
+        self.steps = 0
+        self.by_type = Counter()
+        self.by_origin = Counter()
+        self.by_origin_type = Counter()
+        self.resumes = Counter()
+        self.wall = defaultdict(float)  # (proceso, tipo de evento) -> segundos medidos
+        self.sampled = Counter()  # (proceso, tipo de evento) -> eventos medidos
+        self.heap_peak = 0
+        self.heap_samples = []
+        self.wall_total = 0.0
+
+    def schedule(self, event, priority=simpy.core.NORMAL, delay=0):
+        process = self.active_process
+        event._origin = process_name(process) if process is not None else OUTSIDE
+        super().schedule(event, priority, delay)
+
+    def run(self, until=None):
+        start = time.perf_counter()
+        try:
+            return super().run(until)
+        finally:
+            self.wall_total += time.perf_counter() - start
+
+    def step(self):
+        queue = self._queue
+        size = len(queue)
+        if size > self.heap_peak:
+            self.heap_peak = size
+        if not queue:
+            return super().step()
+        event = queue[0][3]
+        kind = type(event).__name__
+        origin = getattr(event, '_origin', OUTSIDE)
+        self.steps += 1
+        self.by_type[kind] += 1
+        self.by_origin[origin] += 1
+        self.by_origin_type[origin, kind] += 1
+        if self.steps % self.heap_every == 0:
+            self.heap_samples.append((queue[0][0], size))
+        resumed = [process_name(callback.__self__) for callback in event.callbacks or ()
+                   if isinstance(getattr(callback, '__self__', None), Process)]
+        for name in resumed:
+            self.resumes[name] += 1
+        if self.steps % self.sample_every:
+            return super().step()
+        start = time.perf_counter()
+        try:
+            super().step()
+        finally:
+            elapsed = time.perf_counter() - start
+            # El tiempo del paso se reparte entre los procesos reanudados (normalmente uno)
+            names = resumed or [OUTSIDE]
+            for name in names:
+                self.wall[name, kind] += elapsed / len(names)
+                self.sampled[name, kind] += 1
+
+    def _wall_estimates(self):
+        """Segundos estimados por (proceso, tipo de evento), extrapolando el muestreo."""
+        return {key: seconds * self.sample_every for key, seconds in self.wall.items()}
+
+    def stats(self):
+        wall = Counter()
+        for (name, _), seconds in self._wall_estimates().items():
+            wall[name] += seconds
+        return {
+            'events': self.steps,
+            'wall_time': self.wall_total,
+            'events_per_second': self.steps / self.wall_total if self.wall_total else None,
+            'heap_peak': self.heap_peak,
+            'events_by_type': dict(self.by_type.most_common()),
+            'events_by_origin': dict(self.by_origin.most_common()),
+            'resumes_by_process': dict(self.resumes.most_common()),
+            'wall_time_by_process': dict(wall.most_common()),
+        }
+
+    def folded(self, metric='time'):
+        """
+        Líneas 'proceso;tipo de evento valor' para un flame graph. Con
+        metric='time' el valor son microsegundos de reloj; con
+        metric='events', eventos planificados por cada función.
+        """
+        if metric == 'events':
+            items = self.by_origin_type.items()
+        else:
+            items = ((key, int(seconds * 1e6)) for key, seconds in self._wall_estimates().items())
+        return '\n'.join(f"{name.replace(' ', '_')};{kind} {value}" for (name, kind), value in sorted(items)) + '\n'
+
+    def report(self, top=15):
+        stats = self.stats()
+        rate = stats['events_per_second']
+        print(f"\nEventos procesados: {self.steps} en {self.wall_total:.3f} s de reloj"
+              + (f" ({rate:,.0f} eventos/s)" if rate else ""))
+        mean_heap = sum(size for _, size in self.heap_samples) / len(self.heap_samples) if self.heap_samples else self.heap_peak
+        print(f"Cola de eventos: máximo {self.heap_peak}, media muestreada {mean_heap:.1f}")
+        self._table('Eventos por tipo', self.by_type, top)
+        self._table('Eventos por función que los planifica', self.by_origin, top)
+        wall = Counter(stats['wall_time_by_process'])
+        print(f"\nTiempo de reloj por proceso (muestreo 1/{self.sample_every}):")
+        print(f"  {'proceso':<45} {'reanudaciones':>14} {'total (ms)':>11} {'medio (µs)':>11} {'%':>6}")
+        total = sum(wall.values()) or 1
+        for name, seconds in wall.most_common(top):
+            resumes = self.resumes.get(name, 0)
+            mean = seconds / resumes * 1e6 if resumes else 0
+            print(f"  {name:<45} {resumes:>14} {seconds * 1e3:>11.2f} {mean:>11.2f} {100 * seconds / total:>6.1f}")
+
+    def _table(self, title, counter, top):
+        print(f"\n{title}:")
+        total = sum(counter.values()) or 1
+        for name, count in counter.most_common(top):
+            print(f"  {name:<45} {count:>10} {100 * count / total:>6.1f}%")
+
+
+def make_environment(initial_time=0):
+    """
+    Entorno de simulación de los modelos. Sin configuración es un
+    `simpy.Environment` normal; con la variable de entorno SIM_PROFILE
+    definida es un `InstrumentedEnvironment` que imprime su informe al
+    terminar el programa. SIM_PROFILE_SAMPLE fija cada cuántos eventos se
+    mide el tiempo de reloj y SIM_PROFILE_FOLDED la ruta del fichero de
+    pilas plegadas para el flame graph.
+    """
+    if not os.environ.get('SIM_PROFILE'):
+        return simpy.Environment(initial_time)
+    env = InstrumentedEnvironment(initial_time, sample_every=int(os.environ.get('SIM_PROFILE_SAMPLE', 1)))
+    folded_path = os.environ.get('SIM_PROFILE_FOLDED')
+
+    def finish():
+        env.report()
+        if folded_path:
+            with open(folded_path, 'w') as file:
+                file.write(env.folded())
+
+    atexit.register(finish)
+    return env
@@ -0,0 +1,49 @@
+import simpy
+
+
+class UnitResource(simpy.Resource):
+    """
+    Recurso de SimPy formado por unidades identificables (surtidores,
+    empleados, puntos de recarga...). Cada petición concedida recibe en
+    `request.unit` el identificador (0..capacity-1) de una unidad libre,
+    sacado de una lista de unidades libres en O(1), y lo devuelve al
+    liberarse. `resource.count - 1` no sirve para esto: es el número de
+    usuarios actuales, no la unidad que ocupa cada uno.
+
+    Por cada unidad se acumulan el tiempo ocupado y los servicios
+    completados, de modo que la utilización de cada unidad se obtiene sin
+    recorrer ningún registro.
+    """
+    def __init__(self, env, capacity=1):
+        super().__init__(env, capacity)
+        # pop() entrega primero la unidad de menor identificador
+        self.free = list(range(capacity - 1, -1, -1))
+        self.busy_time = [0.0] * capacity
+        self.services = [0] * capacity
+
+    def _do_put(self, event):
+        super()._do_put(event)
+        if event.triggered:
+            event.unit = self.free.pop()
+
+    def _do_get(self, event):
+        request = event.request
+        unit = getattr(request, 'unit', None)
+        # Una petición cancelada antes de ser atendida no tiene unidad que devolver
+        if unit is not None and request in self.users:
+            self.busy_time[unit] += self._env.now - request.usage_since
+            self.services[unit] += 1
+            self.free.append(unit)
+        super()._do_get(event)
+
+    def utilization(self, elapsed=None):
+        """
+        Fracción del tiempo `elapsed` (por defecto, desde el instante 0 hasta
+        ahora) que ha estado ocupada cada unidad, incluido el servicio en curso.
+        """
+        now = self._env.now
+        elapsed = now if elapsed is None else elapsed
+        busy = list(self.busy_time)
+        for request in self.users:
+            busy[request.unit] += now - request.usage_since
+        return [time / elapsed if elapsed else 0.0 for time in busy]
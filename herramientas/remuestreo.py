@@ -0,0 +1,148 @@
+import numpy as np
+from scipy import stats
+
+# Número máximo de elementos de cada bloque de remuestras (acota la memoria: 2**22 floats son 32 MB)
+CHUNK_ELEMENTS = 2 ** 22
+# Grupos del jackknife con el que se estima la aceleración de BCa
+JACKKNIFE_GROUPS = 1000
+
+
+def mean(samples):
+    """Media de cada remuestra."""
+    return samples.mean(axis=1)
+
+
+def quantile(q):
+    """Estadístico con el cuantil (o cuantiles) `q` de cada remuestra."""
+    def statistic(samples):
+        return np.moveaxis(np.quantile(samples, q, axis=1), 0, -1) if np.ndim(q) else np.quantile(samples, q, axis=1)
+    return statistic
+
+
+def ratio_of_means(numerator=0, denominator=1):
+    """
+    Estadístico con el cociente de las medias de dos columnas de datos
+    emparejados (p. ej. tiempo ocupado / tiempo disponible de cada réplica).
+    """
+    def statistic(samples):
+        return samples[:, :, numerator].mean(axis=1) / samples[:, :, denominator].mean(axis=1)
+    return statistic
+
+
+def _chunks(total, row_elements, chunk_elements):
+    """Tamaños de los bloques de filas en que se reparten `total` filas de `row_elements` elementos."""
+    rows = max(1, chunk_elements // max(1, row_elements))
+    return [min(rows, total - start) for start in range(0, total, rows)]
+
+
+def _evaluate(statistic, samples):
+    return np.asarray(statistic(samples), dtype=float)
+
+
+class BootstrapResult:
+    """
+    Distribución bootstrap de un estadístico: su valor en la muestra original
+    (`estimate`) y en cada remuestra (`replicates`, una fila por remuestra y
+    una columna por estadístico si `statistic` devuelve varios).
+    """
+    def __init__(self, data, statistic, estimate, replicates, chunk_elements):
+        self.data = data
+        self.statistic = statistic
+        self.estimate = estimate
+        self.replicates = replicates
+        self.chunk_elements = chunk_elements
+        self._acceleration = None
+
+    @property
+    def resamples(self):
+        return len(self.replicates)
+
+    def standard_error(self):
+        return self.replicates.std(axis=0, ddof=1)
+
+    def bias(self):
+        return self.replicates.mean(axis=0) - self.estimate
+
+    def acceleration(self, groups=JACKKNIFE_GROUPS):
+        """
+        Aceleración de BCa, a = Σ(θ̄ - θ_i)³ / (6 (Σ(θ̄ - θ_i)²)^1.5), con los
+        valores θ_i del jackknife. Con más de `groups` observaciones se usa el
+        jackknife por grupos (se quita cada vez un bloque de observaciones
+        consecutivas) para no evaluar el estadístico n veces sobre n - 1
+        datos; las observaciones que no completan un grupo no se usan.
+        """
+        if self._acceleration is None:
+            n = len(self.data)
+            groups = min(groups, n)
+            size = n // groups
+            blocks = self.data[:groups * size].reshape(groups, size, *self.data.shape[1:])
+            values = []
+            for rows in _chunks(groups, (groups - 1) * size * blocks[0, 0].size, self.chunk_elements):
+                start = sum(len(value) for value in values)
+                left_out = np.arange(start, start + rows)
+                # Índices de los grupos que se conservan en cada fila: todos menos el suyo
+                kept = np.arange(groups - 1)[None, :]
+                kept = kept + (kept >= left_out[:, None])
+                samples = blocks[kept].reshape(rows, (groups - 1) * size, *self.data.shape[1:])
+                values.append(_evaluate(self.statistic, samples))
+            jackknife = np.concatenate(values)
+            deviations = jackknife.mean(axis=0) - jackknife
+            with np.errstate(divide='ignore', invalid='ignore'):
+                acceleration = (deviations ** 3).sum(axis=0) / (6 * ((deviations ** 2).sum(axis=0)) ** 1.5)
+            self._acceleration = np.nan_to_num(acceleration)
+        return self._acceleration
+
+    def interval(self, confidence=0.95, method='bca'):
+        """
+        Intervalo de confianza bootstrap: 'percentile' (cuantiles de las
+        réplicas), 'basic' (percentil reflejado en torno a la estimación,
+        2θ̂ - q) o 'bca' (percentil con corrección de sesgo z0 y aceleración
+        a, de segundo orden exacto; el de referencia para estadísticos
+        asimétricos como cuantiles o cocientes). Devuelve (inferior, superior).
+        """
+        alpha = (1 - confidence) / 2
+        if method == 'percentile':
+            low, high = np.quantile(self.replicates, [alpha, 1 - alpha], axis=0)
+        elif method == 'basic':
+            upper, lower = np.quantile(self.replicates, [alpha, 1 - alpha], axis=0)
+            low, high = 2 * self.estimate - lower, 2 * self.estimate - upper
+        elif method == 'bca':
+            # Fracción de réplicas por debajo de la estimación (los empates cuentan la mitad)
+            below = (self.replicates < self.estimate).mean(axis=0) + (self.replicates == self.estimate).mean(axis=0) / 2
+            z0 = stats.norm.ppf(np.clip(below, 1 / (self.resamples + 1), self.resamples / (self.resamples + 1)))
+            a = self.acceleration()
+            z = stats.norm.ppf([alpha, 1 - alpha]).reshape(2, *np.ones(np.ndim(z0), dtype=int))
+            levels = stats.norm.cdf(z0 + (z0 + z) / (1 - a * (z0 + z)))
+            if np.ndim(z0) == 0:
+                low, high = np.quantile(self.replicates, levels)
+            else:
+                low, high = (np.array([np.quantile(self.replicates[:, j], levels[i, j])
+                                       for j in range(self.replicates.shape[1])]) for i in range(2))
+        else:
+            raise ValueError(f"Método de intervalo desconocido: {method}")
+        return low, high
+
+
+def bootstrap(data, statistic=mean, resamples=10000, rng=None, chunk_elements=CHUNK_ELEMENTS):
+    """
+    Distribución bootstrap no paramétrica de `statistic` sobre `data` (un
+    array con una observación por fila; varias columnas para estadísticos de
+    datos emparejados como los cocientes).
+
+    `statistic(samples)` recibe un bloque de remuestras con forma
+    (remuestras, n, ...) y devuelve un valor por remuestra, o una fila de
+    valores si calcula varios estadísticos a la vez. Los índices de las
+    remuestras se generan por bloques de `chunk_elements` elementos como
+    mucho, así que la memoria no depende de `resamples`: 10 000 remuestras de
+    10^5 observaciones se procesan en bloques de unas 40 remuestras.
+    """
+    data = np.asarray(data, dtype=float)
+    rng = rng if rng is not None else np.random.default_rng()
+    n = len(data)
+    index_type = np.int32 if n < 2 ** 31 else np.int64
+    estimate = _evaluate(statistic, data[None])[0]
+    replicates = []
+    for rows in _chunks(resamples, data.size, chunk_elements):
+        indices = rng.integers(0, n, size=(rows, n), dtype=index_type)
+        replicates.append(_evaluate(statistic, data[indices]))
+    return BootstrapResult(data, statistic, estimate, np.concatenate(replicates), chunk_elements)
@@ -0,0 +1,95 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import stats
+
+
+def half_width(values, confidence=0.95):
+    """Semianchura del intervalo de confianza t de Student para la media."""
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n < 2:
+        return np.inf
+    return stats.t.ppf((1 + confidence) / 2, n - 1) * values.std(ddof=1) / np.sqrt(n)
+
+
+def paired_difference(first, second, confidence=0.95):
+    """
+    Media e intervalo de confianza de la diferencia entre dos configuraciones
+    simuladas con las mismas semillas (números aleatorios comunes): la
+    réplica i de ambas forma un par y el intervalo se calcula sobre las
+    diferencias por par. Devuelve (media, semianchura).
+    """
+    differences = np.asarray(first, dtype=float) - np.asarray(second, dtype=float)
+    return differences.mean(), half_width(differences, confidence)
+
+
+class ReplicationResult:
+    """Valores de cada KPI por réplica, con su media y la semianchura del intervalo."""
+    def __init__(self, values, confidence, targets, converged):
+        self.values = {kpi: np.asarray(v) for kpi, v in values.items()}
+        self.confidence = confidence
+        self.targets = targets
+        self.converged = converged
+        self.replications = len(next(iter(self.values.values())))
+
+    def mean(self, kpi):
+        return self.values[kpi].mean()
+
+    def half_width(self, kpi):
+        return half_width(self.values[kpi], self.confidence)
+
+    def print_summary(self):
+        status = 'alcanzada' if self.converged else 'NO alcanzada'
+        print(f"\nRéplicas: {self.replications} (precisión {status}, confianza {self.confidence * 100:.0f}%)")
+        for kpi in self.values:
+            print(f"  {kpi}: {self.mean(kpi):.4f} ± {self.half_width(kpi):.4f} (objetivo ± {self.targets[kpi]})")
+
+
+def seed_streams(seed, count, start=0):
+    """
+    Semillas independientes para `count` réplicas, derivadas de una semilla
+    raíz con SeedSequence. La réplica i recibe siempre la misma semilla,
+    sea cual sea el orden en que la ejecute el pool de procesos.
+    """
+    children = np.random.SeedSequence(seed).spawn(start + count)[start:]
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def run_until_precision(replicate, targets, seed=None, confidence=0.95, min_replications=10, max_replications=1000,
+                        relative=False, workers=None):
+    """
+    Ejecuta réplicas en paralelo hasta que la semianchura del intervalo de
+    confianza de cada KPI sea menor que su objetivo.
+
+    `replicate(seed)` debe ser una función de nivel de módulo (para poder
+    enviarla a otro proceso) que ejecuta una réplica con esa semilla y
+    devuelve un diccionario {kpi: valor}. `targets` indica la semianchura
+    objetivo de cada KPI; con `relative=True` es una fracción de la media.
+
+    Las réplicas se lanzan por tandas del tamaño del pool y la regla de
+    parada se comprueba al final de cada tanda.
+    """
+    workers = workers or os.cpu_count() or 1
+    root_seed = seed if seed is not None else np.random.SeedSequence().entropy
+    values = {kpi: [] for kpi in targets}
+    converged = False
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        done = 0
+        while done < max_replications:
+            batch = max(workers, min_replications - done)
+            batch = min(batch, max_replications - done)
+            for result in pool.map(replicate, seed_streams(root_seed, batch, start=done)):
+                for kpi in targets:
+                    values[kpi].append(result[kpi])
+            done += batch
+            if done < min_replications:
+                continue
+            converged = all(
+                half_width(values[kpi], confidence) <= (target * abs(np.mean(values[kpi])) if relative else target)
+                for kpi, target in targets.items()
+            )
+            if converged:
+                break
+    return ReplicationResult(values, confidence, targets, converged)
@@ -0,0 +1,102 @@
+import numpy as np
+
+
+class TimeSeriesRecorder:
+    """
+    Registro de una serie temporal por intervalos fijos de `bin_width`.
+
+    En lugar de guardar cada par (tiempo, valor), cada intervalo conserva el
+    mínimo, el máximo y el último valor registrado en vectores preasignados.
+    Con `horizon` se reservan de antemano todos los intervalos de la
+    simulación; sin él los vectores crecen por duplicación. Con `ring` se
+    conservan solo los últimos `ring` intervalos (buffer circular), de modo
+    que la memoria queda acotada en simulaciones de varias semanas.
+    """
+    def __init__(self, bin_width, horizon=None, ring=None, initial_capacity=1024):
+        self.bin_width = bin_width
+        self.ring = ring
+        if ring is not None:
+            capacity = ring
+        elif horizon is not None:
+            capacity = int(np.ceil(horizon / bin_width)) + 1
+        else:
+            capacity = initial_capacity
+        self.bin_ids = np.full(capacity, -1, dtype=np.int64)
+        self.mins = np.empty(capacity)
+        self.maxs = np.empty(capacity)
+        self.lasts = np.empty(capacity)
+        # Valor vigente al comenzar cada intervalo, para rellenar los huecos del buffer circular
+        self.entries = np.empty(capacity)
+        self.current = np.nan
+        self.first_bin = None
+        self.last_bin = None
+        self.records = 0
+
+    def _grow(self, bin_id):
+        size = len(self.bin_ids)
+        new_size = max(2 * size, bin_id + 1)
+        self.bin_ids = np.concatenate([self.bin_ids, np.full(new_size - size, -1, dtype=np.int64)])
+        self.mins = np.resize(self.mins, new_size)
+        self.maxs = np.resize(self.maxs, new_size)
+        self.lasts = np.resize(self.lasts, new_size)
+        self.entries = np.resize(self.entries, new_size)
+
+    def record(self, time, value):
+        bin_id = int(time // self.bin_width)
+        if self.ring is not None:
+            slot = bin_id % self.ring
+        else:
+            if bin_id >= len(self.bin_ids):
+                self._grow(bin_id)
+            slot = bin_id
+        if self.bin_ids[slot] != bin_id:
+            # Primer registro del intervalo (o el hueco del buffer se reutiliza)
+            self.bin_ids[slot] = bin_id
+            self.entries[slot] = self.current
+            # El nivel vigente al comenzar el intervalo también forma parte de él
+            self.mins[slot] = np.fmin(value, self.current)
+            self.maxs[slot] = np.fmax(value, self.current)
+        elif value < self.mins[slot]:
+            self.mins[slot] = value
+        elif value > self.maxs[slot]:
+            self.maxs[slot] = value
+        self.lasts[slot] = value
+        self.current = value
+        if self.first_bin is None:
+            self.first_bin = bin_id
+        self.last_bin = bin_id
+        self.records += 1
+
+    def __len__(self):
+        return self.records
+
+    def bins(self):
+        """
+        Devuelve (inicio, mínimo, máximo, último) de cada intervalo, en orden
+        cronológico. Los intervalos sin registros mantienen el último valor
+        del intervalo anterior, ya que la serie es escalonada.
+        """
+        if self.last_bin is None:
+            empty = np.empty(0)
+            return empty, empty, empty, empty
+        first = self.first_bin
+        if self.ring is not None:
+            first = max(first, self.last_bin - self.ring + 1)
+        ids = np.arange(first, self.last_bin + 1)
+        slots = ids % self.ring if self.ring is not None else ids
+        stored = self.bin_ids[slots] == ids
+        # Índice del último intervalo con registros en cada posición
+        carried = np.maximum.accumulate(np.where(stored, np.arange(len(ids)), 0))
+        lasts = self.lasts[slots][carried]
+        if not stored[0]:
+            # Intervalos iniciales del buffer circular sin registros: valor vigente al comenzar el primero con registros
+            first_stored = np.argmax(stored)
+            lasts[:first_stored] = self.entries[slots[first_stored]]
+        mins = np.where(stored, self.mins[slots], lasts)
+        maxs = np.where(stored, self.maxs[slots], lasts)
+        return ids * self.bin_width, mins, maxs, lasts
+
+    def series(self):
+        """Pares (tiempo, valor) con el último valor de cada intervalo, listos para dibujar."""
+        times, _, _, lasts = self.bins()
+        return times, lasts
@@ -0,0 +1,84 @@
+import atexit
+import json
+import os
+import random
+import sys
+
+# Niveles de los eventos, de menor a mayor importancia
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30}
+
+# Ficheros de traza abiertos, compartidos por todos los trazadores que escriben en la misma ruta
+_files = {}
+
+
+def _open(path):
+    if path == '-':
+        return sys.stdout
+    if path not in _files:
+        _files[path] = open(path, 'a', buffering=1 << 16)
+    return _files[path]
+
+
+@atexit.register
+def _close_all():
+    for file in _files.values():
+        file.close()
+    _files.clear()
+
+
+class Tracer:
+    """
+    Traza de eventos de la simulación, desactivada por defecto.
+
+    Con la traza desactivada `enabled` es False y los modelos no llegan a
+    construir el evento: el coste es la comprobación de un atributo
+
+        if tracer.enabled:
+            tracer.event('llegada', env.now, vehiculo=vehicle_id)
+
+    Activada, cada evento se escribe como una línea JSON ({'t', 'src',
+    'event', 'level', ...campos}) en `path` ('-' para la salida estándar).
+    Solo se registran los eventos de nivel `level` o superior, y de ellos
+    una fracción `sample` elegida con un generador propio, para no alterar
+    los números aleatorios de la simulación.
+    """
+    def __init__(self, name, path=None, level='INFO', sample=1.0, seed=None):
+        self.name = name
+        self.enabled = path is not None and sample > 0
+        self.level = LEVELS[level.upper()]
+        self.sample = sample
+        self.random = random.Random(seed)
+        self.file = _open(path) if self.enabled else None
+
+    def wants(self, level):
+        """True si un evento de ese nivel se registraría (para evitar calcular campos costosos)."""
+        return self.enabled and LEVELS[level] >= self.level
+
+    def event(self, kind, time, level='INFO', **fields):
+        if not self.enabled or LEVELS[level] < self.level:
+            return
+        if self.sample < 1 and self.random.random() >= self.sample:
+            return
+        record = {'t': time, 'src': self.name, 'event': kind, 'level': level}
+        record.update(fields)
+        self.file.write(json.dumps(record, default=str) + '\n')
+
+
+def get_tracer(name):
+    """
+    Trazador configurado con variables de entorno, para activar la traza
+    sin tocar el código:
+
+        SIM_TRACE=traza.jsonl   fichero de salida ('-' para la consola); sin ella no hay traza
+        SIM_TRACE_LEVEL=DEBUG   nivel mínimo (INFO por defecto)
+        SIM_TRACE_SAMPLE=0.1    fracción de eventos registrados (1 por defecto)
+        SIM_TRACE_SEED=1        semilla del muestreo
+    """
+    seed = os.environ.get('SIM_TRACE_SEED')
+    return Tracer(
+        name,
+        path=os.environ.get('SIM_TRACE') or None,
+        level=os.environ.get('SIM_TRACE_LEVEL', 'INFO'),
+        sample=float(os.environ.get('SIM_TRACE_SAMPLE', 1.0)),
+        seed=int(seed) if seed is not None else None,
+    )
@@ -1,10 +1,16 @@
+import os
+import sys
 import simpy
 import random
 import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.calendario import Calendar
 
 # Parameters:
 RANDOM_SEED = 42
 SIMULATION_TIME = 2 * 60 * 60   # 2 hours (in seconds)
+START_HOUR = 7                  # Time of day at which the simulation starts
+PEAK_HOURS = [(8, 10), (17, 19)]  # Peak periods (from hour, to hour), i.e. the hours 8, 9, 17 and 18
 INTER_ARRIVAL_TIME = 30         # Average arrival time between vehicles in seconds
 GREEN_LIGHT_DURATION = 60       # Green light duration in seconds
 RED_LIGHT_DURATION = 60         # Red light duration in seconds
@@ -15,14 +21,14 @@ class VehicleGenerator:
     def __init__(self, env, intersection):
         self.env = env
         self.intersection = intersection
+        self.calendar = Calendar(env, unit='s', start_hour=START_HOUR, peaks=PEAK_HOURS)
         self.vehicle_count = 0
         self.env.process(self.run())
 
     def run(self):
         while True:
             # Adjust the inter-arrival time during peak hours
-            hour = self.env.now // 3600
-            if hour in [8, 9, 17, 18]:  # Assuming peak hours are 8-9 AM and 5-6 PM
+            if self.calendar.is_peak():
                 inter_arrival_time = INTER_ARRIVAL_TIME * PEAK_HOUR_FACTOR
             else:
                 inter_arrival_time = INTER_ARRIVAL_TIME
@@ -1,14 +1,24 @@
+import contextlib
+import os
+import sys
 import simpy
-import random
 import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.calendario import Calendar
+from herramientas.aleatorios import RandomStreams
+from herramientas.replicaciones import paired_difference, seed_streams
 
 # Parameters:
 RANDOM_SEED = 42
 SIMULATION_TIME = 2 * 60 * 60   # 2 hours (in seconds)
+START_HOUR = 7                  # Time of day at which the simulation starts
+PEAK_HOURS = [(8, 10), (17, 19)]  # Peak periods (from hour, to hour), i.e. the hours 8, 9, 17 and 18
 INTER_ARRIVAL_TIME = 30         # Average arrival time between vehicles in seconds
 GREEN_LIGHT_DURATION = 60       # Green light duration in seconds
 RED_LIGHT_DURATION = 60         # Red light duration in seconds
 PEAK_HOUR_FACTOR = 0.5          # Reduction in inter-arrival time during peak hours
+ALTERNATIVE_GREEN_LIGHT_DURATION = 45  # Green light duration compared against GREEN_LIGHT_DURATION
+REPLICATIONS = 20               # Replications of each scenario in the comparison
 
 # Vehicle types:
 VEHICLE_TYPES = {
@@ -19,29 +29,32 @@ VEHICLE_TYPES = {
 
 # Vehicle generator:
 class VehicleGenerator:
-    def __init__(self, env, intersection):
+    def __init__(self, env, intersection, streams):
         self.env = env
         self.intersection = intersection
+        self.streams = streams
+        self.calendar = Calendar(env, unit='s', start_hour=START_HOUR, peaks=PEAK_HOURS)
         self.vehicle_count = 0
         self.env.process(self.run())
 
     def run(self):
         while True:
             # Adjust the inter-arrival time during peak hours
-            hour = self.env.now // 3600
-            if hour in [8, 9, 17, 18]:  # Assuming peak hours are 8-9 AM and 5-6 PM
+            if self.calendar.is_peak():
                 inter_arrival_time = INTER_ARRIVAL_TIME * PEAK_HOUR_FACTOR
             else:
                 inter_arrival_time = INTER_ARRIVAL_TIME
             
             # Generate a vehicle
-            yield self.env.timeout(random.expovariate(1.0 / inter_arrival_time))
+            yield self.env.timeout(self.streams['arrivals'].expovariate(1.0 / inter_arrival_time))
             self.vehicle_count += 1
-            vehicle_type = random.choice(list(VEHICLE_TYPES.keys()))
+            vehicle_type = self.streams['vehicle_types'].choice(list(VEHICLE_TYPES.keys()))
+            # The crossing time is drawn on arrival so that each vehicle keeps it in every scenario
+            crossing_time = self.streams['crossing'].uniform(*VEHICLE_TYPES[vehicle_type]['cross_time'])
             print(f"{self.env.now:.2f}: Vehicle {self.vehicle_count} ({vehicle_type}) generated")
-            self.env.process(self.vehicle(self.vehicle_count, vehicle_type))
+            self.env.process(self.vehicle(self.vehicle_count, vehicle_type, crossing_time))
 
-    def vehicle(self, vehicle_id, vehicle_type):
+    def vehicle(self, vehicle_id, vehicle_type, crossing_time):
         # Each vehicle requests to cross the intersection
         arrival_time = self.env.now
         print(f"{self.env.now:.2f}: Vehicle {vehicle_id} ({vehicle_type}) arrived at intersection")
@@ -50,12 +63,13 @@ class VehicleGenerator:
             waiting_time = self.env.now - arrival_time
             self.intersection.waiting_times.append((vehicle_type, waiting_time))
             print(f"{self.env.now:.2f}: Vehicle {vehicle_id} ({vehicle_type}) started crossing after waiting {waiting_time:.2f} seconds")
-            yield self.env.process(self.intersection.cross(vehicle_id, vehicle_type))
+            yield self.env.process(self.intersection.cross(vehicle_id, vehicle_type, crossing_time))
 
 # Traffic Light Control
 class TrafficLight:
-    def __init__(self, env):
+    def __init__(self, env, green_light_duration=GREEN_LIGHT_DURATION):
         self.env = env
+        self.green_light_duration = green_light_duration
         self.green = True
         self.action = env.process(self.run())
 
@@ -64,7 +78,7 @@ class TrafficLight:
             # Green light phase
             self.green = True
             print(f"{self.env.now:.2f}: Traffic light turned GREEN")
-            yield self.env.timeout(GREEN_LIGHT_DURATION)
+            yield self.env.timeout(self.green_light_duration)
             # Red light phase
             self.green = False
             print(f"{self.env.now:.2f}: Traffic light turned RED")
@@ -72,67 +86,102 @@ class TrafficLight:
 
 # Intersection with Traffic Light
 class Intersection:
-    def __init__(self, env):
+    def __init__(self, env, green_light_duration=GREEN_LIGHT_DURATION):
         self.env = env
         self.crossing = simpy.Resource(env, capacity=1)
-        self.traffic_light = TrafficLight(env)
+        self.traffic_light = TrafficLight(env, green_light_duration)
         self.waiting_times = []
 
-    def cross(self, vehicle_id, vehicle_type):
+    def cross(self, vehicle_id, vehicle_type, crossing_time):
         # Only allow crossing if the light is green
         while not self.traffic_light.green:
             yield self.env.timeout(1)
         # Simulate the time it takes for a vehicle to cross
-        crossing_time = random.uniform(*VEHICLE_TYPES[vehicle_type]['cross_time'])
         print(f"{self.env.now:.2f}: Vehicle {vehicle_id} ({vehicle_type}) is crossing the intersection and will take {crossing_time:.2f} seconds")
         yield self.env.timeout(crossing_time)
 
 # Setup and Run Simulation
-def run_simulation():
-    random.seed(RANDOM_SEED)
+def run_simulation(green_light_duration=GREEN_LIGHT_DURATION, seed=RANDOM_SEED, antithetic=False):
+    # Each source of randomness (arrivals, vehicle types, crossing times) has its own stream
+    streams = RandomStreams(seed, antithetic)
     env = simpy.Environment()
-    intersection = Intersection(env)
-    vehicle_generator = VehicleGenerator(env, intersection)
+    intersection = Intersection(env, green_light_duration)
+    vehicle_generator = VehicleGenerator(env, intersection, streams)
     env.run(until=SIMULATION_TIME)
     return intersection.waiting_times
 
-# Run the simulation and collect results
-waiting_times = run_simulation()
-
-# Analyze and visualize results by vehicle type
-vehicle_types = list(VEHICLE_TYPES.keys())
-waiting_times_by_type = {vehicle_type: [] for vehicle_type in vehicle_types}
-for vehicle_type, waiting_time in waiting_times:
-    waiting_times_by_type[vehicle_type].append(waiting_time)
-
-plt.subplot(1, 2, 1)
-for vehicle_type in vehicle_types:
-    plt.hist(waiting_times_by_type[vehicle_type], bins=30, alpha=0.5, label=vehicle_type, edgecolor='black')
-
-plt.xlabel('Waiting time (seconds)')
-plt.ylabel('Number of vehicles')
-plt.title('Distribution of vehicle waiting times at the intersection by vehicle type')
-plt.legend()
-plt.grid(True)
-
-# Boxplot of waiting times by vehicle type
-plt.subplot(1, 2, 2)
-plt.boxplot([waiting_times_by_type[vehicle_type] for vehicle_type in vehicle_types], tick_labels=vehicle_types, vert=False)
-plt.xlabel('Waiting time (seconds)')
-plt.title('Boxplot of vehicle waiting times at the intersection by vehicle type')
-plt.grid(True)
-plt.show()
-
-# Print summary of main KPIs by vehicle type
-print("\nSummary of Main KPIs by Vehicle Type:")
-for vehicle_type in vehicle_types:
-    times = waiting_times_by_type[vehicle_type]
-    average_waiting_time = sum(times) / len(times) if times else 0
-    max_waiting_time = max(times) if times else 0
-    min_waiting_time = min(times) if times else 0
-    total_vehicles = len(times)
-    print(f"\n{vehicle_type}: ")
-    print(f"  Total number of vehicles: {total_vehicles}")
-    print(f"  Minimum waiting time: {min_waiting_time:.2f} seconds")
-    print(f"  Average waiting time: {average_waiting_time:.2f} seconds")
-    print(f"  Maximum waiting time: {max_waiting_time:.2f} seconds")
\ No newline at end of file
+def mean_waiting_time(green_light_duration, seed, antithetic=False):
+    # Replication of the comparison, without the per-event output
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        waiting_times = run_simulation(green_light_duration, seed, antithetic)
+    return sum(waiting_time for _, waiting_time in waiting_times) / len(waiting_times)
+
+def compare_green_light_durations():
+    # Difference in mean waiting time between both green light durations, with the same number of runs per scheme
+    seeds = seed_streams(RANDOM_SEED, 2 * REPLICATIONS)
+    independent = paired_difference(
+        [mean_waiting_time(ALTERNATIVE_GREEN_LIGHT_DURATION, seed) for seed in seeds[REPLICATIONS:]],
+        [mean_waiting_time(GREEN_LIGHT_DURATION, seed) for seed in seeds[:REPLICATIONS]])
+    common = paired_difference(
+        [mean_waiting_time(ALTERNATIVE_GREEN_LIGHT_DURATION, seed) for seed in seeds[:REPLICATIONS]],
+        [mean_waiting_time(GREEN_LIGHT_DURATION, seed) for seed in seeds[:REPLICATIONS]])
+    # Antithetic pairs: each observation is the average of a run and its antithetic run
+    pairs = seeds[:REPLICATIONS // 2]
+    antithetic = paired_difference(
+        [(mean_waiting_time(ALTERNATIVE_GREEN_LIGHT_DURATION, seed)
+          + mean_waiting_time(ALTERNATIVE_GREEN_LIGHT_DURATION, seed, antithetic=True)) / 2 for seed in pairs],
+        [(mean_waiting_time(GREEN_LIGHT_DURATION, seed)
+          + mean_waiting_time(GREEN_LIGHT_DURATION, seed, antithetic=True)) / 2 for seed in pairs])
+    print(f"\nAverage waiting time with {ALTERNATIVE_GREEN_LIGHT_DURATION} s minus {GREEN_LIGHT_DURATION} s of green light "
+          f"({REPLICATIONS} runs per scenario, 95% confidence):")
+    print(f"  Independent seeds: {independent[0]:.2f} ± {independent[1]:.2f} seconds")
+    print(f"  Common random numbers: {common[0]:.2f} ± {common[1]:.2f} seconds")
+    print(f"  Common random numbers and antithetic pairs: {antithetic[0]:.2f} ± {antithetic[1]:.2f} seconds")
+
+def main():
+    # Run the simulation and collect results
+    waiting_times = run_simulation()
+
+    # Analyze and visualize results by vehicle type
+    vehicle_types = list(VEHICLE_TYPES.keys())
+    waiting_times_by_type = {vehicle_type: [] for vehicle_type in vehicle_types}
+    for vehicle_type, waiting_time in waiting_times:
+        waiting_times_by_type[vehicle_type].append(waiting_time)
+
+    plt.subplot(1, 2, 1)
+    for vehicle_type in vehicle_types:
+        plt.hist(waiting_times_by_type[vehicle_type], bins=30, alpha=0.5, label=vehicle_type, edgecolor='black')
+
+    plt.xlabel('Waiting time (seconds)')
+    plt.ylabel('Number of vehicles')
+    plt.title('Distribution of vehicle waiting times at the intersection by vehicle type')
+    plt.legend()
+    plt.grid(True)
+
+    # Boxplot of waiting times by vehicle type
+    plt.subplot(1, 2, 2)
+    plt.boxplot([waiting_times_by_type[vehicle_type] for vehicle_type in vehicle_types], tick_labels=vehicle_types, vert=False)
+    plt.xlabel('Waiting time (seconds)')
+    plt.title('Boxplot of vehicle waiting times at the intersection by vehicle type')
+    plt.grid(True)
+    plt.show()
+
+    # Print summary of main KPIs by vehicle type
+    print("\nSummary of Main KPIs by Vehicle Type:")
+    for vehicle_type in vehicle_types:
+        times = waiting_times_by_type[vehicle_type]
+        average_waiting_time = sum(times) / len(times) if times else 0
+        max_waiting_time = max(times) if times else 0
+        min_waiting_time = min(times) if times else 0
+        total_vehicles = len(times)
+        print(f"\n{vehicle_type}: ")
+        print(f"  Total number of vehicles: {total_vehicles}")
+        print(f"  Minimum waiting time: {min_waiting_time:.2f} seconds")
+        print(f"  Average waiting time: {average_waiting_time:.2f} seconds")
+        print(f"  Maximum waiting time: {max_waiting_time:.2f} seconds")
+
+    # Compare two green light durations with independent seeds, common random numbers and antithetic variates
+    compare_green_light_durations()
+
+if __name__ == '__main__':
+    main()
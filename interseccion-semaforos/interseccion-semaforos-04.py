@@ -1,10 +1,17 @@
+import os
+import sys
 import simpy
 import random
 import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.calendario import Calendar
+from herramientas.instrumentacion import make_environment
 
 # Parameters:
 RANDOM_SEED = 42
 SIMULATION_TIME = 2 * 60 * 60   # 2 hours (in seconds)
+START_HOUR = 7                  # Time of day at which the simulation starts
+PEAK_HOURS = [(8, 10), (17, 19)]  # Peak periods (from hour, to hour), i.e. the hours 8, 9, 17 and 18
 INTER_ARRIVAL_TIME = 10         # Average arrival time between vehicles in seconds
 MIN_GREEN_LIGHT_DURATION = 30   # Minimum green light duration in seconds
 MAX_GREEN_LIGHT_DURATION = 120  # Maximum green light duration in seconds
@@ -21,20 +28,21 @@ VEHICLE_TYPES = {
 
 # Vehicle generator
 class VehicleGenerator:
-    def __init__(self, env, intersection):
+    def __init__(self, env, intersection, inter_arrival_time=INTER_ARRIVAL_TIME):
         self.env = env
         self.intersection = intersection
+        self.inter_arrival_time = inter_arrival_time
+        self.calendar = Calendar(env, unit='s', start_hour=START_HOUR, peaks=PEAK_HOURS)
         self.vehicle_count = 0
         self.env.process(self.run())
 
     def run(self):
         while True:
             # Adjust the inter-arrival time during peak hours
-            hour = self.env.now // 3600
-            if hour in [8, 9, 17, 18]:  # Assuming peak hours are 8-9 AM and 5-6 PM
-                inter_arrival_time = INTER_ARRIVAL_TIME * PEAK_HOUR_FACTOR
+            if self.calendar.is_peak():
+                inter_arrival_time = self.inter_arrival_time * PEAK_HOUR_FACTOR
             else:
-                inter_arrival_time = INTER_ARRIVAL_TIME
+                inter_arrival_time = self.inter_arrival_time
             
             # Generate a vehicle
             yield self.env.timeout(random.expovariate(1.0 / inter_arrival_time))
@@ -105,67 +113,72 @@ class Intersection:
         yield self.env.timeout(crossing_time)
 
 # Setup and Run Simulation
-def run_simulation():
-    random.seed(RANDOM_SEED)
-    env = simpy.Environment()
+def run_simulation(inter_arrival_time=INTER_ARRIVAL_TIME, seed=RANDOM_SEED):
+    random.seed(seed)
+    env = make_environment()
     intersection = Intersection(env)
-    vehicle_generator = VehicleGenerator(env, intersection)
+    vehicle_generator = VehicleGenerator(env, intersection, inter_arrival_time)
     env.run(until=SIMULATION_TIME)
-    return intersection.waiting_times, intersection.traffic_light
-
-# Run the simulation and collect results
-waiting_times, traffic_light = run_simulation()
-
-# Analyze and visualize results by vehicle type
-vehicle_types = list(VEHICLE_TYPES.keys())
-waiting_times_by_type = {vehicle_type: [] for vehicle_type in vehicle_types}
-for vehicle_type, waiting_time in waiting_times:
-    waiting_times_by_type[vehicle_type].append(waiting_time)
-
-plt.subplot(1, 3, 1)
-for vehicle_type in vehicle_types:
-    plt.hist(waiting_times_by_type[vehicle_type], bins=30, alpha=0.5, label=vehicle_type, edgecolor='black')
-
-plt.xlabel('Waiting time (seconds)')
-plt.ylabel('Number of vehicles')
-plt.title('Vehicle waiting times by vehicle type')
-plt.legend()
-plt.grid(True)
-
-# Boxplot of waiting times by vehicle type
-plt.subplot(1, 3, 2)
-plt.boxplot([waiting_times_by_type[vehicle_type] for vehicle_type in vehicle_types], tick_labels=vehicle_types, vert=False)
-plt.xlabel('Waiting time (seconds)')
-plt.title('Vehicle waiting times by vehicle type')
-plt.grid(True)
-
-# Bar chart of traffic light timings
-time_labels = ['Green Light', 'Red Light']
-time_values = [traffic_light.total_green_time, traffic_light.total_red_time]
-plt.subplot(1, 3, 3)
-plt.bar(time_labels, time_values, color=['green', 'red'])
-plt.xlabel('Traffic light state')
-plt.ylabel('Total time (seconds)')
-plt.title('Total time traffic light was green and red')
-plt.grid(axis='y')
-plt.show()
-
-# Print summary of main KPIs by vehicle type
-print("\nSummary of Main KPIs by Vehicle Type:")
-for vehicle_type in vehicle_types:
-    times = waiting_times_by_type[vehicle_type]
-    average_waiting_time = sum(times) / len(times) if times else 0
-    max_waiting_time = max(times) if times else 0
-    min_waiting_time = min(times) if times else 0
-    total_vehicles = len(times)
-    print(f"\n{vehicle_type}: ")
-    print(f"  Total number of vehicles: {total_vehicles}")
-    print(f"  Average waiting time: {average_waiting_time:.2f} seconds")
-    print(f"  Maximum waiting time: {max_waiting_time:.2f} seconds")
-    print(f"  Minimum waiting time: {min_waiting_time:.2f} seconds")
-
-# Print summary of traffic light timings
-print("\nTraffic Light Summary:")
-print(f"Total time the light was GREEN: {traffic_light.total_green_time} seconds")
-print(f"Total time the light was RED: {traffic_light.total_red_time} seconds")
-print(f"Number of times green light duration was adjusted: {traffic_light.adjustment_count}")
\ No newline at end of file
+    return env, intersection
+
+def main():
+    # Run the simulation and collect results
+    env, intersection = run_simulation()
+    waiting_times, traffic_light = intersection.waiting_times, intersection.traffic_light
+
+    # Analyze and visualize results by vehicle type
+    vehicle_types = list(VEHICLE_TYPES.keys())
+    waiting_times_by_type = {vehicle_type: [] for vehicle_type in vehicle_types}
+    for vehicle_type, waiting_time in waiting_times:
+        waiting_times_by_type[vehicle_type].append(waiting_time)
+
+    plt.subplot(1, 3, 1)
+    for vehicle_type in vehicle_types:
+        plt.hist(waiting_times_by_type[vehicle_type], bins=30, alpha=0.5, label=vehicle_type, edgecolor='black')
+
+    plt.xlabel('Waiting time (seconds)')
+    plt.ylabel('Number of vehicles')
+    plt.title('Vehicle waiting times by vehicle type')
+    plt.legend()
+    plt.grid(True)
+
+    # Boxplot of waiting times by vehicle type
+    plt.subplot(1, 3, 2)
+    plt.boxplot([waiting_times_by_type[vehicle_type] for vehicle_type in vehicle_types], tick_labels=vehicle_types, vert=False)
+    plt.xlabel('Waiting time (seconds)')
+    plt.title('Vehicle waiting times by vehicle type')
+    plt.grid(True)
+
+    # Bar chart of traffic light timings
+    time_labels = ['Green Light', 'Red Light']
+    time_values = [traffic_light.total_green_time, traffic_light.total_red_time]
+    plt.subplot(1, 3, 3)
+    plt.bar(time_labels, time_values, color=['green', 'red'])
+    plt.xlabel('Traffic light state')
+    plt.ylabel('Total time (seconds)')
+    plt.title('Total time traffic light was green and red')
+    plt.grid(axis='y')
+    plt.show()
+
+    # Print summary of main KPIs by vehicle type
+    print("\nSummary of Main KPIs by Vehicle Type:")
+    for vehicle_type in vehicle_types:
+        times = waiting_times_by_type[vehicle_type]
+        average_waiting_time = sum(times) / len(times) if times else 0
+        max_waiting_time = max(times) if times else 0
+        min_waiting_time = min(times) if times else 0
+        total_vehicles = len(times)
+        print(f"\n{vehicle_type}: ")
+        print(f"  Total number of vehicles: {total_vehicles}")
+        print(f"  Average waiting time: {average_waiting_time:.2f} seconds")
+        print(f"  Maximum waiting time: {max_waiting_time:.2f} seconds")
+        print(f"  Minimum waiting time: {min_waiting_time:.2f} seconds")
+
+    # Print summary of traffic light timings
+    print("\nTraffic Light Summary:")
+    print(f"Total time the light was GREEN: {traffic_light.total_green_time} seconds")
+    print(f"Total time the light was RED: {traffic_light.total_red_time} seconds")
+    print(f"Number of times green light duration was adjusted: {traffic_light.adjustment_count}")
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,13 @@
+import os
+import sys
 import simpy
 import random
 import pandas as pd
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.traza import get_tracer
+from herramientas.instrumentacion import make_environment
 
 # Parameters:
 NUM_BUSES = 3                   # number of buses in the system 
@@ -18,6 +23,9 @@ FARE_PER_STOP = 1.5             # fare per stop in currency units
 
 stops = [f"Stop {i + 1}" for i in range(NUM_STOPS)]
 
+# Event trace of buses and passengers (off unless SIM_TRACE is set, see herramientas/traza.py)
+tracer = get_tracer('linea-guagua-03')
+
 # DataFrame to store bus arrival times
 arrival_times = pd.DataFrame(columns=['Bus', 'Stop', 'Arrival Time', 'Departure Time', 'Passengers Arrival', 'Passengers Departure'])
 
@@ -31,11 +39,13 @@ class BusSystem:
     """
     Class to represent the bus system with multiple buses and passengers.
     """
-    def __init__(self, env):
+    def __init__(self, env, demand=1):
         """
         Initialize the bus system with the given simulation environment.
+        `demand` multiplies the passenger arrival rate.
         """
         self.env = env
+        self.demand = demand
         self.buses = [env.process(self.bus_process(env, f"Bus {i + 1}", i * BUS_INTERVAL)) for i in range(NUM_BUSES)]
         self.passenger_generator = env.process(self.generate_passengers(env))
         self.revenues = {f"Bus {i + 1}": 0 for i in range(NUM_BUSES)}
@@ -49,14 +59,16 @@ class BusSystem:
         while True:
             # Bus starts at the central station
             departure_time = env.now
-            print(f"{bus_name} departs from Central Station at {self.time_to_string(departure_time)}")
+            if tracer.enabled:
+                tracer.event('bus_departure', departure_time, bus=bus_name, stop='Central Station')
 
             # Bus visits each stop
             passengers = []
             for stop in stops:
                 yield env.timeout(random.randint(MIN_TIME_BETWEEN_STOPS, MAX_TIME_BETWEEN_STOPS))  # Random time between stops
                 arrival_time = env.now
-                print(f"{bus_name} arrives at {stop} at {self.time_to_string(arrival_time)}")
+                if tracer.enabled:
+                    tracer.event('bus_arrival', arrival_time, bus=bus_name, stop=stop)
                 passengers_arrival = len(passengers)
 
                 # Drop off passengers
@@ -69,7 +81,8 @@ class BusSystem:
                     passenger['bus'] = bus_name
                     boarding_time = random.randint(MIN_BOARDING_TIME, MAX_BOARDING_TIME)
                     yield env.timeout(boarding_time)  # Time taken for passenger to board
-                    print(f"Passenger {passenger['id']} boards {bus_name} at {stop} at {self.time_to_string(env.now)} (Boarding time: {boarding_time} minutes)")
+                    if tracer.enabled:
+                        tracer.event('boarding', env.now, level='DEBUG', passenger=passenger['id'], bus=bus_name, stop=stop, boarding_time=boarding_time)
                     passengers.append(passenger)
                     self.passengers_picked_up[stop] += 1
 
@@ -81,7 +94,8 @@ class BusSystem:
             yield env.timeout(random.randint(MIN_TIME_BETWEEN_STOPS, MAX_TIME_BETWEEN_STOPS))  # Random time back to central station
             arrival_time = env.now
             passengers_arrival = len(passengers)
-            print(f"{bus_name} returns to Central Station at {self.time_to_string(arrival_time)}")
+            if tracer.enabled:
+                tracer.event('bus_arrival', arrival_time, bus=bus_name, stop='Central Station')
             arrival_times.loc[len(arrival_times)] = [bus_name, 'Central Station', self.time_to_string(arrival_time), 'N/A', passengers_arrival, 'N/A']
             yield env.timeout(BUS_INTERVAL)
 
@@ -90,13 +104,14 @@ class BusSystem:
         Check if the passenger needs to get off at the current stop and update the passenger journey details.
         """
         if stop == passenger['destination']:
-            alighting_time = env.now
+            alighting_time = self.env.now
             waiting_time = passenger['boarding_time'] - passenger['arrival_time']
             travel_time = alighting_time - passenger['boarding_time']
             num_stops = stops.index(stop) - stops.index(passenger['stop'])
             fare = num_stops * FARE_PER_STOP
             self.revenues[bus_name] += fare
-            print(f"Passenger {passenger['id']} gets off {bus_name} at {stop} at {self.time_to_string(alighting_time)}. Fare: {fare}")
+            if tracer.enabled:
+                tracer.event('alighting', alighting_time, level='DEBUG', passenger=passenger['id'], bus=bus_name, stop=stop, fare=fare)
             passenger_journeys.loc[len(passenger_journeys)] = [
                 passenger['id'],
                 self.time_to_string(passenger['arrival_time']),
@@ -117,7 +132,7 @@ class BusSystem:
         """
         passenger_id = 1
         while True:
-            yield env.timeout(random.randint(1, 10))  # Randomly generate passengers
+            yield env.timeout(random.randint(1, 10) / self.demand)  # Randomly generate passengers
             stop = random.choice(stops)
             destination = random.choice([s for s in stops if s != stop])
             has_luggage = random.choice([True, False])
@@ -132,14 +147,15 @@ class BusSystem:
             }
             passenger_id += 1
             stop_queue[stop].put(passenger)
-            luggage_info = "with luggage" if has_luggage else "without luggage"
-            print(f"Passenger {passenger['id']} arrives at {stop} at {self.time_to_string(env.now)}, destination: {destination} ({luggage_info})")
+            if tracer.enabled:
+                tracer.event('passenger_arrival', env.now, level='DEBUG', passenger=passenger['id'], stop=stop, destination=destination, luggage=has_luggage)
 
     @staticmethod
     def time_to_string(minutes):
         """
         Convert time in minutes to HH:MM format.
         """
+        minutes = int(minutes)
         hours = minutes // 60
         mins = minutes % 60
         return f"{hours:02}:{mins:02}"
@@ -163,37 +179,16 @@ class StopQueue:
 # Initialize stop queues
 stop_queue = {stop: StopQueue() for stop in stops}
 
-# Run the simulation
-env = simpy.Environment()
-bus_system = BusSystem(env)
-env.run(until=SIMULATION_TIME)
-
-# Display arrival times table
-print("\nBus Arrival Times Table:")
-print(arrival_times)
-
-# Check if the DataFrame is empty
-if arrival_times.empty:
-    print("No bus arrival times were recorded.")
-else:
-    print(arrival_times)
-
-# Display passenger journey details table
-print("\nPassenger Journeys Table:")
-print(passenger_journeys)
-
-# Check if the DataFrame is empty
-if passenger_journeys.empty:
-    print("No passenger journeys were recorded.")
-else:
-    print(passenger_journeys)
-
-# Display bus revenues
-for bus, revenue in bus_system.revenues.items():
-    bus_revenues.loc[len(bus_revenues)] = [bus, revenue]
-
-print("\nBus Revenue Table:")
-print(bus_revenues)
+def run_simulation(demand=1, seed=None):
+    """
+    Run the simulation without showing results (it is also used by the benchmarks).
+    The results are kept in the module tables, which are not cleared between runs.
+    """
+    random.seed(seed)
+    env = make_environment()
+    bus_system = BusSystem(env, demand)
+    env.run(until=SIMULATION_TIME)
+    return env, bus_system
 
 # Plot the bus routes
 def plot_bus_routes(arrival_times):
@@ -212,8 +207,6 @@ def plot_bus_routes(arrival_times):
     plt.tight_layout()
     plt.show()
 
-plot_bus_routes(arrival_times)
-
 # Plot the waiting times for each passenger
 def plot_passenger_waiting_times(passenger_journeys):
     plt.figure(figsize=(10, 6))
@@ -225,8 +218,6 @@ def plot_passenger_waiting_times(passenger_journeys):
     plt.tight_layout()
     plt.show()
 
-plot_passenger_waiting_times(passenger_journeys)
-
 # Plot the number of passengers picked up at each stop
 def plot_passengers_picked_up(bus_system):
     plt.figure(figsize=(10, 6))
@@ -240,12 +231,48 @@ def plot_passengers_picked_up(bus_system):
     plt.tight_layout()
     plt.show()
 
-plot_passengers_picked_up(bus_system)
-
 # Plot a Sankey diagram showing the flow of passengers between stops
 def plot_sankey_diagram(passenger_journeys):
     if passenger_journeys.empty:
         print("No data available for Sankey diagram.")
         return
 
-    source_stops = passenger_journeys['Arrival Time at Stop'].tolist()
\ No newline at end of file
+    source_stops = passenger_journeys['Arrival Time at Stop'].tolist()
+
+def main():
+    env, bus_system = run_simulation()
+
+    # Display arrival times table
+    print("\nBus Arrival Times Table:")
+    print(arrival_times)
+
+    # Check if the DataFrame is empty
+    if arrival_times.empty:
+        print("No bus arrival times were recorded.")
+    else:
+        print(arrival_times)
+
+    # Display passenger journey details table
+    print("\nPassenger Journeys Table:")
+    print(passenger_journeys)
+
+    # Check if the DataFrame is empty
+    if passenger_journeys.empty:
+        print("No passenger journeys were recorded.")
+    else:
+        print(passenger_journeys)
+
+    # Display bus revenues
+    for bus, revenue in bus_system.revenues.items():
+        bus_revenues.loc[len(bus_revenues)] = [bus, revenue]
+
+    print("\nBus Revenue Table:")
+    print(bus_revenues)
+
+    # Plots
+    plot_bus_routes(arrival_times)
+    plot_passenger_waiting_times(passenger_journeys)
+    plot_passengers_picked_up(bus_system)
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,33 @@
+import argparse
+import time
 import simpy
 import random
 import numpy as np
+from herramientas.replicaciones import run_until_precision
+from herramientas.colas import configuration_grid, ggc, sweep, wait_exceeds
 
 # Parámetros:
 CAPACIDAD_APARCAMIENTO = 50     # Número máximo de plazas disponibles
 TASA_LLEGADA_VEHICULOS = 1/2    # Tasa de llegada de vehículos (1 cada 2 minutos)
+VEHICULOS_POR_MINUTO = 1 / TASA_LLEGADA_VEHICULOS  # Tasa que usa el modelo: la constante anterior actúa como intervalo medio entre llegadas
 DURACION_ESTANCIA_MIN = 10      # Estancia mínima en minutos
 DURACION_ESTANCIA_MAX = 60      # Estancia máxima en minutos
 TIEMPO_BUSQUEDA_LIMITE = 15     # Máximo tiempo de búsqueda antes de que el conductor se retire (minutos)
 TARIFA_BASE = 2                 # Tarifa base de aparcamiento en unidades monetarias
 FACTOR_DEMANDA = 0.05           # Factor de incremento de la tarifa por ocupación alta
+DURACION_SIMULACION = 1440      # Duración de cada réplica en minutos (un día)
+
+# Precisión objetivo (semianchura del intervalo de confianza al 95%) de cada KPI
+PRECISION_OBJETIVO = {
+    'tiempo_busqueda': 0.05,        # minutos
+    'tasa_abandono': 0.5,           # puntos porcentuales
+    'ingreso_por_vehiculo': 0.01,   # unidades monetarias
+}
+
+# Cribado analítico de configuraciones (--cribado)
+CAPACIDADES_CRIBADO = range(1, 201)                         # Plazas de cada configuración candidata
+TASAS_LLEGADA_CRIBADO = np.linspace(0.1, 5, 50)             # Vehículos por minuto de cada configuración candidata
+ABANDONO_MAXIMO = 1.0                                       # Porcentaje de abandonos admitido (%)
 
 # Estadísticas
 tiempos_busqueda = []
@@ -55,46 +73,106 @@ def buscar_aparcamiento(env, aparcamiento, vehiculo_id):
             vehiculos_retirados += 1
 
 # Proceso principal que genera vehículos
-def generar_vehiculos(env, aparcamiento):
+def generar_vehiculos(env, aparcamiento, tasa_llegada=VEHICULOS_POR_MINUTO):
     vehiculo_id = 0
     while True:
-        yield env.timeout(random.expovariate(1 / TASA_LLEGADA_VEHICULOS))
+        yield env.timeout(random.expovariate(tasa_llegada))
         env.process(buscar_aparcamiento(env, aparcamiento, vehiculo_id))
         vehiculo_id += 1
 
-# Simulación
-def run_simulacion():
+# Réplica de un día con una semilla dada; devuelve los KPIs
+def simular_dia(semilla=None, capacidad=CAPACIDAD_APARCAMIENTO, tasa_llegada=VEHICULOS_POR_MINUTO):
     global tiempos_busqueda, vehiculos_retirados, ingresos_totales, total_vehiculos
     tiempos_busqueda = []
     vehiculos_retirados = 0
     ingresos_totales = 0
     total_vehiculos = 0
+    random.seed(semilla)
 
     # Crear el entorno de simulación y el recurso aparcamiento
     env = simpy.Environment()
-    aparcamiento = simpy.Resource(env, capacity=CAPACIDAD_APARCAMIENTO)
+    aparcamiento = simpy.Resource(env, capacity=capacidad)
     
     # Iniciar la generación de vehículos
-    env.process(generar_vehiculos(env, aparcamiento))
+    env.process(generar_vehiculos(env, aparcamiento, tasa_llegada))
     
     # Ejecutar la simulación por un día (1440 minutos)
-    env.run(until=1440)
+    env.run(until=DURACION_SIMULACION)
     
     # Resultados de la simulación
     if tiempos_busqueda:
         tiempo_promedio_busqueda = np.mean(tiempos_busqueda)
     else:
         tiempo_promedio_busqueda = 0
-    
-    tasa_ocupacion = aparcamiento.count / aparcamiento.capacity
-    tasa_abandono = (vehiculos_retirados / total_vehiculos) * 100
-    ingresos_promedio = ingresos_totales / total_vehiculos
 
-    print(f"Tiempo promedio de búsqueda de aparcamiento: {tiempo_promedio_busqueda:.2f} minutos")
-    print(f"Tasa de ocupación del aparcamiento: {tasa_ocupacion * 100:.2f}%")
-    print(f"Porcentaje de vehículos que abandonan la búsqueda: {tasa_abandono:.2f}%")
-    print(f"Ingresos promedio por vehículo: {ingresos_promedio:.2f} unidades monetarias")
-    print(f"Vehículos que se retiraron por falta de plazas: {vehiculos_retirados}")
+    return {
+        'tiempo_busqueda': tiempo_promedio_busqueda,
+        'tasa_ocupacion': aparcamiento.count / aparcamiento.capacity * 100,
+        'tasa_abandono': (vehiculos_retirados / total_vehiculos) * 100,
+        'ingreso_por_vehiculo': ingresos_totales / total_vehiculos,
+        'vehiculos_retirados': vehiculos_retirados,
+    }
+
+# Simulación
+def run_simulacion(semilla=None):
+    kpis = simular_dia(semilla)
+    print(f"Tiempo promedio de búsqueda de aparcamiento: {kpis['tiempo_busqueda']:.2f} minutos")
+    print(f"Tasa de ocupación del aparcamiento: {kpis['tasa_ocupacion']:.2f}%")
+    print(f"Porcentaje de vehículos que abandonan la búsqueda: {kpis['tasa_abandono']:.2f}%")
+    print(f"Ingresos promedio por vehículo: {kpis['ingreso_por_vehiculo']:.2f} unidades monetarias")
+    print(f"Vehículos que se retiraron por falta de plazas: {kpis['vehiculos_retirados']}")
+
+# Réplicas en paralelo hasta alcanzar la precisión objetivo
+def run_replicaciones(semilla=None, max_replicas=1000, procesos=None):
+    resultado = run_until_precision(simular_dia, PRECISION_OBJETIVO, seed=semilla, max_replications=max_replicas, workers=procesos)
+    resultado.print_summary()
+    return resultado
+
+# Modelo analítico G/G/c: la estancia es el tiempo de servicio y el tiempo límite de búsqueda es una paciencia fija,
+# así que el abandono se acota por la probabilidad de esperar más que ese límite
+def evaluar_configuraciones(configuraciones):
+    duracion_media = (DURACION_ESTANCIA_MIN + DURACION_ESTANCIA_MAX) / 2
+    variacion_estancia = (DURACION_ESTANCIA_MAX - DURACION_ESTANCIA_MIN) ** 2 / (3 * (DURACION_ESTANCIA_MIN + DURACION_ESTANCIA_MAX) ** 2)
+    tasa_llegada = configuraciones['tasa_llegada'].values
+    capacidad = configuraciones['capacidad'].values
+    metricas = ggc(tasa_llegada, 1 / duracion_media, capacidad, service_scv=variacion_estancia)
+    abandono = wait_exceeds(tasa_llegada, 1 / duracion_media, capacidad, TIEMPO_BUSQUEDA_LIMITE, service_scv=variacion_estancia)
+    return {'tasa_abandono': abandono * 100, 'tasa_ocupacion': metricas['utilization'] * 100}
+
+# Configuraciones prometedoras: la menor capacidad que cumple el abandono máximo para cada tasa de llegada
+def es_prometedora(resultados):
+    validas = resultados[resultados['tasa_abandono'] <= ABANDONO_MAXIMO]
+    minimas = validas.groupby('tasa_llegada')['capacidad'].transform('min')
+    return resultados.index.isin(validas.index[validas['capacidad'] == minimas])
+
+# Réplica de un día de una configuración del cribado (misma semilla en todas)
+def simular_configuracion(capacidad, tasa_llegada, semilla=0):
+    return simular_dia(semilla, capacidad, tasa_llegada)
+
+# Cribado analítico de todas las configuraciones y simulación solo de las prometedoras
+def run_cribado(procesos=None):
+    configuraciones = configuration_grid(capacidad=CAPACIDADES_CRIBADO, tasa_llegada=TASAS_LLEGADA_CRIBADO)
+    inicio = time.perf_counter()
+    evaluadas, simuladas = sweep(configuraciones, evaluar_configuraciones, es_prometedora, simular_configuracion,
+                                 workers=procesos)
+    print(f"Configuraciones evaluadas analíticamente: {len(evaluadas)}; simuladas: {len(simuladas)} "
+          f"({time.perf_counter() - inicio:.2f} s en total)")
+    print(simuladas[['capacidad', 'tasa_llegada', 'tasa_abandono', 'sim_tasa_abandono', 'tasa_ocupacion']]
+          .to_string(index=False, float_format='{:.2f}'.format))
+    return simuladas
 
 # Ejecutar la simulación
-run_simulacion()
\ No newline at end of file
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Simulación de búsqueda de aparcamiento')
+    parser.add_argument('--replicaciones', action='store_true', help='ejecutar réplicas hasta alcanzar la precisión objetivo')
+    parser.add_argument('--cribado', action='store_true', help='cribar analíticamente configuraciones y simular solo las prometedoras')
+    parser.add_argument('--semilla', type=int, default=None, help='semilla raíz de la simulación')
+    parser.add_argument('--max-replicas', type=int, default=1000, help='número máximo de réplicas')
+    parser.add_argument('--procesos', type=int, default=None, help='procesos del pool (por defecto, uno por CPU)')
+    args = parser.parse_args()
+    if args.replicaciones:
+        run_replicaciones(args.semilla, args.max_replicas, args.procesos)
+    elif args.cribado:
+        run_cribado(args.procesos)
+    else:
+        run_simulacion(args.semilla)
\ No newline at end of file
@@ -0,0 +1,164 @@
+import os
+import random
+import sys
+
+import numpy as np
+import simpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.estadisticas import TimeWeightedAccumulator
+
+
+class GateLane:
+    """
+    Carril de un control de acceso o de salida. Atiende un vehículo a la vez.
+
+    Los carriles ANPR (lectura automática de matrícula) tienen un tiempo de
+    servicio menor, pero si la lectura falla el vehículo pasa por el proceso
+    manual. Los carriles de abonados solo admiten vehículos abonados.
+    """
+    def __init__(self, env, lane_id, service_time, anpr=False, anpr_time=None, anpr_failure_rate=0.0, subscribers_only=False):
+        self.env = env
+        self.lane_id = lane_id
+        self.resource = simpy.Resource(env, capacity=1)
+        self.service_time = service_time
+        self.anpr = anpr
+        self.anpr_time = anpr_time
+        self.anpr_failure_rate = anpr_failure_rate
+        self.subscribers_only = subscribers_only
+        # Ocupación del carril y longitud de su cola, ponderadas en el tiempo
+        self.busy = TimeWeightedAccumulator(env)
+        self.queue = TimeWeightedAccumulator(env)
+        self.vehicles = 0
+        self.total_wait_time = 0.0
+        self.total_service_time = 0.0
+        self.max_wait_time = 0.0
+
+    def load(self):
+        # Vehículos en el carril: el que está siendo atendido más los que esperan
+        return self.resource.count + len(self.resource.queue)
+
+    def mean_service_time(self):
+        if self.anpr:
+            return self.anpr_time * (1 - self.anpr_failure_rate) + self.service_time * self.anpr_failure_rate
+        return self.service_time
+
+    def sample_service_time(self):
+        if self.anpr and random.random() >= self.anpr_failure_rate:
+            return random.expovariate(1.0 / self.anpr_time)
+        return random.expovariate(1.0 / self.service_time)
+
+    def label(self):
+        kind = 'ANPR' if self.anpr else 'Manual'
+        if self.subscribers_only:
+            kind += ', abonados'
+        return f"Carril {self.lane_id + 1} ({kind})"
+
+
+def make_lanes(env, num_lanes, service_time, anpr_lanes=0, anpr_time=None, anpr_failure_rate=0.0, subscriber_lanes=0):
+    """
+    Crea los carriles de un control. Los primeros `anpr_lanes` carriles son
+    ANPR y los últimos `subscriber_lanes` quedan reservados para abonados.
+    """
+    if anpr_lanes > num_lanes or subscriber_lanes >= num_lanes:
+        raise ValueError("Debe quedar al menos un carril abierto a todos los vehículos")
+    lanes = []
+    for lane_id in range(num_lanes):
+        lanes.append(GateLane(
+            env,
+            lane_id,
+            service_time,
+            anpr=lane_id < anpr_lanes,
+            anpr_time=anpr_time,
+            anpr_failure_rate=anpr_failure_rate,
+            subscribers_only=lane_id >= num_lanes - subscriber_lanes,
+        ))
+    return lanes
+
+
+class Gate:
+    """
+    Control de acceso o salida con varios carriles y una política de elección
+    de carril. Las estadísticas se acumulan por carril y por lotes de tiempo
+    (vehículos atendidos en cada intervalo de `batch` minutos).
+    """
+    POLICIES = ('shortest_queue', 'random')
+
+    def __init__(self, env, name, lanes, policy='shortest_queue', horizon=8 * 60, batch=15):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Política de carril desconocida: {policy}")
+        self.env = env
+        self.name = name
+        self.lanes = lanes
+        self.policy = policy
+        self.batch = batch
+        self.throughput = np.zeros((len(lanes), int(np.ceil(horizon / batch)) + 1), dtype=int)
+
+    def eligible_lanes(self, subscriber):
+        return [lane for lane in self.lanes if subscriber or not lane.subscribers_only]
+
+    def choose_lane(self, subscriber):
+        lanes = self.eligible_lanes(subscriber)
+        if self.policy == 'random':
+            return random.choice(lanes)
+        # Cola más corta; a igualdad, el carril con menor tiempo medio de servicio
+        return min(lanes, key=lambda lane: (lane.load(), lane.mean_service_time()))
+
+    def pass_through(self, subscriber=False):
+        """Proceso de paso de un vehículo por el control. Devuelve el carril utilizado."""
+        lane = self.choose_lane(subscriber)
+        arrival_time = self.env.now
+        with lane.resource.request() as request:
+            # Solo cuenta en la cola si el carril está ocupado a su llegada
+            queued = not request.triggered
+            if queued:
+                lane.queue.add(1)
+            yield request
+            if queued:
+                lane.queue.add(-1)
+            lane.busy.update(1)
+            wait_time = self.env.now - arrival_time
+            service_time = lane.sample_service_time()
+            yield self.env.timeout(service_time)
+            lane.busy.update(0)
+        lane.vehicles += 1
+        lane.total_wait_time += wait_time
+        lane.total_service_time += service_time
+        lane.max_wait_time = max(lane.max_wait_time, wait_time)
+        batch_index = min(int(self.env.now // self.batch), self.throughput.shape[1] - 1)
+        self.throughput[lane.lane_id, batch_index] += 1
+        return lane
+
+    def vehicles(self):
+        return sum(lane.vehicles for lane in self.lanes)
+
+    def mean_wait_time(self):
+        vehicles = self.vehicles()
+        if vehicles == 0:
+            return 0.0
+        return sum(lane.total_wait_time for lane in self.lanes) / vehicles
+
+    def peak_throughput(self):
+        # Máximo de vehículos por hora observado en un lote
+        return self.throughput.sum(axis=0).max() * 60 / self.batch
+
+    def lane_stats(self):
+        stats = []
+        for lane in self.lanes:
+            stats.append({
+                'lane': lane.label(),
+                'vehicles': lane.vehicles,
+                'utilization': lane.busy.mean(),
+                'mean_queue': lane.queue.mean(),
+                'max_queue': lane.queue.maximum,
+                'mean_wait': lane.total_wait_time / lane.vehicles if lane.vehicles else 0.0,
+                'max_wait': lane.max_wait_time,
+                'mean_service': lane.total_service_time / lane.vehicles if lane.vehicles else 0.0,
+            })
+        return stats
+
+    def print_stats(self):
+        print(f"\n{self.name}: {self.vehicles()} vehículos, espera media {self.mean_wait_time():.2f} min, pico {self.peak_throughput():.0f} vehículos/hora")
+        for row in self.lane_stats():
+            print(f"  {row['lane']:<26} vehículos: {row['vehicles']:4d}  utilización: {row['utilization'] * 100:5.1f}%  "
+                  f"cola media: {row['mean_queue']:5.2f} (máx. {row['max_queue']})  espera media: {row['mean_wait']:5.2f} min (máx. {row['max_wait']:.2f})")
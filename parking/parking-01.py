@@ -1,6 +1,11 @@
+import os
+import sys
 import simpy
 import random
 import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.series import TimeSeriesRecorder
+from herramientas.traza import get_tracer
 
 # Parámetros:
 SIMULATION_TIME = 8 * 60        # Tiempo de simulación en minutos
@@ -9,6 +14,11 @@ ARRIVAL_INTERVAL = 2            # Tiempo promedio entre llegadas de vehículos (
 SEARCH_TIME = 5                 # Tiempo promedio para encontrar un estacionamiento disponible (minutos)
 PARKING_DURATION = 30           # Duración promedio de estacionamiento (minutos)
 DEMAND_BASE_RATE = 0.15         # Tarifa base por minuto de estacionamiento (euros)
+HISTORY_BIN_WIDTH = 1           # Ancho de los intervalos de registro de las series temporales (minutos)
+HISTORY_RING_BINS = None        # Intervalos conservados en las series (None para conservar toda la simulación)
+
+# Traza de eventos de los vehículos (desactivada salvo que se configure SIM_TRACE)
+tracer = get_tracer('parking-01')
 
 class ParkingLot:
     def __init__(self, env, total_spots, demand_base_rate):
@@ -20,10 +30,10 @@ class ParkingLot:
         self.revenue = 0
         self.vehicles_turned_away = 0
         self.vehicles_parked = 0
-        self.occupancy_history = []
-        self.revenue_history = []
-        self.vehicles_parked_history = []
-        self.vehicles_turned_away_history = []
+        self.occupancy_history = TimeSeriesRecorder(HISTORY_BIN_WIDTH, horizon=SIMULATION_TIME, ring=HISTORY_RING_BINS)
+        self.revenue_history = TimeSeriesRecorder(HISTORY_BIN_WIDTH, horizon=SIMULATION_TIME, ring=HISTORY_RING_BINS)
+        self.vehicles_parked_history = TimeSeriesRecorder(HISTORY_BIN_WIDTH, horizon=SIMULATION_TIME, ring=HISTORY_RING_BINS)
+        self.vehicles_turned_away_history = TimeSeriesRecorder(HISTORY_BIN_WIDTH, horizon=SIMULATION_TIME, ring=HISTORY_RING_BINS)
 
     def park(self, vehicle_id, duration):
         with self.spots.request() as request:
@@ -38,15 +48,17 @@ class ParkingLot:
                 cost = rate * duration
                 self.revenue += cost
                 self.record_revenue()
-                print(f"{self.env.now:.2f}: Vehículo {vehicle_id} está estacionado. Tarifa: {rate:.2f} €/min, Duración: {duration:.2f} min, Coste total: {cost:.2f} €")
+                if tracer.enabled:
+                    tracer.event('aparcado', self.env.now, vehiculo=vehicle_id, tarifa=rate, duracion=duration, coste=cost)
                 yield self.env.timeout(duration)
                 self.occupied_spots -= 1
                 self.record_occupancy()
             else:
                 # El vehículo no encuentra lugar para estacionar
                 self.vehicles_turned_away += 1
-                self.vehicles_turned_away_history.append((self.env.now, self.vehicles_turned_away))
-                print(f"{self.env.now:.2f}: Vehículo {vehicle_id} no pudo encontrar estacionamiento y se retiró.")
+                self.vehicles_turned_away_history.record(self.env.now, self.vehicles_turned_away)
+                if tracer.enabled:
+                    tracer.event('retirado', self.env.now, vehiculo=vehicle_id)
 
     def calculate_dynamic_rate(self):
         # Calculamos la tarifa dinámica según la ocupación actual
@@ -56,15 +68,15 @@ class ParkingLot:
 
     def record_occupancy(self):
         # Registramos el nivel de ocupación actual
-        self.occupancy_history.append((self.env.now, self.occupied_spots))
+        self.occupancy_history.record(self.env.now, self.occupied_spots)
 
     def record_revenue(self):
         # Registramos el ingreso acumulado actual
-        self.revenue_history.append((self.env.now, self.revenue))
+        self.revenue_history.record(self.env.now, self.revenue)
 
     def record_vehicles_parked(self):
         # Registramos el número de vehículos atendidos
-        self.vehicles_parked_history.append((self.env.now, self.vehicles_parked))
+        self.vehicles_parked_history.record(self.env.now, self.vehicles_parked)
 
 def vehicle_generator(env, parking_lot):
     vehicle_id = 0
@@ -91,10 +103,11 @@ print(f"Ingresos totales: {parking_lot.revenue:.2f} €")
 print(f"Vehículos rechazados por falta de espacio: {parking_lot.vehicles_turned_away}")
 
 # Gráfica del nivel de ocupación a lo largo del tiempo
-times, occupancies = zip(*parking_lot.occupancy_history)
+times, min_occupancies, max_occupancies, occupancies = parking_lot.occupancy_history.bins()
 plt.figure(figsize=(10, 6))
 
 plt.subplot(2, 2, 1)
+plt.fill_between(times, min_occupancies, max_occupancies, color='b', alpha=0.2, label='Mínimo y máximo por intervalo')
 plt.plot(times, occupancies, label='Nivel de ocupación', color='b')
 plt.xlabel('Tiempo (minutos)')
 plt.ylabel('Número de plazas ocupadas')
@@ -103,7 +116,7 @@ plt.legend()
 plt.grid(True)
 
 # Gráfica de la recaudación a lo largo del tiempo
-times, revenues = zip(*parking_lot.revenue_history)
+times, revenues = parking_lot.revenue_history.series()
 plt.subplot(2, 2, 2)
 plt.plot(times, revenues, label='Ingresos acumulados', color='g')
 plt.xlabel('Tiempo (minutos)')
@@ -113,7 +126,7 @@ plt.legend()
 plt.grid(True)
 
 # Gráfica del número de vehículos atendidos a lo largo del tiempo
-times, vehicles_parked = zip(*parking_lot.vehicles_parked_history)
+times, vehicles_parked = parking_lot.vehicles_parked_history.series()
 plt.subplot(2, 2, 3)
 plt.plot(times, vehicles_parked, label='Vehículos atendidos', color='r')
 plt.xlabel('Tiempo (minutos)')
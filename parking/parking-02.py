@@ -1,7 +1,14 @@
+import os
+import sys
 import simpy
 import random
 import numpy as np
 import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.series import TimeSeriesRecorder
+from herramientas.traza import get_tracer
+from herramientas.instrumentacion import make_environment
+from herramientas.analisis_salida import steady_state
 
 # Parámetros:
 SIMULATION_TIME = 8 * 60        # Tiempo de simulación en minutos
@@ -12,6 +19,11 @@ PARKING_DURATION = 30           # Duración promedio de estacionamiento (minutos
 DEMAND_BASE_RATE = 0.15         # Tarifa base por minuto de estacionamiento (euros)
 ACCESS_CONTROL_TIME = 1         # Tiempo promedio para pasar el control de acceso (minutos)
 EXIT_CONTROL_TIME = 0.5         # Tiempo promedio para pasar el control de salida (minutos)
+HISTORY_BIN_WIDTH = 1           # Ancho de los intervalos de registro de las series temporales (minutos)
+HISTORY_RING_BINS = None        # Intervalos conservados en las series (None para conservar toda la simulación)
+
+# Traza de eventos de los vehículos (desactivada salvo que se configure SIM_TRACE)
+tracer = get_tracer('parking-02')
 
 class ParkingLot:
     def __init__(self, env, total_spots, demand_base_rate):
@@ -25,9 +37,9 @@ class ParkingLot:
         self.revenue = 0
         self.vehicles_turned_away = 0
         self.vehicles_parked = 0
-        self.occupancy_history = []
-        self.revenue_history = []
-        self.vehicles_parked_history = []
+        self.occupancy_history = TimeSeriesRecorder(HISTORY_BIN_WIDTH, horizon=SIMULATION_TIME, ring=HISTORY_RING_BINS)
+        self.revenue_history = TimeSeriesRecorder(HISTORY_BIN_WIDTH, horizon=SIMULATION_TIME, ring=HISTORY_RING_BINS)
+        self.vehicles_parked_history = TimeSeriesRecorder(HISTORY_BIN_WIDTH, horizon=SIMULATION_TIME, ring=HISTORY_RING_BINS)
         self.access_control_time_history = []
         self.exit_control_time_history = []
         self.spot_occupancy_times = [[] for _ in range(total_spots)]
@@ -39,7 +51,8 @@ class ParkingLot:
             access_time = random.expovariate(1.0 / ACCESS_CONTROL_TIME)
             yield self.env.timeout(access_time)
             self.access_control_time_history.append(access_time)
-            print(f"{self.env.now:.2f}: Vehículo {vehicle_id} pasó el control de acceso.")
+            if tracer.enabled:
+                tracer.event('acceso', self.env.now, level='DEBUG', vehiculo=vehicle_id, tiempo=access_time)
 
         with self.spots.request() as request:
             # Intentamos estacionar el vehículo
@@ -55,15 +68,16 @@ class ParkingLot:
                 self.revenue += cost
                 self.record_revenue()
                 self.spot_occupancy_times[spot_index].append(duration)
-                print(f"Plaza {spot_index + 1} ocupada por vehículo {vehicle_id}.")
-                print(f"{self.env.now:.2f}: Vehículo {vehicle_id} está estacionado. Tarifa: {rate:.2f} €/min, Duración: {duration:.2f} min, Coste total: {cost:.2f} €")
+                if tracer.enabled:
+                    tracer.event('aparcado', self.env.now, vehiculo=vehicle_id, plaza=spot_index + 1, tarifa=rate, duracion=duration, coste=cost)
                 yield self.env.timeout(duration)
                 self.occupied_spots -= 1
                 self.record_occupancy()
             else:
                 # El vehículo no encuentra lugar para estacionar
                 self.vehicles_turned_away += 1
-                print(f"{self.env.now:.2f}: Vehículo {vehicle_id} no pudo encontrar estacionamiento y se retiró.")
+                if tracer.enabled:
+                    tracer.event('retirado', self.env.now, vehiculo=vehicle_id)
             
             with self.exit_control.request() as exit_request:
                 # El vehículo pasa por el control de salida
@@ -71,7 +85,8 @@ class ParkingLot:
                 exit_time = random.expovariate(1.0 / EXIT_CONTROL_TIME)
                 yield self.env.timeout(exit_time)
                 self.exit_control_time_history.append(exit_time)
-                print(f"{self.env.now:.2f}: Vehículo {vehicle_id} pasó el control de salida y salió del estacionamiento.")
+                if tracer.enabled:
+                    tracer.event('salida', self.env.now, level='DEBUG', vehiculo=vehicle_id, tiempo=exit_time)
 
     def calculate_dynamic_rate(self):
         # Calculamos la tarifa dinámica según la ocupación actual
@@ -81,98 +96,113 @@ class ParkingLot:
 
     def record_occupancy(self):
         # Registramos el nivel de ocupación actual
-        self.occupancy_history.append((self.env.now, self.occupied_spots))
+        self.occupancy_history.record(self.env.now, self.occupied_spots)
 
     def record_revenue(self):
         # Registramos el ingreso acumulado actual
-        self.revenue_history.append((self.env.now, self.revenue))
+        self.revenue_history.record(self.env.now, self.revenue)
 
     def record_vehicles_parked(self):
         # Registramos el número de vehículos atendidos
-        self.vehicles_parked_history.append((self.env.now, self.vehicles_parked))
+        self.vehicles_parked_history.record(self.env.now, self.vehicles_parked)
 
-def vehicle_generator(env, parking_lot):
+def vehicle_generator(env, parking_lot, arrival_interval=ARRIVAL_INTERVAL):
     vehicle_id = 0
     while True:
         # Cada nuevo vehículo intenta estacionarse
-        yield env.timeout(ARRIVAL_INTERVAL)
+        yield env.timeout(arrival_interval)
         parking_duration = random.expovariate(1.0 / PARKING_DURATION)
         env.process(parking_lot.park(vehicle_id, parking_duration))
         vehicle_id += 1
 
-# Configuración del entorno de simulación
-env = simpy.Environment()
-parking_lot = ParkingLot(env, TOTAL_SPOTS, DEMAND_BASE_RATE)
-
-# Iniciamos el generador de vehículos
-env.process(vehicle_generator(env, parking_lot))
-
-# Ejecutamos la simulación
-env.run(until=SIMULATION_TIME)
-
-# Resultados
-print("\nResultados finales:")
-print(f"Ingresos totales: {parking_lot.revenue:.2f} €")
-print(f"Vehículos rechazados por falta de espacio: {parking_lot.vehicles_turned_away}")
-
-# Gráfica del nivel de ocupación a lo largo del tiempo
-times, occupancies = zip(*parking_lot.occupancy_history)
-plt.figure(figsize=(10, 6))
-
-plt.subplot(2, 3, 1)
-plt.plot(times, occupancies, label='Nivel de ocupación', color='b')
-plt.xlabel('Tiempo (minutos)')
-plt.ylabel('Número de plazas ocupadas')
-plt.title('Nivel de ocupación')
-plt.legend()
-plt.grid(True)
-
-# Gráfica de la recaudación a lo largo del tiempo
-times, revenues = zip(*parking_lot.revenue_history)
-plt.subplot(2, 3, 2)
-plt.plot(times, revenues, label='Ingresos acumulados', color='g')
-plt.xlabel('Tiempo (minutos)')
-plt.ylabel('Ingresos (€)')
-plt.title('Recaudación')
-plt.legend()
-plt.grid(True)
-
-# Gráfica del número de vehículos atendidos a lo largo del tiempo
-times, vehicles_parked = zip(*parking_lot.vehicles_parked_history)
-plt.subplot(2, 3, 3)
-plt.plot(times, vehicles_parked, label='Vehículos atendidos', color='r')
-plt.xlabel('Tiempo (minutos)')
-plt.ylabel('Número de vehículos atendidos')
-plt.title('Vehículos atendidos')
-plt.legend()
-plt.grid(True)
-
-# Gráfica del número de vehículos que no encontraron estacionamiento a lo largo del tiempo
-#times, vehicles_turned_away = zip(*parking_lot.vehicles_turned_away_history)
-plt.subplot(2, 3, 4)
-plt.bar(x=" ", height=parking_lot.vehicles_turned_away, label='Vehículos rechazados', color='orange')
-plt.xlim(xmin=0)
-plt.xlabel('')
-plt.ylabel('Número de vehículos rechazados')
-plt.title('Número de vehículos que no encontraron estacionamiento')
-plt.grid(True)
-
-# Gráfica comparativa del tiempo promedio en el control de acceso y el control de salida
-average_access_time = np.mean(parking_lot.access_control_time_history)
-average_exit_time = np.mean(parking_lot.exit_control_time_history)
-plt.subplot(2, 3, 5)
-plt.bar(['Control de acceso', 'Control de salida'], [average_access_time, average_exit_time], color=['blue', 'red'])
-plt.ylabel('Tiempo promedio (minutos)')
-plt.title('Tiempo promedio en el control de acceso y salida')
-plt.grid(True, axis='y')
-
-# Gráfica del tiempo de ocupación de las plazas de aparcamiento
-average_occupancy_times = [np.sum(times) for times in parking_lot.spot_occupancy_times]
-plt.subplot(2, 3, 6)
-plt.bar(range(TOTAL_SPOTS), average_occupancy_times, color='purple')
-plt.xlabel('Número de plazas ocupadas')
-plt.ylabel('Tiempo total de ocupación (minutos)')
-plt.title('Tiempo total de ocupación de las plazas de aparcamiento')
-plt.grid(True, axis='y')
-
-plt.show()
\ No newline at end of file
+def run_simulation(arrival_interval=ARRIVAL_INTERVAL, seed=None):
+    """
+    Ejecuta la simulación sin mostrar resultados y devuelve el entorno y el
+    aparcamiento (se usa también desde los benchmarks).
+    """
+    random.seed(seed)
+    env = make_environment()
+    parking_lot = ParkingLot(env, TOTAL_SPOTS, DEMAND_BASE_RATE)
+
+    # Iniciamos el generador de vehículos
+    env.process(vehicle_generator(env, parking_lot, arrival_interval))
+
+    # Ejecutamos la simulación
+    env.run(until=SIMULATION_TIME)
+    return env, parking_lot
+
+def main():
+    env, parking_lot = run_simulation()
+
+    # Resultados
+    print("\nResultados finales:")
+    print(f"Ingresos totales: {parking_lot.revenue:.2f} €")
+    print(f"Vehículos rechazados por falta de espacio: {parking_lot.vehicles_turned_away}")
+    # Ocupación sin el arranque con el aparcamiento vacío (MSER-5) e intervalo por lotes solapados
+    _, _, _, occupancies = parking_lot.occupancy_history.bins()
+    print(f"Ocupación media en régimen estacionario: {steady_state(occupancies)}")
+
+    # Gráfica del nivel de ocupación a lo largo del tiempo
+    times, min_occupancies, max_occupancies, occupancies = parking_lot.occupancy_history.bins()
+    plt.figure(figsize=(10, 6))
+
+    plt.subplot(2, 3, 1)
+    plt.fill_between(times, min_occupancies, max_occupancies, color='b', alpha=0.2, label='Mínimo y máximo por intervalo')
+    plt.plot(times, occupancies, label='Nivel de ocupación', color='b')
+    plt.xlabel('Tiempo (minutos)')
+    plt.ylabel('Número de plazas ocupadas')
+    plt.title('Nivel de ocupación')
+    plt.legend()
+    plt.grid(True)
+
+    # Gráfica de la recaudación a lo largo del tiempo
+    times, revenues = parking_lot.revenue_history.series()
+    plt.subplot(2, 3, 2)
+    plt.plot(times, revenues, label='Ingresos acumulados', color='g')
+    plt.xlabel('Tiempo (minutos)')
+    plt.ylabel('Ingresos (€)')
+    plt.title('Recaudación')
+    plt.legend()
+    plt.grid(True)
+
+    # Gráfica del número de vehículos atendidos a lo largo del tiempo
+    times, vehicles_parked = parking_lot.vehicles_parked_history.series()
+    plt.subplot(2, 3, 3)
+    plt.plot(times, vehicles_parked, label='Vehículos atendidos', color='r')
+    plt.xlabel('Tiempo (minutos)')
+    plt.ylabel('Número de vehículos atendidos')
+    plt.title('Vehículos atendidos')
+    plt.legend()
+    plt.grid(True)
+
+    # Gráfica del número de vehículos que no encontraron estacionamiento a lo largo del tiempo
+    plt.subplot(2, 3, 4)
+    plt.bar(x=" ", height=parking_lot.vehicles_turned_away, label='Vehículos rechazados', color='orange')
+    plt.xlim(xmin=0)
+    plt.xlabel('')
+    plt.ylabel('Número de vehículos rechazados')
+    plt.title('Número de vehículos que no encontraron estacionamiento')
+    plt.grid(True)
+
+    # Gráfica comparativa del tiempo promedio en el control de acceso y el control de salida
+    average_access_time = np.mean(parking_lot.access_control_time_history)
+    average_exit_time = np.mean(parking_lot.exit_control_time_history)
+    plt.subplot(2, 3, 5)
+    plt.bar(['Control de acceso', 'Control de salida'], [average_access_time, average_exit_time], color=['blue', 'red'])
+    plt.ylabel('Tiempo promedio (minutos)')
+    plt.title('Tiempo promedio en el control de acceso y salida')
+    plt.grid(True, axis='y')
+
+    # Gráfica del tiempo de ocupación de las plazas de aparcamiento
+    average_occupancy_times = [np.sum(times) for times in parking_lot.spot_occupancy_times]
+    plt.subplot(2, 3, 6)
+    plt.bar(range(TOTAL_SPOTS), average_occupancy_times, color='purple')
+    plt.xlabel('Número de plazas ocupadas')
+    plt.ylabel('Tiempo total de ocupación (minutos)')
+    plt.title('Tiempo total de ocupación de las plazas de aparcamiento')
+    plt.grid(True, axis='y')
+
+    plt.show()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+import os
+import sys
+import simpy
+import random
+import numpy as np
+import matplotlib.pyplot as plt
+from gates import Gate, make_lanes
+from pricing import ArrivalLog, linear_occupancy_tariff, occupancy_tariff_grid, reprice
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.series import TimeSeriesRecorder
+
+# Parámetros:
+RANDOM_SEED = 42                # Semilla para reproducibilidad
+SIMULATION_TIME = 8 * 60        # Tiempo de simulación en minutos
+TOTAL_SPOTS = 50                # Total de plazas de estacionamiento disponibles
+ARRIVAL_INTERVAL = 2            # Tiempo promedio entre llegadas de vehículos (minutos)
+SEARCH_TIME = 5                 # Tiempo promedio para encontrar un estacionamiento disponible (minutos)
+PARKING_DURATION = 30           # Duración promedio de estacionamiento (minutos)
+DEMAND_BASE_RATE = 0.15         # Tarifa base por minuto de estacionamiento (euros)
+SUBSCRIBER_FRACTION = 0.3       # Proporción de vehículos abonados
+HISTORY_BIN_WIDTH = 1           # Ancho de los intervalos de registro de las series temporales (minutos)
+HISTORY_RING_BINS = None        # Intervalos conservados en las series (None para conservar toda la simulación)
+
+# Controles de acceso y salida:
+ACCESS_CONTROL_TIME = 1         # Tiempo promedio para pasar el control de acceso manual (minutos)
+EXIT_CONTROL_TIME = 0.5         # Tiempo promedio para pasar el control de salida manual (minutos)
+ANPR_CONTROL_TIME = 0.2         # Tiempo promedio en un carril con lectura automática de matrícula (minutos)
+ANPR_FAILURE_RATE = 0.05        # Probabilidad de que falle la lectura y haya que pasar el control manual
+ACCESS_LANES = 2                # Número de carriles de acceso
+EXIT_LANES = 2                  # Número de carriles de salida
+ANPR_LANES = 1                  # Carriles ANPR en cada control
+SUBSCRIBER_LANES = 0            # Carriles reservados para abonados en cada control
+LANE_POLICY = 'shortest_queue'  # Política de elección de carril ('shortest_queue' o 'random')
+THROUGHPUT_BATCH = 15           # Intervalo de agregación del rendimiento de los controles (minutos)
+
+# Estudio de precios sobre la ejecución registrada:
+WHAT_IF_BASE_RATES = np.linspace(0.05, 0.30, 26)   # Tarifas base a evaluar (euros/minuto)
+WHAT_IF_SURCHARGES = np.linspace(0.0, 2.0, 11)     # Recargos por ocupación a evaluar
+
+class ParkingLot:
+    def __init__(self, env, total_spots, demand_base_rate, access_lanes=ACCESS_LANES, exit_lanes=EXIT_LANES,
+                 anpr_lanes=ANPR_LANES, subscriber_lanes=SUBSCRIBER_LANES, lane_policy=LANE_POLICY, tariff=None, verbose=True):
+        self.env = env
+        self.spots = simpy.Resource(env, capacity=total_spots)
+        self.access_gate = Gate(env, 'Control de acceso', make_lanes(env, access_lanes, ACCESS_CONTROL_TIME, anpr_lanes, ANPR_CONTROL_TIME, ANPR_FAILURE_RATE, subscriber_lanes),
+                                policy=lane_policy, horizon=SIMULATION_TIME, batch=THROUGHPUT_BATCH)
+        self.exit_gate = Gate(env, 'Control de salida', make_lanes(env, exit_lanes, EXIT_CONTROL_TIME, anpr_lanes, ANPR_CONTROL_TIME, ANPR_FAILURE_RATE, subscriber_lanes),
+                              policy=lane_policy, horizon=SIMULATION_TIME, batch=THROUGHPUT_BATCH)
+        self.total_spots = total_spots
+        self.demand_base_rate = demand_base_rate
+        self.tariff = tariff if tariff is not None else linear_occupancy_tariff(demand_base_rate)
+        self.arrivals = ArrivalLog()
+        self.verbose = verbose
+        self.occupied_spots = 0
+        self.revenue = 0
+        self.vehicles_turned_away = 0
+        self.vehicles_parked = 0
+        self.occupancy_history = TimeSeriesRecorder(HISTORY_BIN_WIDTH, horizon=SIMULATION_TIME, ring=HISTORY_RING_BINS)
+        self.revenue_history = TimeSeriesRecorder(HISTORY_BIN_WIDTH, horizon=SIMULATION_TIME, ring=HISTORY_RING_BINS)
+        self.vehicles_parked_history = TimeSeriesRecorder(HISTORY_BIN_WIDTH, horizon=SIMULATION_TIME, ring=HISTORY_RING_BINS)
+        self.spot_occupancy_time = np.zeros(total_spots)
+
+    def park(self, vehicle_id, duration, subscriber):
+        # El vehículo pasa por uno de los carriles del control de acceso
+        lane = yield self.env.process(self.access_gate.pass_through(subscriber))
+        if self.verbose:
+            print(f"{self.env.now:.2f}: Vehículo {vehicle_id} pasó el control de acceso por el {lane.label()}.")
+
+        with self.spots.request() as request:
+            # Intentamos estacionar el vehículo
+            result = yield request | self.env.timeout(SEARCH_TIME)
+            if request in result:
+                spot_index = self.spots.users.index(request)  # Utilizamos el índice del recurso como referencia de la plaza
+                self.occupied_spots += 1
+                self.vehicles_parked += 1
+                self.record_occupancy()
+                self.record_vehicles_parked()
+                occupancy_rate = self.occupied_spots / self.total_spots
+                rate = float(self.tariff.rate(self.env.now, occupancy_rate, duration))
+                cost = float(self.tariff.price(self.env.now, occupancy_rate, duration))
+                self.arrivals.record(self.env.now, occupancy_rate, duration)
+                self.revenue += cost
+                self.record_revenue()
+                self.spot_occupancy_time[spot_index] += duration
+                if self.verbose:
+                    print(f"{self.env.now:.2f}: Vehículo {vehicle_id} está estacionado en la plaza {spot_index + 1}. Tarifa: {rate:.2f} €/min, Duración: {duration:.2f} min, Coste total: {cost:.2f} €")
+                yield self.env.timeout(duration)
+                self.occupied_spots -= 1
+                self.record_occupancy()
+            else:
+                # El vehículo no encuentra lugar para estacionar
+                self.vehicles_turned_away += 1
+                if self.verbose:
+                    print(f"{self.env.now:.2f}: Vehículo {vehicle_id} no pudo encontrar estacionamiento y se retiró.")
+
+        # El vehículo pasa por uno de los carriles del control de salida
+        lane = yield self.env.process(self.exit_gate.pass_through(subscriber))
+        if self.verbose:
+            print(f"{self.env.now:.2f}: Vehículo {vehicle_id} pasó el control de salida por el {lane.label()} y salió del estacionamiento.")
+
+    def record_occupancy(self):
+        # Registramos el nivel de ocupación actual
+        self.occupancy_history.record(self.env.now, self.occupied_spots)
+
+    def record_revenue(self):
+        # Registramos el ingreso acumulado actual
+        self.revenue_history.record(self.env.now, self.revenue)
+
+    def record_vehicles_parked(self):
+        # Registramos el número de vehículos atendidos
+        self.vehicles_parked_history.record(self.env.now, self.vehicles_parked)
+
+def vehicle_generator(env, parking_lot, arrival_interval=ARRIVAL_INTERVAL):
+    vehicle_id = 0
+    while True:
+        # Cada nuevo vehículo intenta estacionarse
+        yield env.timeout(random.expovariate(1.0 / arrival_interval))
+        parking_duration = random.expovariate(1.0 / PARKING_DURATION)
+        subscriber = random.random() < SUBSCRIBER_FRACTION
+        env.process(parking_lot.park(vehicle_id, parking_duration, subscriber))
+        vehicle_id += 1
+
+def run_simulation(arrival_interval=ARRIVAL_INTERVAL, verbose=True, **config):
+    random.seed(RANDOM_SEED)
+    env = simpy.Environment()
+    parking_lot = ParkingLot(env, TOTAL_SPOTS, DEMAND_BASE_RATE, verbose=verbose, **config)
+    env.process(vehicle_generator(env, parking_lot, arrival_interval))
+    env.run(until=SIMULATION_TIME)
+    return parking_lot
+
+def size_lanes(max_lanes=4, arrival_interval=ARRIVAL_INTERVAL / 2):
+    # Dimensionamos los carriles simulando la hora punta (el doble de llegadas) con distinto número de carriles
+    print(f"\nDimensionamiento de carriles (llegadas cada {arrival_interval:.2f} min):")
+    print(f"{'Carriles':>8} {'ANPR':>5} {'Espera acceso':>14} {'Espera salida':>14} {'Pico acceso (veh/h)':>20}")
+    for lanes in range(1, max_lanes + 1):
+        for anpr_lanes in range(0, lanes + 1):
+            parking_lot = run_simulation(arrival_interval, verbose=False, access_lanes=lanes, exit_lanes=lanes, anpr_lanes=anpr_lanes)
+            print(f"{lanes:>8} {anpr_lanes:>5} {parking_lot.access_gate.mean_wait_time():>14.2f} {parking_lot.exit_gate.mean_wait_time():>14.2f} {parking_lot.access_gate.peak_throughput():>20.0f}")
+
+def what_if_pricing(parking_lot, top=5):
+    # Recalculamos la recaudación de la ejecución registrada con una rejilla de tarifas, sin volver a simular
+    tariffs = occupancy_tariff_grid(WHAT_IF_BASE_RATES, WHAT_IF_SURCHARGES)
+    revenues = reprice(parking_lot.arrivals, tariffs)
+    print(f"\nEstudio de precios sobre la ejecución registrada ({len(tariffs)} tarifas):")
+    for index in np.argsort(revenues)[::-1][:top]:
+        print(f"  {tariffs[index].name}: {revenues[index]:.2f} €")
+    return tariffs, revenues
+
+def main():
+    parking_lot = run_simulation()
+
+    # Resultados
+    print("\nResultados finales:")
+    print(f"Ingresos totales: {parking_lot.revenue:.2f} €")
+    print(f"Vehículos rechazados por falta de espacio: {parking_lot.vehicles_turned_away}")
+    parking_lot.access_gate.print_stats()
+    parking_lot.exit_gate.print_stats()
+    size_lanes()
+    what_if_pricing(parking_lot)
+
+    # Gráfica del nivel de ocupación a lo largo del tiempo
+    times, min_occupancies, max_occupancies, occupancies = parking_lot.occupancy_history.bins()
+    plt.figure(figsize=(10, 6))
+
+    plt.subplot(2, 3, 1)
+    plt.fill_between(times, min_occupancies, max_occupancies, color='b', alpha=0.2, label='Mínimo y máximo por intervalo')
+    plt.plot(times, occupancies, label='Nivel de ocupación', color='b')
+    plt.xlabel('Tiempo (minutos)')
+    plt.ylabel('Número de plazas ocupadas')
+    plt.title('Nivel de ocupación')
+    plt.legend()
+    plt.grid(True)
+
+    # Gráfica de la recaudación a lo largo del tiempo
+    times, revenues = parking_lot.revenue_history.series()
+    plt.subplot(2, 3, 2)
+    plt.plot(times, revenues, label='Ingresos acumulados', color='g')
+    plt.xlabel('Tiempo (minutos)')
+    plt.ylabel('Ingresos (€)')
+    plt.title('Recaudación')
+    plt.legend()
+    plt.grid(True)
+
+    # Gráfica de la utilización de cada carril de los controles
+    access_stats = parking_lot.access_gate.lane_stats()
+    exit_stats = parking_lot.exit_gate.lane_stats()
+    plt.subplot(2, 3, 3)
+    plt.bar([f"A{i + 1}" for i in range(len(access_stats))], [row['utilization'] * 100 for row in access_stats], color='blue', label='Acceso')
+    plt.bar([f"S{i + 1}" for i in range(len(exit_stats))], [row['utilization'] * 100 for row in exit_stats], color='red', label='Salida')
+    plt.ylabel('Utilización (%)')
+    plt.title('Utilización de los carriles')
+    plt.legend()
+    plt.grid(True, axis='y')
+
+    # Gráfica del rendimiento de los controles por intervalo
+    batch_times = np.arange(parking_lot.access_gate.throughput.shape[1]) * THROUGHPUT_BATCH
+    plt.subplot(2, 3, 4)
+    plt.step(batch_times, parking_lot.access_gate.throughput.sum(axis=0), where='post', label='Acceso', color='blue')
+    plt.step(batch_times, parking_lot.exit_gate.throughput.sum(axis=0), where='post', label='Salida', color='red')
+    plt.xlabel('Tiempo (minutos)')
+    plt.ylabel(f'Vehículos cada {THROUGHPUT_BATCH} minutos')
+    plt.title('Rendimiento de los controles')
+    plt.legend()
+    plt.grid(True)
+
+    # Gráfica comparativa de la espera media en cada carril
+    plt.subplot(2, 3, 5)
+    plt.bar([f"A{i + 1}" for i in range(len(access_stats))], [row['mean_wait'] for row in access_stats], color='blue', label='Acceso')
+    plt.bar([f"S{i + 1}" for i in range(len(exit_stats))], [row['mean_wait'] for row in exit_stats], color='red', label='Salida')
+    plt.ylabel('Espera media (minutos)')
+    plt.title('Espera media por carril')
+    plt.legend()
+    plt.grid(True, axis='y')
+
+    # Gráfica del tiempo de ocupación de las plazas de aparcamiento
+    plt.subplot(2, 3, 6)
+    plt.bar(range(TOTAL_SPOTS), parking_lot.spot_occupancy_time, color='purple')
+    plt.xlabel('Plaza')
+    plt.ylabel('Tiempo total de ocupación (minutos)')
+    plt.title('Tiempo total de ocupación de las plazas de aparcamiento')
+    plt.grid(True, axis='y')
+
+    plt.tight_layout()
+    plt.show()
+
+if __name__ == '__main__':
+    main()
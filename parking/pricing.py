@@ -0,0 +1,127 @@
+import numpy as np
+
+
+class OccupancyCurve:
+    """
+    Multiplicador de la tarifa en función de la ocupación (0-1), lineal a
+    tramos entre los puntos (occupancy, multiplier) indicados.
+    """
+    def __init__(self, occupancy, multipliers):
+        self.occupancy = np.asarray(occupancy, dtype=float)
+        self.multipliers = np.asarray(multipliers, dtype=float)
+
+    def __call__(self, times, occupancy, durations):
+        return np.interp(occupancy, self.occupancy, self.multipliers)
+
+
+class TimeOfDayCurve:
+    """
+    Multiplicador de la tarifa según la hora del día. `hourly_multipliers`
+    tiene 24 valores; el tiempo de simulación se expresa en minutos.
+    """
+    def __init__(self, hourly_multipliers, minutes_per_hour=60):
+        self.hourly_multipliers = np.asarray(hourly_multipliers, dtype=float)
+        if self.hourly_multipliers.shape != (24,):
+            raise ValueError("Se necesitan 24 multiplicadores horarios")
+        self.minutes_per_hour = minutes_per_hour
+
+    def __call__(self, times, occupancy, durations):
+        hours = (np.asarray(times) // self.minutes_per_hour).astype(int) % 24
+        return self.hourly_multipliers[hours]
+
+
+class DurationCurve:
+    """
+    Multiplicador por tramos de duración de la estancia: las estancias de
+    duración mayor o igual que `thresholds[i]` usan `multipliers[i + 1]`.
+    """
+    def __init__(self, thresholds, multipliers):
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        self.multipliers = np.asarray(multipliers, dtype=float)
+        if len(self.multipliers) != len(self.thresholds) + 1:
+            raise ValueError("Se necesita un multiplicador más que umbrales")
+
+    def __call__(self, times, occupancy, durations):
+        return self.multipliers[np.searchsorted(self.thresholds, durations, side='right')]
+
+
+class Tariff:
+    """
+    Tarifa compuesta: una tarifa base multiplicada por una o varias curvas.
+    Si `per_minute` es True el precio se multiplica por la duración de la
+    estancia; si no, es un precio fijo por vehículo.
+
+    Todas las operaciones aceptan escalares o vectores de llegadas, de modo
+    que la misma tarifa sirve para cobrar a un vehículo durante la
+    simulación y para recalcular en bloque una ejecución registrada.
+    """
+    def __init__(self, base_rate, curves=(), per_minute=True, name=None):
+        self.base_rate = base_rate
+        self.curves = list(curves)
+        self.per_minute = per_minute
+        self.name = name
+
+    def rate(self, times, occupancy, durations):
+        rate = np.full(np.shape(occupancy), self.base_rate, dtype=float)
+        for curve in self.curves:
+            rate = rate * curve(times, occupancy, durations)
+        return rate
+
+    def price(self, times, occupancy, durations):
+        rate = self.rate(times, occupancy, durations)
+        if self.per_minute:
+            return rate * durations
+        return rate
+
+
+def linear_occupancy_tariff(base_rate):
+    """Tarifa por minuto que crece linealmente con la ocupación: base * (1 + ocupación)."""
+    return Tariff(base_rate, [OccupancyCurve([0, 1], [1, 2])], per_minute=True, name=f'lineal {base_rate:.2f}')
+
+
+def threshold_occupancy_tariff(base_rate, threshold=0.8, demand_factor=0.05):
+    """Precio fijo por vehículo con recargo a partir de un umbral de ocupación (como `calcular_tarifa` en parking.py)."""
+    return Tariff(base_rate, [OccupancyCurve([0, threshold, 1], [1, 1, 1 + demand_factor])], per_minute=False,
+                  name=f'umbral {base_rate:.2f}/{threshold:.2f}')
+
+
+class ArrivalLog:
+    """
+    Registro de los vehículos estacionados (instante, ocupación a la llegada y
+    duración) en vectores preasignados que crecen por duplicación.
+    """
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.times = np.empty(capacity)
+        self.occupancy = np.empty(capacity)
+        self.durations = np.empty(capacity)
+
+    def record(self, time, occupancy, duration):
+        if self.size == len(self.times):
+            self.times = np.resize(self.times, 2 * self.size)
+            self.occupancy = np.resize(self.occupancy, 2 * self.size)
+            self.durations = np.resize(self.durations, 2 * self.size)
+        self.times[self.size] = time
+        self.occupancy[self.size] = occupancy
+        self.durations[self.size] = duration
+        self.size += 1
+
+    def arrays(self):
+        return self.times[:self.size], self.occupancy[:self.size], self.durations[:self.size]
+
+
+def reprice(log, tariffs):
+    """
+    Recaudación total que habría generado cada tarifa sobre una ejecución
+    registrada, sin volver a simular. Supone que la demanda no reacciona al
+    precio: los vehículos, sus llegadas y sus estancias son los registrados.
+    """
+    times, occupancy, durations = log.arrays()
+    return np.array([tariff.price(times, occupancy, durations).sum() for tariff in tariffs])
+
+
+def occupancy_tariff_grid(base_rates, surcharges, per_minute=True):
+    """Rejilla de tarifas base * (1 + recargo * ocupación) para estudios de precios."""
+    return [Tariff(base_rate, [OccupancyCurve([0, 1], [1, 1 + surcharge])], per_minute=per_minute,
+                   name=f'base {base_rate:.2f}, recargo {surcharge:.2f}')
+            for base_rate in base_rates for surcharge in surcharges]
@@ -1,7 +1,14 @@
+import os
+import sys
 import simpy
 import random
 import matplotlib.pyplot as plt
 import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.traza import get_tracer
+
+# Traza de eventos de los vehículos (desactivada salvo que se configure SIM_TRACE)
+tracer = get_tracer('recarga-vehiculos-04')
 
 # Parámetros globales
 NUM_STATIONS = 5                # Número de estaciones de recarga
@@ -25,7 +32,8 @@ class EVChargingStation:
 
     def charge(self, vehicle_id, charging_time):
         yield self.env.timeout(charging_time)
-        print(f'Vehicle {vehicle_id} completed charging at {self.env.now:.2f} minutes')
+        if tracer.enabled:
+            tracer.event('charge_end', self.env.now, vehicle=vehicle_id)
 
 def vehicle(env, vehicle_id, station, arrival_delay, charging_time):
     global total_vehicles, vehicles_charged, vehicles_waited
@@ -33,7 +41,8 @@ def vehicle(env, vehicle_id, station, arrival_delay, charging_time):
     yield env.timeout(arrival_delay)
     arrival_time = env.now
     total_vehicles += 1
-    print(f'Vehicle {vehicle_id} arrived at {env.now:.2f} minutes')
+    if tracer.enabled:
+        tracer.event('arrival', env.now, vehicle=vehicle_id)
     
     with station.charging_spots.request() as request:
         # Espera por un punto de recarga disponible
@@ -42,7 +51,8 @@ def vehicle(env, vehicle_id, station, arrival_delay, charging_time):
         waiting_times.append(waiting_time)
         if waiting_time > 0:
             vehicles_waited += 1
-        print(f'Vehicle {vehicle_id} started charging at {env.now:.2f} minutes')
+        if tracer.enabled:
+            tracer.event('charge_start', env.now, vehicle=vehicle_id)
         
         yield env.process(station.charge(vehicle_id, charging_time))
         charging_times.append(charging_time)
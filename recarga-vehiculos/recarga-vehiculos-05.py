@@ -1,7 +1,15 @@
+import os
+import sys
 import simpy
 import random
 import matplotlib.pyplot as plt
 import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.traza import get_tracer
+from herramientas.colas import mmc
+
+# Traza de eventos de los vehículos (desactivada salvo que se configure SIM_TRACE)
+tracer = get_tracer('recarga-vehiculos-05')
 
 # Parámetros globales
 NUM_STATIONS = 5                # Número de estaciones de recarga
@@ -29,7 +37,8 @@ class EVChargingStation:
     def charge(self, vehicle_id, charging_time):
         yield self.env.timeout(charging_time)
         self.total_usage_time += charging_time
-        print(f'Vehicle {vehicle_id} completed charging at {self.env.now:.2f} minutes')
+        if tracer.enabled:
+            tracer.event('charge_end', self.env.now, vehicle=vehicle_id)
 
 def vehicle(env, vehicle_id, station, arrival_delay, charging_time):
     global total_vehicles, vehicles_charged, vehicles_waited
@@ -37,7 +46,8 @@ def vehicle(env, vehicle_id, station, arrival_delay, charging_time):
     yield env.timeout(arrival_delay)
     arrival_time = env.now
     total_vehicles += 1
-    print(f'Vehicle {vehicle_id} arrived at {env.now:.2f} minutes')
+    if tracer.enabled:
+        tracer.event('arrival', env.now, vehicle=vehicle_id)
     
     with station.charging_spots.request() as request:
         # Espera por un punto de recarga disponible
@@ -46,7 +56,8 @@ def vehicle(env, vehicle_id, station, arrival_delay, charging_time):
         waiting_times.append(waiting_time)
         if waiting_time > 0:
             vehicles_waited += 1
-        print(f'Vehicle {vehicle_id} started charging at {env.now:.2f} minutes')
+        if tracer.enabled:
+            tracer.event('charge_start', env.now, vehicle=vehicle_id)
         
         yield env.process(station.charge(vehicle_id, charging_time))
         charging_times.append(charging_time)
@@ -94,6 +105,10 @@ def main():
     print(f'Proportion of vehicles that waited: {proportion_waited:.2f}%')
     for i, utilization in enumerate(station_utilization):
         print(f'Station {i} utilization: {utilization:.2f}%')
+    # Referencia analítica: cada estación recibe una fracción 1/NUM_STATIONS de las llegadas y es una cola M/M/c
+    analytic = mmc(1 / (INTER_ARRIVAL_TIME * NUM_STATIONS), 1 / CHARGING_TIME_MEAN, CHARGING_SPOTS)
+    print(f'Analytic M/M/{CHARGING_SPOTS} per station: utilization {analytic["utilization"] * 100:.2f}%, '
+          f'average waiting time {analytic["mean_wait"]:.2f} minutes')
 
     plt.figure(figsize=(15, 5))
     plt.subplot(2, 3, 1)
@@ -1,7 +1,16 @@
+import os
+import sys
 import simpy
-import random
 import matplotlib.pyplot as plt
 import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.traza import get_tracer
+from herramientas.instrumentacion import make_environment
+from herramientas.analisis_salida import steady_state
+from herramientas.aleatorios import RandomStreams
+
+# Traza de eventos de los vehículos (desactivada salvo que se configure SIM_TRACE)
+tracer = get_tracer('recarga-vehiculos-08')
 
 # Parámetros globales
 NUM_STATIONS = 5                # Número de estaciones de recarga
@@ -12,16 +21,21 @@ CHARGING_TIME_MEAN = 60         # Tiempo medio de carga de cada vehículo (minut
 MAX_WAIT_TIME = 30              # Tiempo máximo de espera permitido antes de abandonar (minutos)
 
 # Variables para análisis
-waiting_times = []
-charging_times = []
-total_vehicles = 0
-vehicles_charged = 0
-vehicles_waited = 0
-vehicles_abandoned = 0
-usage_times = []
-station_usage_times = [0] * NUM_STATIONS
-vehicles_per_station = [0] * NUM_STATIONS
-waiting_times_by_interval = [[] for _ in range(24)]
+def reset_statistics():
+    global waiting_times, charging_times, total_vehicles, vehicles_charged, vehicles_waited, vehicles_abandoned
+    global usage_times, station_usage_times, vehicles_per_station, waiting_times_by_interval
+    waiting_times = []
+    charging_times = []
+    total_vehicles = 0
+    vehicles_charged = 0
+    vehicles_waited = 0
+    vehicles_abandoned = 0
+    usage_times = []
+    station_usage_times = [0] * NUM_STATIONS
+    vehicles_per_station = [0] * NUM_STATIONS
+    waiting_times_by_interval = [[] for _ in range(24)]
+
+reset_statistics()
 
 class EVChargingStation:
     def __init__(self, env, num_spots, station_id):
@@ -33,7 +47,8 @@ class EVChargingStation:
     def charge(self, vehicle_id, charging_time):
         yield self.env.timeout(charging_time)
         self.total_usage_time += charging_time
-        print(f'Vehicle {vehicle_id} completed charging at {self.env.now:.2f} minutes')
+        if tracer.enabled:
+            tracer.event('charge_end', self.env.now, vehicle=vehicle_id)
 
 def vehicle(env, vehicle_id, station, arrival_delay, charging_time):
     global total_vehicles, vehicles_charged, vehicles_waited, vehicles_abandoned
@@ -41,7 +56,8 @@ def vehicle(env, vehicle_id, station, arrival_delay, charging_time):
     yield env.timeout(arrival_delay)
     arrival_time = env.now
     total_vehicles += 1
-    print(f'Vehicle {vehicle_id} arrived at {env.now:.2f} minutes')
+    if tracer.enabled:
+        tracer.event('arrival', env.now, vehicle=vehicle_id)
     
     with station.charging_spots.request() as request:
         # Espera por un punto de recarga disponible
@@ -49,7 +65,8 @@ def vehicle(env, vehicle_id, station, arrival_delay, charging_time):
         if request not in results:
             # El vehículo abandona si espera demasiado
             vehicles_abandoned += 1
-            print(f'Vehicle {vehicle_id} abandoned at {env.now:.2f} minutes after waiting too long')
+            if tracer.enabled:
+                tracer.event('abandonment', env.now, vehicle=vehicle_id, waited=env.now - arrival_time)
             return
 
         waiting_time = env.now - arrival_time
@@ -58,7 +75,8 @@ def vehicle(env, vehicle_id, station, arrival_delay, charging_time):
         waiting_times_by_interval[hour].append(waiting_time)
         if waiting_time > 0:
             vehicles_waited += 1
-        print(f'Vehicle {vehicle_id} started charging at {env.now:.2f} minutes')
+        if tracer.enabled:
+            tracer.event('charge_start', env.now, vehicle=vehicle_id)
         
         yield env.process(station.charge(vehicle_id, charging_time))
         charging_times.append(charging_time)
@@ -68,16 +86,16 @@ def vehicle(env, vehicle_id, station, arrival_delay, charging_time):
         station_usage_times[station.station_id] += usage_time
         vehicles_per_station[station.station_id] += 1
 
-def setup(env, num_stations, charging_spots):
+def setup(env, num_stations, charging_spots, streams, inter_arrival_time=INTER_ARRIVAL_TIME):
     # Crear estaciones de recarga
     stations = [EVChargingStation(env, charging_spots, i) for i in range(num_stations)]
     vehicle_id = 0
 
     while True:
-        # Tiempo de llegada del siguiente vehículo
-        arrival_delay = random.expovariate(1.0 / INTER_ARRIVAL_TIME)
-        charging_time = random.expovariate(1.0 / CHARGING_TIME_MEAN)
-        selected_station = random.choice(stations)  # Selecciona una estación aleatoria
+        # Tiempo de llegada del siguiente vehículo (cada fuente de aleatoriedad con su propio stream)
+        arrival_delay = streams['arrivals'].expovariate(1.0 / inter_arrival_time)
+        charging_time = streams['charging'].expovariate(1.0 / CHARGING_TIME_MEAN)
+        selected_station = streams['stations'].choice(stations)  # Selecciona una estación aleatoria
         
         # Crear un vehículo y pasarlo a la simulación
         env.process(vehicle(env, vehicle_id, selected_station, arrival_delay, charging_time))
@@ -85,11 +103,23 @@ def setup(env, num_stations, charging_spots):
 
         yield env.timeout(arrival_delay)
 
-def main():
-    random.seed(42)  # Establecer semilla para reproducibilidad
-    env = simpy.Environment()
-    env.process(setup(env, NUM_STATIONS, CHARGING_SPOTS))
+def run_simulation(inter_arrival_time=INTER_ARRIVAL_TIME, seed=42, charging_spots=CHARGING_SPOTS, antithetic=False):
+    """
+    Ejecuta la simulación y devuelve el entorno. Los resultados quedan en las
+    variables globales de análisis, que se reinician en cada ejecución. Dos
+    ejecuciones con la misma semilla ven las mismas llegadas, tiempos de carga
+    y estaciones elegidas (números aleatorios comunes), aunque cambie el
+    número de puntos de recarga.
+    """
+    reset_statistics()
+    streams = RandomStreams(seed, antithetic)  # Semilla para reproducibilidad
+    env = make_environment()
+    env.process(setup(env, NUM_STATIONS, charging_spots, streams, inter_arrival_time))
     env.run(until=SIM_TIME)
+    return env
+
+def main():
+    run_simulation()
     
     # Análisis de resultados
     avg_waiting_time = np.mean(waiting_times) if waiting_times else 0
@@ -108,6 +138,8 @@ def main():
     print(f'Average usage time: {avg_usage_time:.2f} minutes')
     print(f'Proportion of vehicles that waited: {proportion_waited:.2f}%')
     print(f'Abandonment rate: {abandonment_rate:.2f}%')
+    # Espera sin el arranque con las estaciones vacías (MSER-5) e intervalo por lotes solapados
+    print(f'Steady-state waiting time: {steady_state(waiting_times)}')
     for i, utilization in enumerate(station_utilization):
         print(f'Station {i} utilization: {utilization:.2f}%')
         print(f'Station {i} vehicles served: {vehicles_per_station[i]}')
@@ -0,0 +1,127 @@
+import itertools
+import math
+
+import networkx as nx
+
+
+class CongestionModel:
+    """
+    Link travel times that depend on link occupancy (BPR function):
+
+        t = t0 * (1 + alpha * (occupancy / capacity) ** beta)
+
+    where t0 = distance / speed is the free-flow time. The model works on a
+    directed copy of the road graph, so each direction of a road has its own
+    occupancy. Vehicles call `enter` and `leave` as they move; only the links
+    whose occupancy changed are marked dirty, and their 'travel_time'
+    attribute is recomputed lazily (`refresh`) before the next routing query.
+    Each link also keeps the version at which it last changed, so a vehicle
+    can tell whether its planned path is still up to date without re-routing.
+    """
+    def __init__(self, graph, speed, capacity_per_unit=1.0, alpha=0.15, beta=4.0):
+        self.graph = graph.to_directed()
+        self.speed = speed
+        self.alpha = alpha
+        self.beta = beta
+        for u, v, data in self.graph.edges(data=True):
+            data['free_flow_time'] = data['distance'] / speed
+            data['capacity'] = max(1.0, data['distance'] * capacity_per_unit)
+            data['occupancy'] = 0
+            data['peak_occupancy'] = 0
+            data['travel_time'] = data['free_flow_time']
+            data['version'] = 0
+        self.version = 0
+        self.dirty = set()
+        self.updates = 0
+        self.queries = 0
+
+    def bpr(self, data):
+        return data['free_flow_time'] * (1 + self.alpha * (data['occupancy'] / data['capacity']) ** self.beta)
+
+    def enter(self, u, v):
+        """A vehicle enters link u -> v; returns its travel time with the current occupancy (including itself)."""
+        data = self.graph[u][v]
+        data['occupancy'] += 1
+        data['peak_occupancy'] = max(data['peak_occupancy'], data['occupancy'])
+        self.dirty.add((u, v))
+        return self.bpr(data)
+
+    def leave(self, u, v):
+        self.graph[u][v]['occupancy'] -= 1
+        self.dirty.add((u, v))
+
+    def refresh(self):
+        """Recompute the travel time of the links whose occupancy changed since the last refresh."""
+        if not self.dirty:
+            return
+        self.version += 1
+        for u, v in self.dirty:
+            data = self.graph[u][v]
+            data['travel_time'] = self.bpr(data)
+            data['version'] = self.version
+        self.updates += len(self.dirty)
+        self.dirty.clear()
+
+    def heuristic(self, a, b):
+        # Straight-line free-flow time: never more than the real travel time, so A* stays exact
+        return math.hypot(a[0] - b[0], a[1] - b[1]) / self.speed
+
+    def route(self, source, target):
+        """Fastest path with the current travel times (A* from source, nodes labelled by coordinates)."""
+        self.refresh()
+        self.queries += 1
+        return nx.astar_path(self.graph, source, target, heuristic=self.heuristic, weight='travel_time')
+
+    def path_time(self, path):
+        return sum(self.graph[u][v]['travel_time'] for u, v in zip(path, path[1:]))
+
+    def changed_since(self, path, version):
+        """True if any link of the path changed its travel time after the given version."""
+        self.refresh()
+        return any(self.graph[u][v]['version'] > version for u, v in zip(path, path[1:]))
+
+
+class RoutePlan:
+    """
+    Path of a vehicle towards its target. At every decision point (node) the
+    plan is kept as long as none of its remaining links changed; otherwise
+    their current time is compared with the time expected when the path was
+    planned, and the vehicle only re-routes from its current node if it got
+    worse by more than `threshold`.
+    """
+    def __init__(self, model, source, target, threshold=0.1):
+        self.model = model
+        self.target = target
+        self.threshold = threshold
+        self.reroutes = 0
+        self.plan(source)
+
+    def plan(self, source):
+        self.path = self.model.route(source, self.target)
+        self.index = 0
+        self.version = self.model.version
+        graph = self.model.graph
+        self.expected = list(itertools.accumulate(
+            (graph[u][v]['travel_time'] for u, v in zip(self.path, self.path[1:])), initial=0))
+
+    @property
+    def node(self):
+        return self.path[self.index]
+
+    def arrived(self):
+        return self.node == self.target
+
+    def next_node(self):
+        """Called at every node until arrival; moves the plan to the next node of the (possibly updated) path."""
+        remaining = self.path[self.index:]
+        if self.model.changed_since(remaining, self.version):
+            expected = self.expected[-1] - self.expected[self.index]
+            if self.model.path_time(remaining) > expected * (1 + self.threshold):
+                old_next = remaining[1]
+                self.plan(self.node)
+                if self.path[1] != old_next:
+                    self.reroutes += 1
+            else:
+                self.version = self.model.version
+        self.index += 1
+        return self.node
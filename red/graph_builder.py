@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+
+import networkx as nx
+import numpy as np
+
+CACHE_DIR = '__graphcache__'  # Folder, next to the GeoJSON file, where built graphs are cached
+
+
+class RoadGraph:
+    """
+    Undirected road graph in CSR form.
+
+    `coords[i]` holds the (x, y) coordinates of node i, and the neighbours of
+    node i are `indices[indptr[i]:indptr[i + 1]]`, with the segment lengths in
+    the same positions of `lengths`. Each road segment also appears once in
+    `edges` (pairs of node ids) with its length in `edge_lengths`.
+    """
+    def __init__(self, coords, edges, edge_lengths):
+        self.coords = coords
+        self.edges = edges
+        self.edge_lengths = edge_lengths
+        # Both directions of every segment, sorted by source node
+        sources = np.concatenate([edges[:, 0], edges[:, 1]])
+        targets = np.concatenate([edges[:, 1], edges[:, 0]])
+        lengths = np.concatenate([edge_lengths, edge_lengths])
+        order = np.lexsort((targets, sources))
+        self.indices = targets[order]
+        self.lengths = lengths[order]
+        self.indptr = np.zeros(len(coords) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(coords)), out=self.indptr[1:])
+
+    @property
+    def num_nodes(self):
+        return len(self.coords)
+
+    @property
+    def num_edges(self):
+        return len(self.edges)
+
+    def neighbours(self, node):
+        start, end = self.indptr[node], self.indptr[node + 1]
+        return self.indices[start:end], self.lengths[start:end]
+
+    def node_labels(self):
+        """Nodes labelled by their (x, y) coordinates, as in the GeoJSON file."""
+        return [tuple(point) for point in self.coords.tolist()]
+
+    def to_networkx(self, attributes=None, coordinate_labels=True):
+        """
+        NetworkX graph with one edge per road segment. `attributes` maps an
+        attribute name to an array with one value per edge (in the order of
+        `edges`); by default the segment length is stored as 'distance'.
+        Nodes are labelled by their coordinates, or by their integer id.
+        """
+        if attributes is None:
+            attributes = {'distance': self.edge_lengths}
+        labels = self.node_labels() if coordinate_labels else list(range(self.num_nodes))
+        names = list(attributes)
+        columns = [np.asarray(attributes[name]).tolist() for name in names]
+        graph = nx.Graph()
+        graph.add_nodes_from(labels)
+        graph.add_edges_from(
+            (labels[u], labels[v], dict(zip(names, values)))
+            for (u, v), *values in zip(self.edges.tolist(), *columns)
+        )
+        return graph
+
+
+def read_lines(geojson_file):
+    """Coordinates of every LineString (MultiLineStrings are split into their lines) in a GeoJSON file."""
+    with open(geojson_file) as file:
+        data = json.load(file)
+    lines = []
+    for feature in data['features']:
+        geometry = feature.get('geometry')
+        if geometry is None:
+            continue
+        if geometry['type'] == 'LineString':
+            lines.append(geometry['coordinates'])
+        elif geometry['type'] == 'MultiLineString':
+            lines.extend(geometry['coordinates'])
+    return [np.asarray(line, dtype=float)[:, :2] for line in lines if len(line) > 1]
+
+
+def build_graph(lines, tolerance=1e-9):
+    """
+    Build the graph from a list of (n, 2) coordinate arrays. Coordinates are
+    snapped to a grid of size `tolerance` and deduplicated into integer node
+    ids; every pair of consecutive points becomes a segment with its own
+    length. Zero-length segments are dropped and, when two roads share a
+    segment, the shortest one is kept.
+    """
+    points = np.concatenate(lines)
+    sizes = np.array([len(line) for line in lines])
+    # Index of the first point of every segment: all points except the last one of each line
+    is_last = np.zeros(len(points), dtype=bool)
+    is_last[np.cumsum(sizes) - 1] = True
+    starts = np.flatnonzero(~is_last)
+
+    snapped = np.round(points / tolerance).astype(np.int64)
+    _, first, node_of_point = np.unique(snapped, axis=0, return_index=True, return_inverse=True)
+    node_of_point = node_of_point.ravel()
+    coords = points[first]
+
+    u = node_of_point[starts]
+    v = node_of_point[starts + 1]
+    delta = points[starts + 1] - points[starts]
+    lengths = np.hypot(delta[:, 0], delta[:, 1])
+
+    keep = u != v
+    u, v, lengths = u[keep], v[keep], lengths[keep]
+    low, high = np.minimum(u, v), np.maximum(u, v)
+    # Shortest copy of every repeated segment: sort by (low, high, length) and keep the first of each pair
+    order = np.lexsort((lengths, high, low))
+    low, high, lengths = low[order], high[order], lengths[order]
+    first_of_pair = np.ones(len(low), dtype=bool)
+    first_of_pair[1:] = (low[1:] != low[:-1]) | (high[1:] != high[:-1])
+    edges = np.column_stack([low[first_of_pair], high[first_of_pair]])
+    return RoadGraph(coords, edges, lengths[first_of_pair])
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_road_graph(geojson_file, tolerance=1e-9, cache=True):
+    """
+    Road graph of a GeoJSON file. The built graph is cached as a .npz file
+    named after the SHA-256 of the GeoJSON contents (and the snapping
+    tolerance), so it is only rebuilt when the file changes.
+    """
+    if not cache:
+        return build_graph(read_lines(geojson_file), tolerance)
+    key = hashlib.sha256(f"{file_hash(geojson_file)}:{tolerance!r}".encode()).hexdigest()[:24]
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(geojson_file)), CACHE_DIR)
+    cache_file = os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(geojson_file))[0]}-{key}.npz")
+    if os.path.exists(cache_file):
+        with np.load(cache_file) as data:
+            return RoadGraph(data['coords'], data['edges'], data['edge_lengths'])
+    graph = build_graph(read_lines(geojson_file), tolerance)
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez(cache_file, coords=graph.coords, edges=graph.edges, edge_lengths=graph.edge_lengths)
+    return graph
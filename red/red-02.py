@@ -4,9 +4,10 @@ import random
 import time
 import matplotlib.pyplot as plt
 import networkx as nx
-import geopandas as gpd
 import pandas as pd
-from shapely.geometry import LineString
+
+from graph_builder import load_road_graph
+from routing import RoutingService
 
 # Constants
 SPEED = 10  # units/sec
@@ -14,39 +15,32 @@ NUM_VEHICLES = 50  # Number of vehicles in the simulation
 SIMULATION_TIME = 100  # Total simulation time
 FUEL_COST_PER_UNIT = 0.5  # Cost per distance unit
 TIME_COST_PER_UNIT = 1.0  # Cost per time unit
+ROUTE_CACHE_SIZE = 100_000  # Paths kept in the LRU cache of the routing service
+CONTRACTION = False  # Answer single route queries with a contraction hierarchy (worth it for many repeated queries)
+GEOJSON_FILE = 'roads.geojson'  # Road network
 
-# Load the road network from GeoJSON using GeoPandas to create a geospatial representation of the road data
-geojson_file = 'roads.geojson'
-road_data = gpd.read_file(geojson_file)
-
-# Convert GeoJSON to a NetworkX graph
-G = nx.Graph()
-for _, feature in road_data.iterrows():
-    if isinstance(feature.geometry, LineString):
-        coords = list(feature.geometry.coords)
-        # Iterate over each segment of the LineString and add edges to the graph
-        for i in range(len(coords) - 1):
-            distance = feature.geometry.length
-            travel_time = distance / SPEED
-            # Calculate cost considering both fuel and time
-            cost = (FUEL_COST_PER_UNIT * distance) + (TIME_COST_PER_UNIT * travel_time)
-            G.add_edge(coords[i], coords[i + 1], weight=cost, distance=distance)
-
-# Initialize the SimPy environment to manage the simulation of vehicle movements
-env = simpy.Environment()
+def build_road_network(geojson_file):
+    """
+    Load the road network from GeoJSON as a CSR graph with one edge per segment (cached on disk, keyed by the file hash)
+    and convert it to a NetworkX graph where each segment weighs its own length, not the length of the whole road.
+    """
+    road_graph = load_road_graph(geojson_file)
+    distance = road_graph.edge_lengths
+    travel_time = distance / SPEED
+    # Calculate cost considering both fuel and time
+    cost = (FUEL_COST_PER_UNIT * distance) + (TIME_COST_PER_UNIT * travel_time)
+    return road_graph.to_networkx({'weight': cost, 'distance': distance})
 
 # Create a DataFrame to store the paths taken by each vehicle, including the vehicle ID, current and next nodes, and the time of movement
 vehicle_paths = pd.DataFrame(columns=['vehicle_id', 'current_node', 'next_node', 'time'])
 vehicle_summary = pd.DataFrame(columns=['vehicle_id', 'total_cost', 'total_time', 'edges_traversed'])
 
 # Vehicle process
-def vehicle(env, vehicle_id, start_node, end_node, graph):
+def vehicle(env, vehicle_id, path, graph):
     """
-    Define the vehicle process that simulates the movement of a vehicle from a start node to an end node through the graph.
-    The vehicle follows the path that minimizes the total cost, and the movement is recorded in the DataFrame.
+    Define the vehicle process that simulates the movement of a vehicle along its path through the graph.
+    The path minimizes the total cost and is provided by the routing service; the movement is recorded in the DataFrame.
     """
-    # Calculate the path that minimizes the cost (weight) between the start and end nodes
-    path = nx.shortest_path(graph, source=start_node, target=end_node, weight='weight')
     total_cost = 0
     for i in range(len(path) - 1):
         current_node = path[i]
@@ -62,39 +56,60 @@ def vehicle(env, vehicle_id, start_node, end_node, graph):
     # Record summary information for each vehicle
     vehicle_summary.loc[len(vehicle_summary)] = [vehicle_id, total_cost, env.now, len(path) - 1]
 
-# Create vehicles
-nodes = list(G.nodes)
-for i in range(NUM_VEHICLES):
-    start, end = random.sample(nodes, 2)
-    env.process(vehicle(env, i, start, end, G))
-
-# Run the simulation until the specified simulation time is reached
-env.run(until=SIMULATION_TIME)
-
-# Visualization
-# Create a dictionary of positions for each node in the graph to be used for visualization
-pos = {node: (node[0], node[1]) for node in G.nodes}
-fig, ax = plt.subplots(figsize=(10, 10))
-# Draw the road network using NetworkX, displaying nodes and edges with specified visual properties
-nx.draw(G, pos, ax=ax, node_size=10, edge_color='gray', with_labels=True, font_size=8, font_color='blue')
-
-# Plot vehicle paths (static visualization)
-colors = ['r', 'g', 'b', 'y', 'm']
-for i in range(NUM_VEHICLES):
-    start, end = random.sample(nodes, 2)
-    # Recalculate the path that minimizes the cost for visualization purposes, highlighting the paths taken by the vehicles
-    path = nx.shortest_path(G, source=start, target=end, weight='weight')
-    path_edges = list(zip(path, path[1:]))
-    nx.draw_networkx_edges(G, pos, edgelist=path_edges, ax=ax, edge_color=colors[i % len(colors)], width=2)
-
-plt.title("Road Network and Vehicle Paths")
-plt.xlabel("Longitude")
-plt.ylabel("Latitude")
-plt.show()
-
-# Display vehicle paths DataFrame
-vehicle_paths = vehicle_paths.sort_values(by=['vehicle_id', 'time'])
-print(vehicle_paths)
-
-# Display vehicle summary DataFrame
-print(vehicle_summary)
+def run_simulation(geojson_file=GEOJSON_FILE, num_vehicles=NUM_VEHICLES, seed=None):
+    """
+    Run the simulation without showing results (it is also used by the benchmarks).
+    Returns the environment, the graph, the vehicle paths and the routing service.
+    """
+    random.seed(seed)
+    G = build_road_network(geojson_file)
+
+    # Routing service shared by all vehicles: cached paths, one Dijkstra search per origin
+    routing = RoutingService(G, cache_size=ROUTE_CACHE_SIZE, contraction=CONTRACTION)
+
+    # Initialize the SimPy environment to manage the simulation of vehicle movements
+    env = simpy.Environment()
+
+    # Create vehicles
+    nodes = list(G.nodes)
+    trips = [random.sample(nodes, 2) for _ in range(num_vehicles)]
+    # Calculate the paths that minimize the cost (weight), grouping the vehicles that share an origin
+    paths = routing.routes(trips, profile='weight')
+    for i, path in enumerate(paths):
+        env.process(vehicle(env, i, path, G))
+
+    # Run the simulation until the specified simulation time is reached
+    env.run(until=SIMULATION_TIME)
+    return env, G, paths, routing
+
+def main():
+    env, G, paths, routing = run_simulation()
+
+    # Visualization
+    # Create a dictionary of positions for each node in the graph to be used for visualization
+    pos = {node: (node[0], node[1]) for node in G.nodes}
+    fig, ax = plt.subplots(figsize=(10, 10))
+    # Draw the road network using NetworkX, displaying nodes and edges with specified visual properties
+    nx.draw(G, pos, ax=ax, node_size=10, edge_color='gray', with_labels=True, font_size=8, font_color='blue')
+
+    # Plot vehicle paths (static visualization)
+    colors = ['r', 'g', 'b', 'y', 'm']
+    for i, path in enumerate(paths):
+        # Reuse the paths computed for the vehicles, highlighting the paths taken by them
+        path_edges = list(zip(path, path[1:]))
+        nx.draw_networkx_edges(G, pos, edgelist=path_edges, ax=ax, edge_color=colors[i % len(colors)], width=2)
+
+    plt.title("Road Network and Vehicle Paths")
+    plt.xlabel("Longitude")
+    plt.ylabel("Latitude")
+    plt.show()
+
+    # Display vehicle paths DataFrame
+    print(vehicle_paths.sort_values(by=['vehicle_id', 'time']))
+
+    # Display vehicle summary DataFrame
+    print(vehicle_summary)
+    routing.print_stats()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import random
+import simpy
+import matplotlib.pyplot as plt
+import networkx as nx
+import pandas as pd
+
+from congestion import CongestionModel, RoutePlan
+from graph_builder import load_road_graph
+
+# Constants
+SPEED = 10  # units/sec (free-flow speed)
+NUM_VEHICLES = 2000  # Number of vehicles in the simulation
+MEAN_INTERARRIVAL = 0.006  # Mean time between two vehicles entering the network (shorter gaps overload the links: BPR travel times grow with the fourth power of occupancy, blow up, and trips stop finishing within SIMULATION_TIME)
+SIMULATION_TIME = 100  # Total simulation time
+CAPACITY_PER_UNIT = 5  # Vehicles per distance unit at which a link reaches its practical capacity
+BPR_ALPHA = 0.15  # BPR function parameters: t = t0 * (1 + alpha * (occupancy / capacity) ** beta)
+BPR_BETA = 4
+REROUTE_THRESHOLD = 0.1  # Re-route when the remaining path is this fraction slower than planned
+RANDOM_SEED = 42
+
+random.seed(RANDOM_SEED)
+
+# Load the road network from GeoJSON (one edge per segment with its own length)
+geojson_file = 'roads.geojson'
+G = load_road_graph(geojson_file).to_networkx()
+
+# Link travel times depend on how many vehicles are on each link
+model = CongestionModel(G, SPEED, capacity_per_unit=CAPACITY_PER_UNIT, alpha=BPR_ALPHA, beta=BPR_BETA)
+
+env = simpy.Environment()
+
+# One record per vehicle that reaches its destination
+vehicle_summary = []
+
+# Vehicle process
+def vehicle(env, vehicle_id, start_node, end_node):
+    """
+    The vehicle plans the fastest path with the current travel times. At every node it keeps its plan unless the
+    links ahead got slower than expected, in which case it re-routes from there. Its travel time on each link is
+    set by the occupancy of the link when it enters it.
+    """
+    start_time = env.now
+    plan = RoutePlan(model, start_node, end_node, threshold=REROUTE_THRESHOLD)
+    free_flow_time = 0
+    edges = 0
+    node = plan.node
+    while not plan.arrived():
+        next_node = plan.next_node()
+        travel_time = model.enter(node, next_node)
+        free_flow_time += model.graph[node][next_node]['free_flow_time']
+        yield env.timeout(travel_time)
+        model.leave(node, next_node)
+        node = next_node
+        edges += 1
+    vehicle_summary.append({
+        'vehicle_id': vehicle_id,
+        'travel_time': env.now - start_time,
+        'free_flow_time': free_flow_time,
+        'edges_traversed': edges,
+        'reroutes': plan.reroutes,
+    })
+
+# Vehicles enter the network one after another at random origins
+def source(env):
+    nodes = list(G.nodes)
+    for i in range(NUM_VEHICLES):
+        start, end = random.sample(nodes, 2)
+        env.process(vehicle(env, i, start, end))
+        yield env.timeout(random.expovariate(1 / MEAN_INTERARRIVAL))
+
+env.process(source(env))
+env.run(until=SIMULATION_TIME)
+
+summary = pd.DataFrame(vehicle_summary)
+summary['delay_ratio'] = summary['travel_time'] / summary['free_flow_time']
+print(summary[['travel_time', 'free_flow_time', 'delay_ratio', 'reroutes']].agg(['mean', 'max']).round(3))
+print(f"Vehicles arrived: {len(summary)} of {NUM_VEHICLES}")
+print(f"Vehicles that re-routed: {(summary['reroutes'] > 0).sum()}")
+print(f"Route queries: {model.queries}, link travel-time updates: {model.updates}")
+
+# Visualization: peak occupancy of each road (both directions)
+pos = {node: (node[0], node[1]) for node in G.nodes}
+peak = {(u, v): max(model.graph[u][v]['peak_occupancy'], model.graph[v][u]['peak_occupancy']) for u, v in G.edges}
+fig, ax = plt.subplots(figsize=(10, 10))
+nx.draw_networkx_nodes(G, pos, ax=ax, node_size=10)
+edges = nx.draw_networkx_edges(G, pos, edgelist=list(peak), edge_color=list(peak.values()), edge_cmap=plt.cm.plasma, width=4, ax=ax)
+plt.colorbar(edges, ax=ax, label='Peak occupancy (vehicles)')
+plt.title("Road Network: Peak Link Occupancy")
+plt.xlabel("Longitude")
+plt.ylabel("Latitude")
+plt.show()
@@ -0,0 +1,236 @@
+import heapq
+import itertools
+from collections import OrderedDict, defaultdict
+
+import networkx as nx
+
+
+def edge_cost(profile):
+    """
+    Turn a cost profile into a function (u, v, data) -> cost. A profile is
+    either the name of an edge attribute (e.g. 'weight', 'distance') or a
+    callable with the same signature as NetworkX weight functions.
+    """
+    if callable(profile):
+        return profile
+    return lambda u, v, data: data[profile]
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy of an undirected graph for one cost profile.
+
+    Nodes are contracted one by one, in the order given by their edge
+    difference (shortcuts added minus edges removed), and a shortcut is added
+    between two neighbours whenever no witness path avoids the contracted
+    node. A query is then a Dijkstra search that only goes "upwards" in the
+    ranking from both ends, which settles a few dozen nodes instead of the
+    whole graph. Shortcuts remember the node they bypass, so found paths are
+    unpacked into the original edges.
+    """
+    def __init__(self, graph, profile='weight', witness_limit=50):
+        cost = edge_cost(profile)
+        self.witness_limit = witness_limit
+        adjacency = {node: {} for node in graph.nodes}
+        for u, v, data in graph.edges(data=True):
+            if u == v:
+                continue
+            w = cost(u, v, data)
+            if w < adjacency[u].get(v, float('inf')):
+                adjacency[u][v] = adjacency[v][u] = w
+        self.middle = {}  # (u, w) -> node bypassed by the shortcut u-w
+        self.rank = {}
+        remaining = {node: dict(neighbours) for node, neighbours in adjacency.items()}
+
+        counter = itertools.count()  # tie breaker, nodes need not be comparable
+        heap = [(self._edge_difference(remaining, node), next(counter), node) for node in remaining]
+        heapq.heapify(heap)
+        while heap:
+            _, _, node = heapq.heappop(heap)
+            # Lazy update: re-evaluate the priority and postpone the node if it is no longer the best one
+            priority = self._edge_difference(remaining, node)
+            if heap and priority > heap[0][0]:
+                heapq.heappush(heap, (priority, next(counter), node))
+                continue
+            for u, w, via in self._shortcuts(remaining, node):
+                if via < adjacency[u].get(w, float('inf')):
+                    adjacency[u][w] = adjacency[w][u] = via
+                    remaining[u][w] = remaining[w][u] = via
+                    self.middle[(u, w)] = self.middle[(w, u)] = node
+            for neighbour in remaining[node]:
+                del remaining[neighbour][node]
+            del remaining[node]
+            self.rank[node] = len(self.rank)
+
+        self.upward = {node: {other: w for other, w in neighbours.items() if self.rank[other] > self.rank[node]}
+                       for node, neighbours in adjacency.items()}
+
+    def _shortcuts(self, remaining, node):
+        neighbours = list(remaining[node].items())
+        shortcuts = []
+        for i, (u, wu) in enumerate(neighbours):
+            targets = {w: wu + ww for w, ww in neighbours[i + 1:]}
+            if not targets:
+                continue
+            distances = self._witness_search(remaining, u, node, max(targets.values()))
+            for w, via in targets.items():
+                if distances.get(w, float('inf')) > via:
+                    shortcuts.append((u, w, via))
+        return shortcuts
+
+    def _witness_search(self, remaining, source, excluded, limit):
+        """Bounded Dijkstra from source that avoids the node being contracted."""
+        distances = {source: 0}
+        heap = [(0, 0, source)]
+        counter = itertools.count(1)
+        settled = 0
+        while heap and settled < self.witness_limit:
+            d, _, node = heapq.heappop(heap)
+            if d > distances[node]:
+                continue
+            if d > limit:
+                break
+            settled += 1
+            for other, w in remaining[node].items():
+                if other == excluded:
+                    continue
+                nd = d + w
+                if nd < distances.get(other, float('inf')):
+                    distances[other] = nd
+                    heapq.heappush(heap, (nd, next(counter), other))
+        return distances
+
+    def _edge_difference(self, remaining, node):
+        return len(self._shortcuts(remaining, node)) - len(remaining[node])
+
+    def _upward_search(self, source):
+        distances = {source: 0}
+        predecessors = {source: None}
+        heap = [(0, 0, source)]
+        counter = itertools.count(1)
+        while heap:
+            d, _, node = heapq.heappop(heap)
+            if d > distances[node]:
+                continue
+            for other, w in self.upward[node].items():
+                nd = d + w
+                if nd < distances.get(other, float('inf')):
+                    distances[other] = nd
+                    predecessors[other] = node
+                    heapq.heappush(heap, (nd, next(counter), other))
+        return distances, predecessors
+
+    def _unpack(self, u, w):
+        if (u, w) not in self.middle:
+            return [u, w]
+        node = self.middle[(u, w)]
+        return self._unpack(u, node)[:-1] + self._unpack(node, w)
+
+    def shortest_path(self, source, target):
+        if source == target:
+            return [source]
+        forward, forward_predecessors = self._upward_search(source)
+        backward, backward_predecessors = self._upward_search(target)
+        meeting = min((node for node in forward if node in backward),
+                      key=lambda node: forward[node] + backward[node], default=None)
+        if meeting is None:
+            raise nx.NetworkXNoPath(f"No path between {source} and {target}.")
+        hops = []
+        node = meeting
+        while node is not None:
+            hops.append(node)
+            node = forward_predecessors[node]
+        hops.reverse()
+        node = backward_predecessors[meeting]
+        while node is not None:
+            hops.append(node)
+            node = backward_predecessors[node]
+        path = [source]
+        for u, w in zip(hops, hops[1:]):
+            path.extend(self._unpack(u, w)[1:])
+        return path
+
+
+class RoutingService:
+    """
+    Shortest paths over a road graph, shared by all the vehicles.
+
+    Found paths are kept in an LRU cache keyed by (source, target, profile).
+    Routes that share an origin are solved with a single one-to-many Dijkstra
+    search (`routes`), and with `contraction=True` single queries are answered
+    with a contraction hierarchy, built per profile on first use.
+    """
+    def __init__(self, graph, cache_size=100_000, contraction=False):
+        self.graph = graph
+        self.cache_size = cache_size
+        self.contraction = contraction
+        self.hierarchies = {}
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, key):
+        path = self.cache.get(key)
+        if path is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+        return path
+
+    def _store(self, key, path):
+        self.cache[key] = path
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def hierarchy(self, profile='weight'):
+        if profile not in self.hierarchies:
+            self.hierarchies[profile] = ContractionHierarchy(self.graph, profile)
+        return self.hierarchies[profile]
+
+    def route(self, source, target, profile='weight'):
+        """Shortest path (list of nodes) from source to target under the given cost profile."""
+        key = (source, target, profile)
+        path = self._cached(key)
+        if path is None:
+            self.misses += 1
+            if self.contraction:
+                path = self.hierarchy(profile).shortest_path(source, target)
+            else:
+                path = nx.shortest_path(self.graph, source, target, weight=edge_cost(profile))
+            self._store(key, path)
+        return path
+
+    def routes_from(self, source, targets, profile='weight'):
+        """Paths from one origin to several targets, with one Dijkstra search for all the missing ones."""
+        paths = {}
+        missing = []
+        for target in dict.fromkeys(targets):
+            path = self._cached((source, target, profile))
+            if path is None:
+                missing.append(target)
+            else:
+                paths[target] = path
+        if len(missing) == 1:
+            paths[missing[0]] = self.route(source, missing[0], profile)
+        elif missing:
+            self.misses += len(missing)
+            _, found = nx.single_source_dijkstra(self.graph, source, weight=edge_cost(profile))
+            for target in missing:
+                if target not in found:
+                    raise nx.NetworkXNoPath(f"No path between {source} and {target}.")
+                paths[target] = found[target]
+                self._store((source, target, profile), found[target])
+        return paths
+
+    def routes(self, pairs, profile='weight'):
+        """Paths for a list of (source, target) pairs, grouped by origin; returned in the order of the pairs."""
+        by_source = defaultdict(list)
+        for source, target in pairs:
+            by_source[source].append(target)
+        found = {source: self.routes_from(source, targets, profile) for source, targets in by_source.items()}
+        return [found[source][target] for source, target in pairs]
+
+    def print_stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0
+        print(f"Routing cache: {len(self.cache)} paths, {self.hits} hits, {self.misses} misses ({rate:.1%} hit rate)")
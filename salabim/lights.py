@@ -1,3 +1,4 @@
+import argparse
 import math
 import salabim as sim
 import enum
@@ -35,37 +36,132 @@ def rotate(x, y, angle):
     return x * math.cos(angle) - y * math.sin(angle), +x * math.sin(angle) + y * math.cos(angle)
 
 
+def wake_up(vehicles):
+    for vehicle in vehicles:
+        if vehicle.ispassive():
+            vehicle.activate()
+    vehicles.clear()
+
+
+class ClaimGrid:
+    """
+    Uniform grid hash of the active claims. Each claim is registered in every cell its bounding box touches,
+    so an overlap query only looks at the claims in those cells instead of all active claims.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = collections.defaultdict(dict)  # dicts rather than sets, for a reproducible order of the claims in a cell
+        self.count = 0
+
+    def cells_of(self, xll, yll, xur, yur):
+        ix0, ix1 = math.floor(xll / self.cell_size), math.floor(xur / self.cell_size)
+        iy0, iy1 = math.floor(yll / self.cell_size), math.floor(yur / self.cell_size)
+        return [(ix, iy) for ix in range(ix0, ix1 + 1) for iy in range(iy0, iy1 + 1)]
+
+    def add(self, claim):
+        for cell in claim.cells:
+            self.cells[cell][claim] = None
+        self.count += 1
+
+    def remove(self, claim):
+        for cell in claim.cells:
+            cell_claims = self.cells[cell]
+            cell_claims.pop(claim, None)
+            if not cell_claims:
+                del self.cells[cell]
+        self.count -= 1
+
+    def blocking(self, claim, ignore=None):
+        """returns a claim (not belonging to vehicle ignore) that overlaps with claim, or None"""
+        for cell in claim.cells:
+            for other in self.cells.get(cell, ()):
+                if other.vehicle is not ignore and other.overlaps(claim):
+                    return other
+        return None
+
+    def __len__(self):
+        return self.count
+
+
 class Claim:
-    def __init__(self, xll, yll, xur, yur, vehicle):
+    def __init__(self, xll, yll, xur, yur, vehicle, cells=None):
         self.xll = xll
         self.yll = yll
         self.xur = xur
         self.yur = yur
         self.vehicle = vehicle
         self.color = (vehicle.color, 50)
+        self.cells = claims.cells_of(xll, yll, xur, yur) if cells is None else cells
+        self.waiters = []  # vehicles blocked by this claim, to be activated on reset
 
     def set(self):
         self.vehicle.claims.append(self)
         claims.add(self)
-        if show_claims:
+        if do_animation and show_claims:
             self.an = sim.AnimateRectangle(spec=(self.xll, self.yll, self.xur, self.yur), fillcolor=self.color)
 
     def reset(self):
         self.vehicle.claims.remove(self)
         claims.remove(self)
-        if show_claims:
+        if do_animation and show_claims:
             self.an.remove()
+        wake_up(self.waiters)
 
-    def overlaps(self, claims):
-        return any(claim.xll < self.xur and claim.xur > self.xll and claim.yll < self.yur and claim.yur > self.yll for claim in claims)
+    def overlaps(self, other):
+        return other.xll < self.xur and other.xur > self.xll and other.yll < self.yur and other.yur > self.yll
 
     def __repr__(self):
         return f"Claim({self.xll:5.1f}, {self.yll:5.1f}, {self.xur:5.1f}, {self.yur:5.1f})"
 
 
-class Vehicle(sim.Component):
-    def position(self, l):
+class Trajectory:
+    """
+    Path of a vehicle for a given (from_direction, turn, r), tabulated once at every step of resolution.
+    For each step it holds the position, the cos/sin of the angle and the claim bounding box (and its grid cells),
+    so Vehicle.position and Vehicle.claim are O(1) lookups without trigonometry.
+    """
 
+    def __init__(self, from_direction, turn, r):
+        self.from_direction = from_direction
+        self.turn = turn
+        self.r = r
+        self.xfrom = border_pos
+        self.yfrom = road_pos
+        if turn == Turns.straight:
+            self.l_start_bend = self.l_end_bend = self.l_end = road_length
+            self.xto = -border_pos
+            self.yto = road_pos
+        else:
+            arclen = r * math.pi / 2
+            if turn == Turns.right:
+                self.xto = road_pos
+                self.yto = border_pos
+            if turn == Turns.left:
+                self.xto = -road_pos
+                self.yto = -border_pos
+            self.l_start_bend = border_pos - self.xto - r
+            self.l_end_bend = self.l_start_bend + arclen
+            self.l_end = self.l_end_bend + self.l_start_bend
+
+        # one step before the start (animation at l=-resolution) up to a few steps past the end (lookahead of the claims)
+        self.first_step = -1
+        last_step = math.ceil(self.l_end / resolution) + 2
+        self.positions = []
+        self.cos = []
+        self.sin = []
+        self.boxes = []
+        self.cells = []
+        for step in range(self.first_step, last_step + 1):
+            position_info = self.compute_position(step * resolution)
+            self.positions.append(position_info)
+            self.cos.append(math.cos(position_info.angle))
+            self.sin.append(math.sin(position_info.angle))
+            box = self.compute_box(position_info)
+            self.boxes.append(box)
+            self.cells.append(claims.cells_of(*box))
+
+    def compute_position(self, l):
         is_straight = True
         if l <= self.l_start_bend:  # straight before bend
             x = self.xfrom - l
@@ -98,31 +194,70 @@ class Vehicle(sim.Component):
 
         return PositionInfo(x=x, y=y, angle=angle, is_straight=is_straight)
 
-    def claim(self, l):
-        position_info = self.position(l)
+    @staticmethod
+    def compute_box(position_info):
         xa, ya = rotate(-length_boundary / 2, -width_boundary / 2, angle=position_info.angle)
         xb, yb = rotate(length_boundary / 2, width_boundary / 2, angle=position_info.angle)
         xc, yc = rotate(-length_boundary / 2, width_boundary / 2, angle=position_info.angle)
         xd, yd = rotate(length_boundary / 2, -width_boundary / 2, angle=position_info.angle)
         xa, xb = min(xa, xb, xc, xd), max(xa, xb, xc, xd)
         ya, yb = min(ya, yb, yc, yd), max(ya, yb, yc, yd)
-        return Claim(xll=position_info.x + xa, yll=position_info.y + ya, xur=position_info.x + xb, yur=position_info.y + yb, vehicle=self)
+        return position_info.x + xa, position_info.y + ya, position_info.x + xb, position_info.y + yb
+
+    def index(self, l):
+        """index of the step at distance l (which should be a multiple of resolution)"""
+        return round(l / resolution) - self.first_step
+
+    def position(self, l):
+        return self.positions[self.index(l)]
+
+    def interpolated(self, l):
+        """position, cos and sin of the angle at any distance l, linearly interpolated between the two surrounding steps"""
+        f = l / resolution - self.first_step
+        i = min(max(int(math.floor(f)), 0), len(self.positions) - 2)
+        f -= i
+        p0, p1 = self.positions[i], self.positions[i + 1]
+        return (
+            p0.x + f * (p1.x - p0.x),
+            p0.y + f * (p1.y - p0.y),
+            p0.angle + f * (p1.angle - p0.angle),
+            self.cos[i] + f * (self.cos[i + 1] - self.cos[i]),
+            self.sin[i] + f * (self.sin[i + 1] - self.sin[i]),
+        )
+
+
+trajectories = {}  # (from_direction, turn, r) -> Trajectory, shared by all vehicles on the same path
+
+
+def trajectory(from_direction, turn, r):
+    key = (from_direction, turn, r)
+    if key not in trajectories:
+        trajectories[key] = Trajectory(from_direction, turn, r)
+    return trajectories[key]
+
+
+class Vehicle(sim.Component):
+    def position(self, l):
+        return self.trajectory.position(l)
+
+    def claim(self, l):
+        i = self.trajectory.index(l)
+        xll, yll, xur, yur = self.trajectory.boxes[i]
+        return Claim(xll=xll, yll=yll, xur=xur, yur=yur, vehicle=self, cells=self.trajectory.cells[i])
 
     def l_t(self, t):
         return sim.interpolate(t, self.t0, self.t1, self.l - resolution, self.l)
 
     def x(self, t, xoffset=0, yoffset=0):
-        position_info = self.position(self.l_t(t))
-        xdis, ydis = rotate(xoffset, yoffset, angle=position_info.angle)
-        return position_info.x + xdis
+        x, y, angle, cos, sin = self.trajectory.interpolated(self.l_t(t))
+        return x + xoffset * cos - yoffset * sin
 
     def y(self, t, xoffset=0, yoffset=0):
-        position_info = self.position(self.l_t(t))
-        xdis, ydis = rotate(xoffset, yoffset, angle=position_info.angle)
-        return position_info.y + ydis
+        x, y, angle, cos, sin = self.trajectory.interpolated(self.l_t(t))
+        return y + xoffset * sin + yoffset * cos
 
     def angle(self, t):
-        return math.degrees(self.position(self.l_t(t)).angle)
+        return math.degrees(self.trajectory.interpolated(self.l_t(t))[2])
 
     def has_to_stop(self):  # this should (and will) be only called when none of the tryclaims overlaps with claims
         if self.l > border_pos - light_pos:
@@ -132,78 +267,79 @@ class Vehicle(sim.Component):
                 self.passed_light = True
         return False
 
+    def count_stop(self):  # creeping up in a queue (less than a vehicle length since the previous stop) is not a new stop
+        if self.l - self.l_last_stop >= length_vehicle:
+            self.stops += 1
+        self.l_last_stop = self.l
+
     def setup(self, from_direction, turn, color, r=5, v=1):
         self.from_direction = from_direction
         self.turn = turn
-        self.xfrom = border_pos
-        self.yfrom = road_pos
         self.color = color
         self.v = v
         self.r = r  # ***
-
-        if turn == Turns.straight:
-            self.l_start_bend = self.l_end_bend = self.l_end = road_length
-            self.xto = -border_pos
-            self.yto = road_pos
-        else:
-            arclen = r * math.pi / 2
-            if turn == Turns.right:
-                self.xto = road_pos
-                self.yto = border_pos
-            if turn == Turns.left:
-                self.xto = -road_pos
-                self.yto = -border_pos
-            self.l_start_bend = border_pos - self.xto - r
-            self.l_end_bend = self.l_start_bend + arclen
-            self.l_end = self.l_end_bend + self.l_start_bend
+        self.trajectory = trajectory(from_direction, turn, r)
+        self.l_start_bend = self.trajectory.l_start_bend
+        self.l_end_bend = self.trajectory.l_end_bend
+        self.l_end = self.trajectory.l_end
 
     def process(self):
         self.indicator_frequency = sim.Uniform(1, 2)()
+        self.t_enter = env.now()
+        self.free_flow_time = 0
+        self.stops = 0
+        self.l_last_stop = -math.inf
         self.t0 = env.now()
         self.t1 = env.now()
         self.l = 0
         self.claims = []  # can't be a set as the order is important
         self.passed_light = False
-        while self.claim(self.l).overlaps(claims):
-            self.standby()
-        self.claim(self.l).set()
-        self.an_vehicle = sim.AnimateRectangle(
-            x=self.x,
-            y=self.y,
-            angle=self.angle,
-            spec=(-length_vehicle / 2, -width_vehicle / 2, length_vehicle / 2, width_vehicle / 2),
-            linecolor="white",
-            linewidth=unit1,
-            fillcolor=self.color,
-        )
-        self.an3d_vehicle0 = sim.Animate3dBox(
-            x=self.x, y=self.y, z=0.5, z_angle=self.angle, x_len=length_vehicle, y_len=width_vehicle, z_len=1, z_ref=1, color=self.color, shaded=True
-        )
-        self.an3d_vehicle1 = sim.Animate3dBox(
-            x=self.x, y=self.y, z=1.5, z_angle=self.angle, x_len=length_vehicle * 0.6, y_len=width_vehicle, z_len=1, z_ref=1, color=self.color, shaded=True
-        )
-
-        if self.turn in (Turns.left, Turns.right):
-            self.an_indicator = sim.AnimateRectangle(
-                spec=(-2.5, -1, -2, -0.5) if self.turn == Turns.left else (-2.5, 0.5, -2, 1),
-                visible=lambda arg, t: (t / env.speed() % arg.indicator_frequency < arg.indicator_frequency / 2) and (self.l_t(t) < self.l_end_bend),
-                angle=self.angle,
+        # blocked vehicles register at the claim that blocks them (or at the light) and wait passive until it is released
+        entry_claim = self.claim(self.l)
+        if claims.blocking(entry_claim):
+            self.count_stop()
+        while blocking := claims.blocking(entry_claim):
+            blocking.waiters.append(self)
+            self.passivate()
+        entry_claim.set()
+        if do_animation:
+            self.an_vehicle = sim.AnimateRectangle(
                 x=self.x,
                 y=self.y,
-                arg=self,
+                angle=self.angle,
+                spec=(-length_vehicle / 2, -width_vehicle / 2, length_vehicle / 2, width_vehicle / 2),
+                linecolor="white",
+                linewidth=unit1,
+                fillcolor=self.color,
             )
-
-            self.an3d_indicator = sim.Animate3dBox(
-                x_len=0.5,
-                y_len=0.5,
-                z_len=0.5,
-                x=lambda arg, t: arg.x(t, xoffset=-length_vehicle / 2, yoffset=-width_vehicle / 2 if self.turn == Turns.left else width_vehicle / 2),
-                y=lambda arg, t: arg.y(t, xoffset=-length_vehicle / 2, yoffset=-width_vehicle / 2 if self.turn == Turns.left else width_vehicle / 2),
-                z=1.5,
-                color="yellow",
-                visible=lambda arg, t: (t / env.speed() % arg.indicator_frequency < arg.indicator_frequency / 2) and (self.l_t(t) < self.l_end_bend),
-                arg=self,
+            self.an3d_vehicle0 = sim.Animate3dBox(
+                x=self.x, y=self.y, z=0.5, z_angle=self.angle, x_len=length_vehicle, y_len=width_vehicle, z_len=1, z_ref=1, color=self.color, shaded=True
             )
+            self.an3d_vehicle1 = sim.Animate3dBox(
+                x=self.x, y=self.y, z=1.5, z_angle=self.angle, x_len=length_vehicle * 0.6, y_len=width_vehicle, z_len=1, z_ref=1, color=self.color, shaded=True
+            )
+
+            if self.turn in (Turns.left, Turns.right):
+                self.an_indicator = sim.AnimateRectangle(
+                    spec=(-2.5, -1, -2, -0.5) if self.turn == Turns.left else (-2.5, 0.5, -2, 1),
+                    visible=lambda arg, t: (t / env.speed() % arg.indicator_frequency < arg.indicator_frequency / 2) and (self.l_t(t) < self.l_end_bend),
+                    angle=self.angle,
+                    x=self.x,
+                    y=self.y,
+                    arg=self,
+                )
+
+                self.an3d_indicator = sim.Animate3dBox(
+                    x_len=0.5,
+                    y_len=0.5,
+                    z_len=0.5,
+                    x=lambda arg, t: arg.x(t, xoffset=-length_vehicle / 2, yoffset=-width_vehicle / 2 if self.turn == Turns.left else width_vehicle / 2),
+                    y=lambda arg, t: arg.y(t, xoffset=-length_vehicle / 2, yoffset=-width_vehicle / 2 if self.turn == Turns.left else width_vehicle / 2),
+                    z=1.5,
+                    color="yellow",
+                    visible=lambda arg, t: (t / env.speed() % arg.indicator_frequency < arg.indicator_frequency / 2) and (self.l_t(t) < self.l_end_bend),
+                    arg=self,
+                )
 
         while self.l <= self.l_end:
             if len(self.claims) == 1:
@@ -211,15 +347,27 @@ class Vehicle(sim.Component):
                 for i in itertools.count(2):
                     if self.position(self.l + i * resolution).is_straight:
                         break
-                    self.tryclaims.append(self.claim(self.l + i))
-
-                while any(claim.overlaps(claims - set(self.claims)) for claim in self.tryclaims) or self.has_to_stop():
-                    self.standby()
+                    self.tryclaims.append(self.claim(self.l + i * resolution))
+
+                stopped = False
+                while True:
+                    blocking = next(filter(None, (claims.blocking(claim, ignore=self) for claim in self.tryclaims)), None)
+                    if blocking:
+                        blocking.waiters.append(self)
+                    elif self.has_to_stop():
+                        tl.waiters[self.from_direction].append(self)
+                    else:
+                        break
+                    if not stopped:
+                        self.count_stop()
+                        stopped = True
+                    self.passivate()
 
                 for claim in self.tryclaims:
                     claim.set()
 
             dt = resolution / self.v
+            self.free_flow_time += dt
             self.t0, self.t1 = self.env.now(), self.env.now() + dt
             self.l += resolution
 
@@ -228,20 +376,25 @@ class Vehicle(sim.Component):
             self.claims[0].reset()
         for claim in self.claims:
             claim.reset()
-        self.an_vehicle.remove()
-        self.an3d_vehicle0.remove()
-        self.an3d_vehicle1.remove()
+        statistics.tally(self)
+        if do_animation:
+            self.an_vehicle.remove()
+            self.an3d_vehicle0.remove()
+            self.an3d_vehicle1.remove()
 
-        if self.turn in (Turns.right, Turns.left):
-            self.an_indicator.remove()
-            self.an3d_indicator.remove()
+            if self.turn in (Turns.right, Turns.left):
+                self.an_indicator.remove()
+                self.an3d_indicator.remove()
 
 
 class TrafficLight(sim.Component):
     def setup(self):
         self.light = {}
+        self.waiters = {direction: [] for direction in Directions}  # vehicles waiting for green, per direction
         for direction, angle in direction_to_angle.items():
             self.light[direction] = Colors.red
+            if not do_animation:
+                continue
             for distance, this_color in enumerate(Colors):
                 x, y = rotate(light_pos1 + distance, 2.2 * road_pos, angle=angle)
                 an = sim.AnimateCircle(
@@ -276,6 +429,9 @@ class TrafficLight(sim.Component):
 
                 self.light[Directions.east] = self.light[Directions.west] = lightWE
                 self.light[Directions.north] = self.light[Directions.south] = lightNS
+                for direction in Directions:
+                    if self.light[direction] == Colors.green:
+                        wake_up(self.waiters[direction])
                 self.hold(duration)
 
 
@@ -293,18 +449,6 @@ class VehicleGenerator(sim.Component):
             self.hold(sim.Exponential(50))
 
 
-env = sim.Environment()
-size = 768
-env.speed(8)
-env.background_color("black")
-env.width3d(size)
-env.height3d(size)
-env.position3d((0, 0))
-env.width(size)
-env.height(size)
-env.position((size + 10, 0))
-env.view(x_eye=-39.748112339561004, y_eye=-78.01006285162117, z_eye=55.71822276394165, x_center=0, y_center=0, z_center=0, field_of_view_y=45)
-
 length_vehicle = 5
 width_vehicle = 2
 length_boundary = length_vehicle + 1
@@ -321,17 +465,11 @@ red_amber_duration = 3
 resolution = 1
 show_claims = True
 do_animation = True
+make_video = False
 
 border_pos = road_length / 2 + length_vehicle
 road_pos = road_inter_distance / 2
 
-env.x0(-road_length / 2)
-env.x1(road_length / 2)
-env.y0(-road_length / 2)
-unit1 = road_length / env.width()
-
-claims = set()
-
 y_road_left = road_pos
 y_road_right = -road_pos
 x_road_up = road_pos
@@ -339,105 +477,188 @@ x_road_down = -road_pos
 
 light_pos1 = light_pos - length_boundary / 2 - resolution
 
-y_text = env.height() - 80
-sim.AnimateText("Lights!", x=12, y=y_text, screen_coordinates=True, textcolor="white", font="mono", fontsize=30)
-sim.AnimateCircle(radius=6, x=39, y=y_text + 30, fillcolor=lambda: color_to_colorspec[tl.light[Directions.west]], linewidth=0, screen_coordinates=True)
-sim.AnimateCircle(radius=6, x=129, y=y_text + 5, fillcolor=lambda: color_to_colorspec[tl.light[Directions.north]], linewidth=0, screen_coordinates=True)
-sim.AnimateText("powered by salabim", x=12, y=y_text - 9, screen_coordinates=True, font="narrow", textcolor="white", fontsize=14, text_anchor="w")
+size = 768
+road_color = "30%gray"
+
+
+class Statistics:
+    """throughput, delay (time in the system minus free flow time) and number of stops of the vehicles that left, per direction"""
+
+    def __init__(self):
+        self.delay = {direction: sim.Monitor(f"delay {direction.name}") for direction in Directions}
+        self.stops = {direction: sim.Monitor(f"stops {direction.name}") for direction in Directions}
+
+    def tally(self, vehicle):
+        self.delay[vehicle.from_direction].tally(env.now() - vehicle.t_enter - vehicle.free_flow_time)
+        self.stops[vehicle.from_direction].tally(vehicle.stops)
+
+    def throughput(self, direction):
+        return self.delay[direction].number_of_entries()
 
-with sim.over3d():
+
+def setup_animation():
+    global unit1
+    env.speed(8)
+    env.background_color("black")
+    env.width3d(size)
+    env.height3d(size)
+    env.position3d((0, 0))
+    env.width(size)
+    env.height(size)
+    env.position((size + 10, 0))
+    env.view(x_eye=-39.748112339561004, y_eye=-78.01006285162117, z_eye=55.71822276394165, x_center=0, y_center=0, z_center=0, field_of_view_y=45)
+
+    env.x0(-road_length / 2)
+    env.x1(road_length / 2)
+    env.y0(-road_length / 2)
+    unit1 = road_length / env.width()
+
+    y_text = env.height() - 80
     sim.AnimateText("Lights!", x=12, y=y_text, screen_coordinates=True, textcolor="white", font="mono", fontsize=30)
     sim.AnimateCircle(radius=6, x=39, y=y_text + 30, fillcolor=lambda: color_to_colorspec[tl.light[Directions.west]], linewidth=0, screen_coordinates=True)
     sim.AnimateCircle(radius=6, x=129, y=y_text + 5, fillcolor=lambda: color_to_colorspec[tl.light[Directions.north]], linewidth=0, screen_coordinates=True)
     sim.AnimateText("powered by salabim", x=12, y=y_text - 9, screen_coordinates=True, font="narrow", textcolor="white", fontsize=14, text_anchor="w")
 
-
-road_color = "30%gray"
-
-for direction in Directions:
-    for sign in (-1, 1):
-        x0, y0 = rotate(road_length / 2, sign * y_road_left * 0.1, angle=direction_to_angle[direction])
-        x1, y1 = rotate(light_pos1, sign * y_road_left * 1.9, angle=direction_to_angle[direction])
-        sim.AnimateRectangle(spec=(x0, y0, x1, y1), linewidth=0, fillcolor=road_color)
-        sim.Animate3dRectangle(x0=x0, y0=y0, x1=x1, y1=y1, color=road_color)
-
-tl = TrafficLight()
-
-for direction in Directions:
-    VehicleGenerator(from_direction=direction, color=direction_to_color[direction])
-
-make_video=False
-if make_video:
-    type_of_video = "2d"
-    env.run(100)
-    env.camera_auto_print(True)
-    env.camera_move("""
-    view(x_eye=-39.7481,y_eye=-78.0101,z_eye=55.7182,x_center=0.0000,y_center=0.0000,z_center=0.0000,field_of_view_y=45.0000)  # t=0.0000
-    view(x_eye=-38.3806,y_eye=-78.6919)  # t=121.3576
-    view(x_eye=-37.0014,y_eye=-79.3497)  # t=126.4277
-    view(x_eye=-35.6109,y_eye=-79.9834)  # t=131.7427
-    view(x_eye=-34.2096,y_eye=-80.5927)  # t=136.4638
-    view(x_eye=-32.7978,y_eye=-81.1775)  # t=142.0032
-    view(x_eye=-29.5181,y_eye=-73.0597,z_eye=50.1464)  # t=156.5674
-    view(x_eye=-26.5662,y_eye=-65.7538,z_eye=45.1318)  # t=160.4352
-    view(x_eye=-23.9096,y_eye=-59.1784,z_eye=40.6186)  # t=165.6155
-    view(x_eye=-21.5187,y_eye=-53.2605,z_eye=36.5567)  # t=170.2758
-    view(x_eye=-22.4449,y_eye=-52.8769)  # t=181.6538
-    view(x_eye=-22.4449,y_eye=-52.8769,z_eye=32.9011)  # t=193.5282
-    view(x_eye=-22.4449,y_eye=-52.8769,z_eye=29.6109)  # t=196.9527
-    view(x_eye=-22.4449,y_eye=-52.8769,z_eye=26.6499)  # t=200.3144
-    view(x_eye=-22.4449,y_eye=-52.8769,z_eye=23.9849)  # t=205.0026
-    view(x_eye=-23.3643,y_eye=-52.4771)  # t=220.9797
-    view(x_eye=-24.2766,y_eye=-52.0614)  # t=225.3774
-    view(x_eye=-25.1815,y_eye=-51.6297)  # t=229.2660
-    view(x_eye=-26.0787,y_eye=-51.1824)  # t=233.2356
-    view(x_eye=-26.9680,y_eye=-50.7195)  # t=233.5740
-    view(x_eye=-27.8491,y_eye=-50.2411)  # t=233.9580
-    view(x_eye=-28.7217,y_eye=-49.7474)  # t=233.9580
-    view(x_eye=-29.5855,y_eye=-49.2386)  # t=234.5815
-    view(x_eye=-30.4403,y_eye=-48.7147)  # t=234.5815
-    view(x_eye=-31.2859,y_eye=-48.1760)  # t=234.5815
-    view(x_eye=-32.1219,y_eye=-47.6227)  # t=235.2451
-    view(x_eye=-32.9482,y_eye=-47.0548)  # t=235.2451
-    view(x_eye=-33.7644,y_eye=-46.4726)  # t=235.2451
-    view(x_eye=-34.5703,y_eye=-45.8763)  # t=236.0126
-    view(x_eye=-35.3657,y_eye=-45.2660)  # t=236.0126
-    view(x_eye=-36.1503,y_eye=-44.6419)  # t=236.5163
-    view(x_eye=-36.9239,y_eye=-44.0042)  # t=236.5163
-    view(x_eye=-37.6862,y_eye=-43.3530)  # t=237.1800
-    view(x_eye=-38.4371,y_eye=-42.6887)  # t=237.1800
-    view(x_eye=-39.1763,y_eye=-42.0114)  # t=237.6837
-    view(x_eye=-39.9035,y_eye=-41.3213)  # t=237.6837
-    view(x_eye=-40.6186,y_eye=-40.6186)  # t=237.6837
-    view(x_eye=-41.3213,y_eye=-39.9035)  # t=238.5312
-    view(x_eye=-42.0114,y_eye=-39.1763)  # t=238.5312
-    view(x_eye=-42.6887,y_eye=-38.4371)  # t=238.5312
-    view(x_eye=-43.3530,y_eye=-37.6862)  # t=239.2829
-    view(x_eye=-44.0042,y_eye=-36.9239)  # t=239.2829
-    view(x_eye=-44.6419,y_eye=-36.1503)  # t=239.2829
-    view(x_eye=-45.2660,y_eye=-35.3657)  # t=240.0583
-    view(x_eye=-45.8763,y_eye=-34.5703)  # t=240.0583
-    view(x_eye=-46.4726,y_eye=-33.7644)  # t=240.0583
-    view(x_eye=-47.0548,y_eye=-32.9482)  # t=240.0583
-    view(x_eye=-47.6227,y_eye=-32.1219)  # t=240.9858
-    view(x_eye=-48.1760,y_eye=-31.2859)  # t=240.9858
-    view(x_eye=-48.7147,y_eye=-30.4403)  # t=240.9858
-    view(x_eye=-49.2386,y_eye=-29.5855)  # t=241.9852
-    view(x_eye=-49.7474,y_eye=-28.7217)  # t=241.9852
-    view(x_eye=-50.2411,y_eye=-27.8491)  # t=241.9852
-    view(x_eye=-50.7195,y_eye=-26.9680)  # t=241.9852
-    view(x_eye=-51.1824,y_eye=-26.0787)  # t=241.9852
-    """, lag=3)
-    env.show_fps(True)
-    env.animate("?")
-    env.animate3d("?")
-    env.video_mode(type_of_video)
-    env.video_repeat(0)
-    env.video_pingpong(False)
-    env.video(f"lights {type_of_video}.gif")
-    env.run(till=300)
-    env.video_close()
-else:
-    env.animate(True)
-    env.animate3d(True)
-    env.run()
\ No newline at end of file
+    with sim.over3d():
+        sim.AnimateText("Lights!", x=12, y=y_text, screen_coordinates=True, textcolor="white", font="mono", fontsize=30)
+        sim.AnimateCircle(radius=6, x=39, y=y_text + 30, fillcolor=lambda: color_to_colorspec[tl.light[Directions.west]], linewidth=0, screen_coordinates=True)
+        sim.AnimateCircle(radius=6, x=129, y=y_text + 5, fillcolor=lambda: color_to_colorspec[tl.light[Directions.north]], linewidth=0, screen_coordinates=True)
+        sim.AnimateText("powered by salabim", x=12, y=y_text - 9, screen_coordinates=True, font="narrow", textcolor="white", fontsize=14, text_anchor="w")
+
+    for direction in Directions:
+        for sign in (-1, 1):
+            x0, y0 = rotate(road_length / 2, sign * y_road_left * 0.1, angle=direction_to_angle[direction])
+            x1, y1 = rotate(light_pos1, sign * y_road_left * 1.9, angle=direction_to_angle[direction])
+            sim.AnimateRectangle(spec=(x0, y0, x1, y1), linewidth=0, fillcolor=road_color)
+            sim.Animate3dRectangle(x0=x0, y0=y0, x1=x1, y1=y1, color=road_color)
+
+
+def build(animate=True, seed=None):
+    """creates a new environment with the intersection; without animation no animation objects are created at all"""
+    global env, claims, statistics, tl, do_animation
+    do_animation = animate
+    env = sim.Environment(random_seed=seed, trace=False)
+    claims = ClaimGrid(cell_size=length_boundary)
+    statistics = Statistics()
+    if do_animation:
+        setup_animation()
+
+    tl = TrafficLight()
+
+    for direction in Directions:
+        VehicleGenerator(from_direction=direction, color=direction_to_color[direction])
+
+
+def run_headless(replications=1, till=3600, seed=1234567):
+    """runs the replications at full speed and returns, per direction, a list with one value per replication of each KPI"""
+    results = {direction: {"throughput": [], "mean_delay": [], "mean_stops": []} for direction in Directions}
+    for replication in range(replications):
+        build(animate=False, seed=seed + replication)
+        env.run(till=till)
+        for direction in Directions:
+            results[direction]["throughput"].append(statistics.throughput(direction))
+            results[direction]["mean_delay"].append(statistics.delay[direction].mean())
+            results[direction]["mean_stops"].append(statistics.stops[direction].mean())
+    return results
+
+
+def print_results(results, till):
+    print(f"{'direction':<10}{'throughput/1000t':>18}{'mean delay':>12}{'mean stops':>12}")
+    for direction, kpis in results.items():
+        throughput = sum(kpis["throughput"]) / len(kpis["throughput"]) * 1000 / till
+        delay = sum(kpis["mean_delay"]) / len(kpis["mean_delay"])
+        stops = sum(kpis["mean_stops"]) / len(kpis["mean_stops"])
+        print(f"{direction.name:<10}{throughput:18.2f}{delay:12.2f}{stops:12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lights! intersection with claim based geometry")
+    parser.add_argument("--headless", action="store_true", help="run without animation and print per direction KPIs")
+    parser.add_argument("--replications", type=int, default=1, help="number of headless replications")
+    parser.add_argument("--till", type=float, default=3600, help="simulation time of each headless replication")
+    parser.add_argument("--seed", type=int, default=1234567, help="random seed of the first replication")
+    args = parser.parse_args()
+
+    if args.headless:
+        print_results(run_headless(args.replications, args.till, args.seed), args.till)
+        return
+
+    build(animate=True, seed=args.seed)
+    if make_video:
+        type_of_video = "2d"
+        env.run(100)
+        env.camera_auto_print(True)
+        env.camera_move("""
+        view(x_eye=-39.7481,y_eye=-78.0101,z_eye=55.7182,x_center=0.0000,y_center=0.0000,z_center=0.0000,field_of_view_y=45.0000)  # t=0.0000
+        view(x_eye=-38.3806,y_eye=-78.6919)  # t=121.3576
+        view(x_eye=-37.0014,y_eye=-79.3497)  # t=126.4277
+        view(x_eye=-35.6109,y_eye=-79.9834)  # t=131.7427
+        view(x_eye=-34.2096,y_eye=-80.5927)  # t=136.4638
+        view(x_eye=-32.7978,y_eye=-81.1775)  # t=142.0032
+        view(x_eye=-29.5181,y_eye=-73.0597,z_eye=50.1464)  # t=156.5674
+        view(x_eye=-26.5662,y_eye=-65.7538,z_eye=45.1318)  # t=160.4352
+        view(x_eye=-23.9096,y_eye=-59.1784,z_eye=40.6186)  # t=165.6155
+        view(x_eye=-21.5187,y_eye=-53.2605,z_eye=36.5567)  # t=170.2758
+        view(x_eye=-22.4449,y_eye=-52.8769)  # t=181.6538
+        view(x_eye=-22.4449,y_eye=-52.8769,z_eye=32.9011)  # t=193.5282
+        view(x_eye=-22.4449,y_eye=-52.8769,z_eye=29.6109)  # t=196.9527
+        view(x_eye=-22.4449,y_eye=-52.8769,z_eye=26.6499)  # t=200.3144
+        view(x_eye=-22.4449,y_eye=-52.8769,z_eye=23.9849)  # t=205.0026
+        view(x_eye=-23.3643,y_eye=-52.4771)  # t=220.9797
+        view(x_eye=-24.2766,y_eye=-52.0614)  # t=225.3774
+        view(x_eye=-25.1815,y_eye=-51.6297)  # t=229.2660
+        view(x_eye=-26.0787,y_eye=-51.1824)  # t=233.2356
+        view(x_eye=-26.9680,y_eye=-50.7195)  # t=233.5740
+        view(x_eye=-27.8491,y_eye=-50.2411)  # t=233.9580
+        view(x_eye=-28.7217,y_eye=-49.7474)  # t=233.9580
+        view(x_eye=-29.5855,y_eye=-49.2386)  # t=234.5815
+        view(x_eye=-30.4403,y_eye=-48.7147)  # t=234.5815
+        view(x_eye=-31.2859,y_eye=-48.1760)  # t=234.5815
+        view(x_eye=-32.1219,y_eye=-47.6227)  # t=235.2451
+        view(x_eye=-32.9482,y_eye=-47.0548)  # t=235.2451
+        view(x_eye=-33.7644,y_eye=-46.4726)  # t=235.2451
+        view(x_eye=-34.5703,y_eye=-45.8763)  # t=236.0126
+        view(x_eye=-35.3657,y_eye=-45.2660)  # t=236.0126
+        view(x_eye=-36.1503,y_eye=-44.6419)  # t=236.5163
+        view(x_eye=-36.9239,y_eye=-44.0042)  # t=236.5163
+        view(x_eye=-37.6862,y_eye=-43.3530)  # t=237.1800
+        view(x_eye=-38.4371,y_eye=-42.6887)  # t=237.1800
+        view(x_eye=-39.1763,y_eye=-42.0114)  # t=237.6837
+        view(x_eye=-39.9035,y_eye=-41.3213)  # t=237.6837
+        view(x_eye=-40.6186,y_eye=-40.6186)  # t=237.6837
+        view(x_eye=-41.3213,y_eye=-39.9035)  # t=238.5312
+        view(x_eye=-42.0114,y_eye=-39.1763)  # t=238.5312
+        view(x_eye=-42.6887,y_eye=-38.4371)  # t=238.5312
+        view(x_eye=-43.3530,y_eye=-37.6862)  # t=239.2829
+        view(x_eye=-44.0042,y_eye=-36.9239)  # t=239.2829
+        view(x_eye=-44.6419,y_eye=-36.1503)  # t=239.2829
+        view(x_eye=-45.2660,y_eye=-35.3657)  # t=240.0583
+        view(x_eye=-45.8763,y_eye=-34.5703)  # t=240.0583
+        view(x_eye=-46.4726,y_eye=-33.7644)  # t=240.0583
+        view(x_eye=-47.0548,y_eye=-32.9482)  # t=240.0583
+        view(x_eye=-47.6227,y_eye=-32.1219)  # t=240.9858
+        view(x_eye=-48.1760,y_eye=-31.2859)  # t=240.9858
+        view(x_eye=-48.7147,y_eye=-30.4403)  # t=240.9858
+        view(x_eye=-49.2386,y_eye=-29.5855)  # t=241.9852
+        view(x_eye=-49.7474,y_eye=-28.7217)  # t=241.9852
+        view(x_eye=-50.2411,y_eye=-27.8491)  # t=241.9852
+        view(x_eye=-50.7195,y_eye=-26.9680)  # t=241.9852
+        view(x_eye=-51.1824,y_eye=-26.0787)  # t=241.9852
+        """, lag=3)
+        env.show_fps(True)
+        env.animate("?")
+        env.animate3d("?")
+        env.video_mode(type_of_video)
+        env.video_repeat(0)
+        env.video_pingpong(False)
+        env.video(f"lights {type_of_video}.gif")
+        env.run(till=300)
+        env.video_close()
+    else:
+        env.animate(True)
+        env.animate3d(True)
+        env.run()
+
+
+if __name__ == "__main__":
+    main()
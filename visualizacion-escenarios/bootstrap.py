@@ -20,39 +20,7 @@ class Bootstrap(object):
         # Initialize Sioux Falls network
         network_data = NetworkData(0.0025)
         # Create network by enumerating across all links
-        for linkid, t0 in enumerate(network_data.t0):
-            # Calculate length of link with sqrt((x1 - x2)^2 + (y1 - y2)^2)
-            length = np.sqrt(
-                np.power(network_data.x1[linkid] - network_data.x2[linkid], 2)
-              + np.power(network_data.y1[linkid] - network_data.y2[linkid], 2)) / 600.
-            mu = network_data.mu[linkid]
-            # Assign nodeID to each link if check pass in node list
-            for i, node in enumerate(network_data.nodes):
-                if linkid+1 in node:
-                    nodeID = i
-            # Assign turn ratio to each link
-            turns = {}
-            for j, turn in enumerate(network_data.turns[linkid]):
-                turns[j + 1] = turn
-            # Assign exit probability from last item in turn list ([-1])
-            turns['exit'] = turns.pop(list(turns.keys())[-1])
-            # Generate coordinates of each link (for visualization)
-            pt1 = (np.float32(network_data.x1[linkid] / 600.),
-                   np.float32(network_data.y1[linkid] / 600.))
-
-            pt2 = (np.float32(network_data.x2[linkid] / 600.),
-                   np.float32(network_data.y2[linkid] / 600.))
-            c = (pt1, pt2)
-            # Draw link on map
-            self.sim.networkLines.append(c)
-            # Add link to sim.network
-            self.sim.network.addLink(linkID=linkid+1, turns=turns,
-                                type='link',  length=length,
-                                t0=t0, MU=mu, nodeID=nodeID,
-                                coordinates=c)
-            # Initialize car generation
-            self.env.process(self.sim.source(
-                10, LAMBDA=network_data.flambda[linkid], linkid=linkid+1))
+        self.sim.loadNetwork(network_data)
         yield self.env.timeout(1)
 
 def main():
@@ -1,3 +1,5 @@
+import os
+import sys
 import simpy
 import cv2
 import numpy as np
@@ -6,6 +8,9 @@ import pandas as pd
 import simulation.statistics as stats
 from simulation.simulation import Simulation
 from simulation.network_data import NetworkData
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from herramientas.instrumentacion import make_environment
+from herramientas.analisis_salida import steady_state
 
 plt.style.use('ggplot')
 
@@ -15,48 +20,15 @@ def main():
     """
     Main function to run simulation
     """
-    env = simpy.Environment()  # use instant simulation
+    env = make_environment()  # use instant simulation (SIM_PROFILE=1 to profile it)
     #env = simpy.rt.RealtimeEnvironment(factor=1.)  # use real time simulation
     # Initialize Sioux Falls network
     networkData = NetworkData(0.0025)
     # Create simulation enviromment
     img = np.zeros((900, 800, 3), dtype=np.uint8)
     sim = Simulation(env, img)
-    # Create network by enumerating across all links
-    for linkid, t0 in enumerate(networkData.t0):
-        # Calculate length of link with sqrt((x1 - x2)^2 + (y1 - y2)^2)
-        length = np.sqrt(
-            np.power(networkData.x1[linkid] - networkData.x2[linkid], 2)
-          + np.power(networkData.y1[linkid] - networkData.y2[linkid], 2)) / 600.
-        mu = networkData.mu[linkid]
-        # Assign nodeID to each link if check pass in node list
-        for i, node in enumerate(networkData.nodes):
-            if linkid+1 in node:
-                nodeID = i
-        # Assign turn ratio to each link
-        turns = {}
-        for j, turn in enumerate(networkData.turns[linkid]):
-            turns[j + 1] = turn
-        # Assign exit probability from last item in turn list ([-1])
-        turns['exit'] = turns.pop(list(turns.keys())[-1])
-        # Generate coordinates of each link (for visualization)
-        pt1 = (np.float32(networkData.x1[linkid] / 600.),
-               np.float32(networkData.y1[linkid] / 600.))
-        pt2 = (np.float32(networkData.x2[linkid] / 600.),
-               np.float32(networkData.y2[linkid] / 600.))
-        c = (pt1, pt2)
-        # Draw link on map
-        sim.networkLines.append(c)
-        # Add link to sim.network
-        sim.network.addLink(linkID=linkid+1, turns=turns,
-                            type='link',  length=length,
-                            t0=t0, MU=mu, nodeID=nodeID,
-                            coordinates=c)
-        # Initialize car generation
-        if linkid % 3 == 0:
-            env.process(sim.source(10,
-                                   LAMBDA=networkData.flambda[linkid],
-                                   linkid=linkid+1))
+    # Create network by enumerating across all links (car sources on every third link)
+    sim.loadNetwork(networkData, source_every=3)
     # Draw initial network
     for i in sim.networkLines:
         start_point = (i[0][0].astype(int), i[0][1].astype(int))
@@ -96,6 +68,9 @@ def main():
     meanWaitTime = meanWaitTime.groupby(['carID']).mean()
     meanWaitTime.columns = ['meanWaitTime']
     carStatistics = pd.concat([totalTravelTime, totalSegments, meanWaitTime], axis=1)
+    # Queue time at departure without the empty-network start (MSER-5 and overlapping batch means)
+    departures = df.loc[df['event'] == 'departure']
+    print('Steady-state queue time: %s' % steady_state(departures['t_queue']))
     # Links statistics
     stats.meanQueueLength(plt, df)
     plt.figure(2)
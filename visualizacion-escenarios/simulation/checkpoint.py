@@ -0,0 +1,131 @@
+import json
+import random
+
+import numpy as np
+import simpy
+from simulation.road_network import TrafficLight
+from simulation.simulation import Simulation
+
+PHASES = ['service', 'light', 'queue', 'travel']  # Restore order: cars holding a junction first
+
+
+def snapshot(sim, include_data=False):
+    """
+    Serializable state (plain dict, JSON friendly) of a running simulation,
+    taken between two env.run() calls: links with their queue levels, cars on
+    the network with their phase and remaining times, sources with the time
+    of their next car, traffic light phases and the random generators. With
+    include_data the event log sim.data is kept too (it may be large).
+    """
+    env = sim.env
+    network = sim.network
+    nodeIDs = {id(node): nodeID for nodeID, node in network.nodes.items()}
+    links = []
+    for linkID, link in network.links.items():
+        links.append({
+            'id': linkID,
+            'length': float(link['length']),
+            'turns': [[key, float(value)] for key, value in link['turns'].items()],
+            't0': float(link['t0']),
+            'MU': float(link['MU']),
+            'node': nodeIDs[id(link['node'])],
+            'coordinates': [[float(x), float(y)] for x, y in link['coordinates']],
+            'level': link['queue'].level,
+        })
+    cars = []
+    for carID, state in sim.inFlight.items():
+        car = {key: value for key, value in state.items()}
+        car['car'] = carID
+        car['t_arrival'] = [float(t) for t in state['t_arrival']]
+        car['history'] = sim.cars.get(carID, [])
+        cars.append(car)
+    lights = [{
+        'node': nodeIDs[id(node)],
+        'status': light.status,
+        'remaining': light.phaseEnd - env.now,
+        'timings': [light.timings['t_red'], light.timings['t_amber'], light.timings['t_green']],
+        't_max': light.t_max,
+    } for node, light in network.trafficLights.items()]
+    numpyState = np.random.get_state()
+    pythonState = random.getstate()
+    return {
+        'now': env.now,
+        'nodes': [[nodeID, node.capacity] for nodeID, node in network.nodes.items()],
+        'links': links,
+        'cars': cars,
+        'sources': [dict(source) for source in sim.sources if not source['done']],
+        'lights': lights,
+        'counters': {'carCounter': sim.carCounter, 'carsInSystem': sim.carsInSystem, 't_max': sim.t_max},
+        'random': {
+            'numpy': [numpyState[0], numpyState[1].tolist(), *numpyState[2:]],
+            'python': [pythonState[0], list(pythonState[1]), pythonState[2]],
+        },
+        'data': [list(row) for row in sim.data] if include_data else None,
+    }
+
+
+def restore(state, seed=None):
+    """
+    New environment (starting at the snapshot time) and simulation
+    equivalent to the snapshot. The random generators continue where they
+    were, so a restored run reproduces the original one; with `seed` they
+    are reseeded instead, to fork independent scenario branches. The
+    visualization process is not restored.
+    """
+    env = simpy.Environment(initial_time=state['now'])
+    sim = Simulation(env, None)
+    network = sim.network
+    for nodeID, capacity in state['nodes']:
+        network.addNode(nodeID, cap=capacity)
+    for link in state['links']:
+        coordinates = tuple((np.float32(x), np.float32(y)) for x, y in link['coordinates'])
+        sim.networkLines.append(coordinates)
+        network.addLink(linkID=link['id'], turns={key: value for key, value in link['turns']},
+                        type='link', length=link['length'], t0=link['t0'], MU=link['MU'],
+                        nodeID=link['node'], coordinates=coordinates)
+        queue = network.links[link['id']]['queue'] = simpy.Container(env, init=link['level'])
+        if link['level']:
+            sim.updateQueue(queue, link['id'])
+    counters = state['counters']
+    sim.carCounter = counters['carCounter']
+    sim.carsInSystem = counters['carsInSystem']
+    sim.t_max = counters['t_max']
+    if state['data'] is not None:
+        sim.data = [tuple(row) for row in state['data']]
+
+    # Processes are started in the order in which they must claim resources:
+    # lights, then cars holding a junction, then cars waiting in arrival order
+    for light in state['lights']:
+        network.trafficLights[network.nodes[light['node']]] = TrafficLight(
+            env, light['t_max'], light['timings'], status=light['status'], remaining=light['remaining'])
+    cars = sorted(state['cars'], key=lambda car: (PHASES.index(car['phase']), car.get('queued', 0)))
+    for car in cars:
+        car = dict(car)
+        carID = car.pop('car')
+        sim.cars[carID] = car.pop('history')
+        car['t_arrival'] = tuple(car['t_arrival'])
+        link = network.links[car['link']]
+        env.process(sim.car(carID, car['t_arrival'], link['node'], link['turns'], car['link'], resume=car))
+    for source in state['sources']:
+        env.process(sim.source(source['demand_duration'], source['LAMBDA'], source['link'],
+                               delay=source['next'] - state['now']))
+
+    if seed is None:
+        numpyState = state['random']['numpy']
+        np.random.set_state((numpyState[0], np.array(numpyState[1], dtype=np.uint32), *numpyState[2:]))
+        pythonState = state['random']['python']
+        random.setstate((pythonState[0], tuple(pythonState[1]), pythonState[2]))
+    else:
+        np.random.seed(seed)
+        random.seed(seed)
+    return env, sim
+
+
+def save(state, path):
+    with open(path, 'w') as file:
+        json.dump(state, file)
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
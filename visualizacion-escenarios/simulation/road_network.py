@@ -1,7 +1,14 @@
+import os
+import sys
 import random
 import string
 import simpy
 import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from herramientas.traza import get_tracer
+
+# Traza de los cambios de los semáforos (desactivada salvo que se configure SIM_TRACE)
+tracer = get_tracer('road_network')
 
 class RoadNetwork(object):
     def __init__(self, env):
@@ -49,10 +56,14 @@ class RoadNetwork(object):
             exit()
 
 class TrafficLight(object):
-    def __init__(self, env, t_max=50, t=[5, 1, 5]):
+    def __init__(self, env, t_max=50, t=[5, 1, 5], status=None, remaining=None):
         self.env = env
+        self.t_max = t_max
         self.timings = {'t_red': t[0], 't_amber': t[1], 't_green': t[2]}
-        self.status = random.choice(['GREEN', 'RED'])
+        # status and remaining (time left in the current phase) restore a light from a checkpoint
+        self.status = status or random.choice(['GREEN', 'RED'])
+        self.remaining = remaining
+        self.phaseEnd = env.now
         self.process = env.process(self.cycle(t_max))
         self.stop = simpy.PriorityResource(env, capacity=1)
 
@@ -62,29 +73,41 @@ class TrafficLight(object):
     def setTimings(self, t=[5, 1, 5]):
         self.timings = {'t_red': t[0], 't_amber': t[1], 't_green': t[2]}
 
+    def phaseDuration(self, timing):
+        """ Duration of the phase that starts now (what is left of it for a restored light) """
+        if self.remaining is not None:
+            duration, self.remaining = self.remaining, None
+        else:
+            duration = self.timings[timing]
+        self.phaseEnd = self.env.now + duration
+        return duration
+
     def cycle(self, t_max):
         while self.env.now < t_max:
             if self.status == 'RED':
                 with self.stop.request(priority=-1): # all cars must yield to 'RED'
-                    print('Light is %s at %.2f' %  (self.status, self.env.now))
+                    if tracer.enabled:
+                        tracer.event('light', self.env.now, status=self.status)
                     try:
-                        yield self.env.timeout(self.timings['t_red'])
+                        yield self.env.timeout(self.phaseDuration('t_red'))
                     except simpy.Interrupt:
                         pass
                     self.status = 'GREEN'
                     self.prev_status = 'RED'
             if self.status == 'GREEN':
-                print('Light is %s at %.2f' %  (self.status, self.env.now))
+                if tracer.enabled:
+                    tracer.event('light', self.env.now, status=self.status)
                 try:
-                    yield self.env.timeout(self.timings['t_green'])
+                    yield self.env.timeout(self.phaseDuration('t_green'))
                 except simpy.Interrupt:
                     pass
                 self.status = 'AMBER'
                 self.prev_status = 'GREEN'
             if self.status == 'AMBER':
                 with self.stop.request(priority=0): # allow cars in intersection to continue
-                    print('Light is %s at %.2f' %  (self.status, self.env.now))
-                    yield self.env.timeout(self.timings['t_amber'])
+                    if tracer.enabled:
+                        tracer.event('light', self.env.now, status=self.status)
+                    yield self.env.timeout(self.phaseDuration('t_amber'))
                     try:
                         self.prev_status
                     except AttributeError:
@@ -1,8 +1,14 @@
-import cv2
+import os
+import sys
 import numpy as np
 from numpy.random import multinomial
 from simulation.distribution import uniform, exponential
 from simulation.road_network import RoadNetwork
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from herramientas.traza import get_tracer
+
+# Traza de eventos de los coches (desactivada salvo que se configure SIM_TRACE)
+tracer = get_tracer('simulation')
 
 class Simulation(object):
     def __init__(self, env, img):
@@ -15,9 +21,14 @@ class Simulation(object):
         self.img = img
         self.networkLines = []
         self.cars = {}
+        # State of the cars on the network and of the sources, kept up to date for checkpoints
+        self.inFlight = {}
+        self.sources = []
 
     def visualization(self, frequency, name):
         """ Visualization env process """
+        # OpenCV is only needed to draw, so the simulation can run headless without it
+        import cv2
         while self.env.now < self.t_max or self.carsInSystem > 0:
             # redraw entire network
             for i in self.networkLines:
@@ -36,6 +47,43 @@ class Simulation(object):
             k = cv2.waitKey(1)
             yield self.env.timeout(frequency)
 
+    def loadNetwork(self, networkData, demand_duration=10, source_every=1):
+        """ Create one link per link of networkData and start the car sources of every source_every links """
+        for linkid, t0 in enumerate(networkData.t0):
+            # Calculate length of link with sqrt((x1 - x2)^2 + (y1 - y2)^2)
+            length = np.sqrt(
+                np.power(networkData.x1[linkid] - networkData.x2[linkid], 2)
+              + np.power(networkData.y1[linkid] - networkData.y2[linkid], 2)) / 600.
+            mu = networkData.mu[linkid]
+            # Assign nodeID to each link if check pass in node list
+            for i, node in enumerate(networkData.nodes):
+                if linkid+1 in node:
+                    nodeID = i
+            # Assign turn ratio to each link
+            turns = {}
+            for j, turn in enumerate(networkData.turns[linkid]):
+                turns[j + 1] = turn
+            # Assign exit probability from last item in turn list ([-1])
+            turns['exit'] = turns.pop(list(turns.keys())[-1])
+            # Generate coordinates of each link (for visualization)
+            pt1 = (np.float32(networkData.x1[linkid] / 600.),
+                   np.float32(networkData.y1[linkid] / 600.))
+            pt2 = (np.float32(networkData.x2[linkid] / 600.),
+                   np.float32(networkData.y2[linkid] / 600.))
+            c = (pt1, pt2)
+            # Draw link on map
+            self.networkLines.append(c)
+            # Add link to network
+            self.network.addLink(linkID=linkid+1, turns=turns,
+                                 type='link',  length=length,
+                                 t0=t0, MU=mu, nodeID=nodeID,
+                                 coordinates=c)
+            # Initialize car generation
+            if linkid % source_every == 0:
+                self.env.process(self.source(demand_duration,
+                                             LAMBDA=networkData.flambda[linkid],
+                                             linkid=linkid+1))
+
     def updateQueue(self, queue, linkid, carLength=3.):
         # Draw queue lines
         length = self.network.links[linkid]['length']
@@ -51,34 +99,52 @@ class Simulation(object):
         self.network.links[linkid]['queueLines'] = line
         self.network.links[linkid]['capacity'] = dk
 
-    def car(self, carID, t_arrival, node, turn_ratio, linkid):
-        """ Car generator """
+    def car(self, carID, t_arrival, node, turn_ratio, linkid, resume=None):
+        """ Car generator (resume: state of a car restored from a checkpoint) """
         # Prepare variables
         t_entry, t_travel = t_arrival
         queue = self.network.links[linkid]['queue']
-        # En-route
-        yield self.env.timeout(t_travel)
-        # Put 1 car in link queue
-        yield queue.put(1)
-        # Update queue length for visualization
-        self.updateQueue(queue, linkid)
+        # Phase of the car on this link: 'travel', 'queue', 'light' or 'service'
+        state = resume or {'link': linkid, 't_arrival': t_arrival, 'phase': 'travel', 'until': t_entry + t_travel}
+        arriving = state['phase'] == 'travel'
+        self.inFlight[carID] = state
+        if state['phase'] == 'travel':
+            # En-route
+            yield self.env.timeout(t_travel if resume is None else state['until'] - self.env.now)
+            # Put 1 car in link queue
+            yield queue.put(1)
+            # Update queue length for visualization
+            self.updateQueue(queue, linkid)
+            state['phase'] = 'queue'
+            state['queued'] = self.env.now
         # Query queue length
         with node.request() as req:
-            q_length = queue.level
-            # Data logging
-            print('car %d arrived on link %s at %.2fs (Q=%d cars) ' % (carID, linkid, sum(t_arrival), q_length))
-            self.data.append((carID, linkid, 'arrival', sum(t_arrival), q_length))
+            if arriving:
+                q_length = queue.level
+                # Data logging
+                if tracer.enabled:
+                    tracer.event('arrival', sum(t_arrival), car=carID, link=linkid, queue=q_length)
+                self.data.append((carID, linkid, 'arrival', sum(t_arrival), q_length))
             # Wait until queue is ready
             result = yield req
-            t_service = exponential(self.network.links[linkid]['MU'])
-            # Query traffic lights if available
-            if node in self.network.trafficLights:
-                tg = self.network.trafficLights[node]
-                # Yield to traffic light 'stop'
-                with tg.stop.request(priority=0) as stop:
-                    yield stop
-            # Services at junction
-            yield self.env.timeout(t_service)
+            if state['phase'] == 'queue':
+                state['t_service'] = exponential(self.network.links[linkid]['MU'])
+                state['phase'] = 'light'
+            t_service = state['t_service']
+            if state['phase'] == 'light':
+                # Query traffic lights if available
+                if node in self.network.trafficLights:
+                    tg = self.network.trafficLights[node]
+                    # Yield to traffic light 'stop'
+                    with tg.stop.request(priority=0) as stop:
+                        yield stop
+                # Services at junction
+                state['phase'] = 'service'
+                state['until'] = self.env.now + t_service
+                yield self.env.timeout(t_service)
+            else:
+                yield self.env.timeout(state['until'] - self.env.now)
+            del self.inFlight[carID]
             # Time spent in queue
             t_depart = self.env.now
             t_queue = t_depart - sum(t_arrival)
@@ -105,20 +171,28 @@ class Simulation(object):
         # Update queue level
         q_length = queue.level
         # Data logging
-        print('car %d departed link %s at %.2fs (Q=%d cars)' % (carID, linkid, t_depart, q_length))
+        if tracer.enabled:
+            tracer.event('departure', t_depart, car=carID, link=linkid, queue=q_length)
         self.data.append((carID, linkid, 'departure',  t_depart, q_length, t_queue))
-        # Prints car travel history
-        print('car %d history: %s' % (carID, self.cars[carID]))
+        # Car travel history
+        if tracer.wants('DEBUG'):
+            tracer.event('history', t_depart, level='DEBUG', car=carID, links=self.cars[carID])
 
-    def source(self, demand_duration, LAMBDA, linkid):
-        """ Event generator """
+    def source(self, demand_duration, LAMBDA, linkid, delay=0):
+        """ Event generator (delay: time until the next car, for a source restored from a checkpoint) """
         if self.t_max < demand_duration:
             self.t_max = demand_duration
         if linkid not in self.network.links.keys():
             print('Link %s not defined, exiting simulation' % linkid)
             exit()
+        state = {'link': linkid, 'LAMBDA': LAMBDA, 'demand_duration': demand_duration,
+                 'next': self.env.now + delay, 'done': False}
+        self.sources.append(state)
+        if delay:
+            yield self.env.timeout(delay)
         while self.env.now < demand_duration:
             arrival_rate = exponential(LAMBDA)
+            state['next'] = self.env.now + arrival_rate
             turn_ratio = self.network.links[linkid]['turns']
             n = self.network.links[linkid]['node']
             t_entry = self.env.now
@@ -137,4 +211,5 @@ class Simulation(object):
             self.cars[self.carCounter] = []
             self.cars[self.carCounter].append(linkid)
             self.env.process(c)
-            yield self.env.timeout(arrival_rate)
\ No newline at end of file
+            yield self.env.timeout(arrival_rate)
+        state['done'] = True
\ No newline at end of file
@@ -0,0 +1,55 @@
+import copy
+import timeit
+import numpy as np
+import simpy
+from simulation.simulation import Simulation
+from simulation.network_data import NetworkData
+from simulation import checkpoint
+
+SEED = 1
+WARM_UP = 10            # Warm-up period, simulated only once
+DEMAND_DURATION = 30    # Cars keep entering the network until this time
+DEMAND_FACTORS = [0.8, 1.0, 1.2]  # Scenario branches: multiplier of the arrival rate of every source
+REPLICATIONS = 3        # Branches forked for each scenario, each one with its own seed
+
+def warm_up():
+    """ Simulate the warm-up period of the Sioux Falls network and return its checkpoint """
+    np.random.seed(SEED)
+    env = simpy.Environment()
+    sim = Simulation(env, None)
+    sim.loadNetwork(NetworkData(0.0025), demand_duration=DEMAND_DURATION)
+    env.run(until=WARM_UP)
+    return checkpoint.snapshot(sim)
+
+def branch(state, factor, seed):
+    """ Fork a scenario from the warm-up checkpoint and run it until the demand ends """
+    state = copy.deepcopy(state)
+    for source in state['sources']:
+        # LAMBDA is the mean time between cars of the source
+        source['LAMBDA'] /= factor
+    env, sim = checkpoint.restore(state, seed=seed)
+    env.run(until=DEMAND_DURATION)
+    departures = [row for row in sim.data if row[2] == 'departure']
+    return len(departures), np.mean([row[5] for row in departures])
+
+def main():
+    start_time = timeit.default_timer()
+    state = warm_up()
+    warm_up_time = timeit.default_timer() - start_time
+    print('Warm-up until t=%s: %.3fs, %d cars on the network' % (WARM_UP, warm_up_time, len(state['cars'])))
+
+    start_time = timeit.default_timer()
+    print('\n%8s %12s %12s %16s' % ('demand', 'replication', 'departures', 'mean queue (s.)'))
+    for factor in DEMAND_FACTORS:
+        for replication in range(REPLICATIONS):
+            departures, mean_queue = branch(state, factor, seed=SEED + 1 + replication)
+            print('%7.1fx %12d %12d %16.3f' % (factor, replication + 1, departures, mean_queue))
+    branches_time = timeit.default_timer() - start_time
+
+    runs = len(DEMAND_FACTORS) * REPLICATIONS
+    print('\nBranches: %.3fs for %d runs (warm-up re-run in each: about %.3fs more)'
+          % (branches_time, runs, (runs - 1) * warm_up_time))
+
+# Standard boilerplate to call the main() function to begin the program.
+if __name__ == '__main__':
+  main()